@@ -0,0 +1,81 @@
+##############################################################################
+# Copyright 2016 IBM Corp.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##############################################################################
+
+"""
+Compare the number of new connections (TCP and TLS handshakes against SCBE)
+and the wall-clock time of concurrent REST calls, without keep-alive and
+with connection pools of different sizes. The calls go to a local stand-in
+SCBE server that adds a fixed latency to every reply.
+
+Usage: python benchmarks/bench_connection_pool.py [latency] [concurrency]
+"""
+
+import sys
+import time
+from ibm_storage_flocker_driver.lib.abstract_client import ConnectionInfo
+from ibm_storage_flocker_driver.lib.constants import (
+    CONF_PARAM_MAX_CONNECTIONS_PER_HOST,
+    CONF_PARAM_KEEP_ALIVE,
+)
+from ibm_storage_flocker_driver.lib.ibm_scbe_client import (
+    RestClient, URL_SCBE_RESOURCE_GET_AUTH, URL_SCBE_RESOURCE_HOST,
+)
+from ibm_storage_flocker_driver.lib.utils import run_concurrently
+from ibm_storage_flocker_driver.tests.fake_scbe_server import FakeSCBEServer
+
+ROUNDS = 10
+
+
+def measure(server, options, concurrency):
+    con_info = ConnectionInfo('', '', '', debug_level='ERROR',
+                              options=options)
+    client = RestClient(con_info, server.base_url, URL_SCBE_RESOURCE_GET_AUTH)
+    try:
+        before = client.pool_stats()['misses']
+        start = time.time()
+        for _ in range(ROUNDS):
+            run_concurrently(  # different requests, so none is coalesced
+                [lambda name=name: client.get(URL_SCBE_RESOURCE_HOST,
+                                              dict(name=name))
+                 for name in range(concurrency)],
+                max_workers=concurrency)
+        elapsed = time.time() - start
+        return client.pool_stats()['misses'] - before, elapsed
+    finally:
+        client.close()
+
+
+def main():
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.05
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    server = FakeSCBEServer(delay=latency).start()
+    try:
+        print('latency {}s per call, {} rounds of {} concurrent calls'.format(
+            latency, ROUNDS, concurrency))
+        for name, options in (
+                ('no keep-alive', {CONF_PARAM_KEEP_ALIVE: False}),
+                ('pool of 1', {CONF_PARAM_MAX_CONNECTIONS_PER_HOST: 1}),
+                ('pool of {}'.format(concurrency),
+                 {CONF_PARAM_MAX_CONNECTIONS_PER_HOST: concurrency})):
+            handshakes, elapsed = measure(server, options, concurrency)
+            print('{:<16}{:>5} handshakes {:.3f}s'.format(
+                name, handshakes, elapsed))
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+##############################################################################
+# Copyright 2016 IBM Corp.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##############################################################################
+
+"""
+Compare the wall-clock time of the list_volumes backend queries when they
+run one after another, when they fan out concurrently, and when the
+mappings and hosts are scoped to the Flocker volumes (the driver flow).
+The queries go to a local stand-in SCBE server that adds a fixed latency
+to every reply.
+
+Usage: python benchmarks/bench_list_volumes_fanout.py [latency] [services]
+"""
+
+import sys
+import time
+from mock import patch
+from ibm_storage_flocker_driver.lib.abstract_client import ConnectionInfo
+from ibm_storage_flocker_driver.lib.constants import VOL_NAME_FLOCKER_PREFIX
+from ibm_storage_flocker_driver.lib.ibm_scbe_client import (
+    IBMSCBEClientAPI, RestClient, URL_SCBE_RESOURCE_GET_AUTH,
+)
+from ibm_storage_flocker_driver.lib.utils import run_concurrently
+from ibm_storage_flocker_driver.tests.fake_scbe_server import FakeSCBEServer
+
+VOLUMES_PER_SERVICE = 200
+FLOCKER_VOLUME_EVERY = 10  # one of every 10 volumes is a Flocker volume
+ROUNDS = 5
+
+
+def build_server(latency, num_services):
+    server = FakeSCBEServer(delay=latency)
+    services = ['service{}'.format(i) for i in range(num_services)]
+    server.collections['services'] = [
+        dict(id=i, name=name) for i, name in enumerate(services)]
+    server.collections['hosts'] = [
+        dict(id=i, name='host{}'.format(i), array='a1') for i in range(100)]
+    volumes = []
+    for service in services:
+        for i in range(VOLUMES_PER_SERVICE):
+            wwn = '{}-{}'.format(service, i)
+            prefix = VOL_NAME_FLOCKER_PREFIX \
+                if i % FLOCKER_VOLUME_EVERY == 0 else ''
+            volumes.append(dict(
+                scsi_identifier=wwn, name=prefix + wwn, logical_capacity=1,
+                volume_id=wwn, array='a1', service_name=service))
+    server.collections['volumes'] = volumes
+    server.collections['mappings'] = [
+        dict(volume=vol['scsi_identifier'], host=i % 100)
+        for i, vol in enumerate(volumes[::2])]
+    return server.start()
+
+
+def build_client(server):
+    con_info = ConnectionInfo('', '', '', debug_level='ERROR')
+    with patch('ibm_storage_flocker_driver.lib.ibm_scbe_client.RestClient'):
+        client = IBMSCBEClientAPI(con_info)
+    client._client = RestClient(  # pylint: disable=protected-access
+        con_info, server.base_url, URL_SCBE_RESOURCE_GET_AUTH)
+    return client
+
+
+def sequential(client):
+    client.list_volumes()
+    client.get_vols_mapping()
+    client.get_hosts()
+
+
+def concurrent(client):
+    run_concurrently([
+        lambda: client.list_volumes(resource=client.list_service_names()),
+        client.get_vols_mapping,
+        client.get_hosts,
+    ])
+
+
+def scoped(client):
+    vols = client.list_volumes(resource=client.list_service_names(),
+                               name_prefix=VOL_NAME_FLOCKER_PREFIX)
+    map_dict = client.get_vols_mapping(wwns=[vol.wwn for vol in vols])
+    client.get_hosts(host_ids=set(map_dict.values()))
+
+
+def measure(func, client):
+    func(client)  # warm up the connections and the service catalog
+    start = time.time()
+    for _ in range(ROUNDS):
+        func(client)
+    return (time.time() - start) / ROUNDS
+
+
+def main():
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.1
+    num_services = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    server = build_server(latency, num_services)
+    try:
+        client = build_client(server)
+        print('latency {}s per query, {} services, {} volumes'.format(
+            latency, num_services, num_services * VOLUMES_PER_SERVICE))
+        for name, func in (('sequential', sequential),
+                           ('concurrent', concurrent),
+                           ('scoped', scoped)):
+            print('{:<12}{:.3f}s per listing'.format(
+                name, measure(func, client)))
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
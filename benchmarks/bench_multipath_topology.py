@@ -0,0 +1,108 @@
+##############################################################################
+# Copyright 2016 IBM Corp.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##############################################################################
+
+
+"""
+Compare the time of finding multipath devices in a synthetic multipath -ll
+output with thousands of maps: the line-by-line regex search run for every
+WWN, the parser that stops at the wanted map (early exit), and the index
+of the whole output (built once, then looked up).
+
+Usage: python benchmarks/bench_multipath_topology.py [maps] [lookups]
+"""
+
+import re
+import sys
+import time
+from io import BytesIO
+from ibm_storage_flocker_driver.lib.multipath_topology import (
+    MultipathTopology,
+    find_multipath_map,
+)
+
+MAP_TEMPLATE = """\
+mpath{index} (3{wwn}) dm-{index} IBM     ,2810XIV
+size=16G features='1 queue_if_no_path' hwhandler='0' wp=rw
+`-+- policy='service-time 0' prio=1 status=active
+  |- 3:0:0:{index} sd{index}a 8:16 active ready running
+  `- 4:0:0:{index} sd{index}b 8:32 active ready running
+"""
+ROUNDS = 5
+
+
+def wwn_of(index):
+    return '6001738cfc9035e8{:016x}'.format(index)
+
+
+def multipath_output(maps):
+    return ''.join(MAP_TEMPLATE.format(index=index, wwn=wwn_of(index))
+                   for index in range(maps))
+
+
+def regex_search(cmd_out, wwn):
+    """
+    The search by a regex on every line of the whole output
+    """
+    for line in cmd_out.split('\n'):
+        if re.search('{wwn}.* IBM'.format(wwn=wwn), line,
+                     flags=re.IGNORECASE):
+            return line.split()[0]
+    return None
+
+
+def early_exit_search(cmd_out, wwn):
+    mp_map = find_multipath_map(BytesIO(cmd_out), wwn)
+    return mp_map.name if mp_map else None
+
+
+def index_search(cmd_out, wwns):
+    topology = MultipathTopology.parse(BytesIO(cmd_out))
+    return [topology.find(wwn) for wwn in wwns]
+
+
+def measure(func, *args):
+    start = time.time()
+    for _ in range(ROUNDS):
+        func(*args)
+    return (time.time() - start) / ROUNDS
+
+
+def main():
+    maps = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    cmd_out = multipath_output(maps)
+    print('{} maps, {} lines, average of {} rounds'.format(
+        maps, cmd_out.count('\n'), ROUNDS))
+    for position, index in (('first', 0), ('middle', maps // 2),
+                            ('last', maps - 1), ('missing', maps)):
+        wwn = wwn_of(index)
+        assert regex_search(cmd_out, wwn) == early_exit_search(cmd_out, wwn)
+        print('{:<8} map   regex {:.4f}s   early exit {:.4f}s'.format(
+            position, measure(regex_search, cmd_out, wwn),
+            measure(early_exit_search, cmd_out, wwn)))
+
+    wwns = [wwn_of(maps * i // lookups) for i in range(lookups)]
+    print('{} lookups  regex {:.4f}s   early exit {:.4f}s   index {:.4f}s'
+          .format(lookups,
+                  measure(lambda: [regex_search(cmd_out, wwn)
+                                   for wwn in wwns]),
+                  measure(lambda: [early_exit_search(cmd_out, wwn)
+                                   for wwn in wwns]),
+                  measure(index_search, cmd_out, wwns)))
+
+
+if __name__ == '__main__':
+    main()
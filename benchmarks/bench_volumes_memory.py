@@ -0,0 +1,115 @@
+##############################################################################
+# Copyright 2016 IBM Corp.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##############################################################################
+
+"""
+Compare the peak memory (RSS) of listing the Flocker volumes of a large
+array when the whole /volumes response is decoded at once and when it is
+streamed. The array is served by a local stand-in SCBE server, and every
+listing runs in a fresh process.
+
+Usage: python benchmarks/bench_volumes_memory.py [volumes] [flocker ratio]
+"""
+
+import sys
+import resource
+import subprocess
+from mock import patch
+from ibm_storage_flocker_driver.lib.abstract_client import ConnectionInfo
+from ibm_storage_flocker_driver.lib.constants import VOL_NAME_FLOCKER_PREFIX
+from ibm_storage_flocker_driver.lib.ibm_scbe_client import (
+    IBMSCBEClientAPI, RestClient, URL_SCBE_RESOURCE_GET_AUTH,
+)
+from ibm_storage_flocker_driver.tests.fake_scbe_server import FakeSCBEServer
+
+# A volume record as returned by SCBE
+VOLUME_TEMPLATE = {
+    "array_type": "2810XIV", "array": "9835-415-6013800",
+    "array_name": "a9000", "pool_name": "s1pool2", "pool_id": "701a18900038",
+    "max_extendable_size": 113364427776, "service_compliance": "True",
+    "domain_name": "domain", "service_name": "s1", "container_name": "space",
+    "service_id": "145d5b94-d573-45da-abac-6d625cc6970d",
+    "container_id": "5bba448a-6b9a-4d91-a369-758194a88c42",
+    "storage_model": "FlashSystem A9000R", "logical_capacity": 10000000000,
+    "physical_capacity": 10234101760, "used_capacity": 0,
+    "last_update_time": "2016-10-13T10:45:52.588271",
+    "is_pending_deletion": False, "serial": "", "cg_id": "0",
+    "thin_capacity": -1, "thin_provisioning_savings": "0",
+    "perf_class": None, "compression_savings": "", "size": 10,
+    "size_unit": "GB", "io_group": "",
+}
+
+
+def serve(num_volumes, flocker_ratio):
+    server = FakeSCBEServer()
+    flocker_every = max(int(1 / flocker_ratio), 1)
+    server.collections['volumes'] = [
+        dict(VOLUME_TEMPLATE,
+             scsi_identifier='6001738CFC9035E8{:016X}'.format(i),
+             id='6001738CFC9035E8{:016X}'.format(i),
+             volume_id='{:012x}'.format(i),
+             name=('f_vol{}' if i % flocker_every == 0 else 'vol{}').format(i))
+        for i in range(num_volumes)]
+    print(server.server_port)
+    sys.stdout.flush()
+    server.serve_forever()
+
+
+def measure(mode, port):
+    con_info = ConnectionInfo('', '', '', debug_level='ERROR')
+    with patch('ibm_storage_flocker_driver.lib.ibm_scbe_client.RestClient'):
+        client = IBMSCBEClientAPI(con_info)
+    client._client = RestClient(  # pylint: disable=protected-access
+        con_info, 'http://127.0.0.1:{}/api/v1'.format(port),
+        URL_SCBE_RESOURCE_GET_AUTH)
+
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if mode == 'full':
+        vols = [vol for vol in client.list_volumes()
+                if vol.name.startswith(VOL_NAME_FLOCKER_PREFIX)]
+    else:
+        vols = client.list_volumes(name_prefix=VOL_NAME_FLOCKER_PREFIX)
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print('{} {} {}'.format(len(vols), before, after))
+
+
+def main():
+    num_volumes = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    flocker_ratio = float(sys.argv[2]) if len(sys.argv) > 2 else 0.01
+    server = subprocess.Popen(
+        [sys.executable, __file__, 'serve', str(num_volumes),
+         str(flocker_ratio)], stdout=subprocess.PIPE)
+    try:
+        port = server.stdout.readline().strip()
+        print('{} volumes, {} of them Flocker volumes'.format(
+            num_volumes, flocker_ratio))
+        for mode in ('full', 'stream'):
+            out = subprocess.check_output(
+                [sys.executable, __file__, 'measure', mode, port])
+            vols, before, after = [int(value) for value in out.split()]
+            # ru_maxrss is in KB on Linux
+            print('{:<8}{} volumes listed, peak RSS +{:.1f} MB'.format(
+                mode, vols, (after - before) / 1024.0))
+    finally:
+        server.kill()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        serve(int(sys.argv[2]), float(sys.argv[3]))
+    elif len(sys.argv) > 1 and sys.argv[1] == 'measure':
+        measure(sys.argv[2], sys.argv[3])
+    else:
+        main()
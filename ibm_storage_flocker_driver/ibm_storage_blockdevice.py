@@ -16,6 +16,7 @@
 
 import socket
 import logging
+from functools import partial
 from uuid import UUID
 from zope.interface import implementer
 from twisted.python.filepath import FilePath
@@ -30,13 +31,32 @@ from flocker.node.agents.blockdevice import (
 )
 from ibm_storage_flocker_driver.lib.host_actions import HostActions
 from ibm_storage_flocker_driver.lib import (
-    host_actions, messages,
+    host_actions, messages, lookup_scope,
 )
 from ibm_storage_flocker_driver.lib.abstract_client import (
     ConnectionInfo,
     BackendAPIClientFactory,
+    UnknownVolumeError,
+    VolumeAlreadyMappedError,
+    VolumeNotMappedError,
 )
-from ibm_storage_flocker_driver.lib.utils import logme, config_logger
+from ibm_storage_flocker_driver.lib.inventory import (
+    VolumeInventory,
+    InventoryEntry,
+    InventoryRefresher,
+)
+from ibm_storage_flocker_driver.lib.utils import (
+    logme,
+    config_logger,
+    run_concurrently,
+)
+from ibm_storage_flocker_driver.lib.deadline import with_deadline
+from ibm_storage_flocker_driver.lib.lookup_scope import (
+    with_lookup_scope,
+    memoized,
+)
+from ibm_storage_flocker_driver.lib.rescan_coalescer import RescanCoalescer
+from ibm_storage_flocker_driver.lib.multipathd import MultipathdClient
 from ibm_storage_flocker_driver.lib.constants import (
     CONF_PARAM_BACKEND_TYPE,
     CONF_PARAM_DEBUG,
@@ -53,10 +73,57 @@ from ibm_storage_flocker_driver.lib.constants import (
     VOL_NAME_DELIMITER_CLUSTER_HASHED,
     CONF_PARAM_DEFAULT_SERVICE,
     CONF_PARAM_HOSTNAME,
+    CONF_PARAM_REFRESH_INTERVAL,
+    DEFAULT_REFRESH_INTERVAL,
+    CONF_PARAM_INCREMENTAL_SYNC,
+    CONF_PARAM_FULL_SYNC_INTERVAL,
+    DEFAULT_FULL_SYNC_INTERVAL,
+    CONF_PARAM_PAGE_SIZE,
+    DEFAULT_PAGE_SIZE,
+    CONF_PARAM_VOLUME_QUERY_PUSHDOWN,
+    CONF_PARAM_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    CONF_PARAM_TOKEN_LIFETIME,
+    DEFAULT_TOKEN_LIFETIME,
+    CONF_PARAM_TOKEN_CACHE_DIR,
+    CONF_PARAM_CONNECTION_POOLS,
+    DEFAULT_CONNECTION_POOLS,
+    CONF_PARAM_MAX_CONNECTIONS_PER_HOST,
+    DEFAULT_MAX_CONNECTIONS_PER_HOST,
+    CONF_PARAM_KEEP_ALIVE,
+    CONF_PARAM_IDLE_CONNECTION_TIMEOUT,
+    DEFAULT_IDLE_CONNECTION_TIMEOUT,
+    CONF_PARAM_CONNECT_TIMEOUT,
+    DEFAULT_CONNECT_TIMEOUT,
+    CONF_PARAM_READ_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    CONF_PARAM_ENDPOINT_READ_TIMEOUTS,
+    CONF_PARAM_OPERATION_TIMEOUT,
+    DEFAULT_OPERATION_TIMEOUT,
+    CONF_PARAM_MAX_RETRIES,
+    DEFAULT_MAX_RETRIES,
+    CONF_PARAM_RETRY_BACKOFF,
+    DEFAULT_RETRY_BACKOFF,
+    CONF_PARAM_CIRCUIT_BREAKER_THRESHOLD,
+    CONF_PARAM_CIRCUIT_BREAKER_RESET_TIMEOUT,
+    DEFAULT_CIRCUIT_BREAKER_RESET_TIMEOUT,
+    CONF_PARAM_COALESCE_REQUESTS,
+    CONF_PARAM_BATCH_WINDOW,
+    DEFAULT_BATCH_WINDOW,
+    CONF_PARAM_OPTIMISTIC_ATTACH_DETACH,
+    DEFAULT_OPTIMISTIC_ATTACH_DETACH,
+    CONF_PARAM_RESCAN_WINDOW,
+    DEFAULT_RESCAN_WINDOW,
+    CONF_PARAM_TARGETED_LUN_SCAN,
+    DEFAULT_TARGETED_LUN_SCAN,
+    CONF_PARAM_USE_MULTIPATHD,
+    DEFAULT_USE_MULTIPATHD,
 )
 
 LOG = config_logger(logging.getLogger(__name__))
 PREFIX = 'API'  # log prefix
+INVENTORY_MAX_AGE = 10  # seconds to serve lookups from the volume inventory
+INVENTORY_STALE_FACTOR = 3  # refresh intervals before the inventory is stale
 
 
 def get_ibm_storage_backend_by_conf(cluster_id, conf_dict):
@@ -81,17 +148,47 @@ def get_ibm_storage_backend_by_conf(cluster_id, conf_dict):
     hostname = conf_dict.get(CONF_PARAM_HOSTNAME)
     hostname_aligned = unicode(hostname) if hostname else None
 
+    refresh_interval = get_seconds_from_conf(
+        conf_dict, CONF_PARAM_REFRESH_INTERVAL, DEFAULT_REFRESH_INTERVAL)
+    operation_timeout = get_seconds_from_conf(
+        conf_dict, CONF_PARAM_OPERATION_TIMEOUT, DEFAULT_OPERATION_TIMEOUT)
+    optimistic_attach_detach = conf_dict.get(
+        CONF_PARAM_OPTIMISTIC_ATTACH_DETACH, DEFAULT_OPTIMISTIC_ATTACH_DETACH)
+    if not isinstance(optimistic_attach_detach, bool):
+        raise YMLFileWrongValue(CONF_PARAM_OPTIMISTIC_ATTACH_DETACH, bool)
+    rescan_window = get_seconds_from_conf(
+        conf_dict, CONF_PARAM_RESCAN_WINDOW, DEFAULT_RESCAN_WINDOW)
+    targeted_lun_scan = conf_dict.get(
+        CONF_PARAM_TARGETED_LUN_SCAN, DEFAULT_TARGETED_LUN_SCAN)
+    if not isinstance(targeted_lun_scan, bool):
+        raise YMLFileWrongValue(CONF_PARAM_TARGETED_LUN_SCAN, bool)
+    use_multipathd = conf_dict.get(
+        CONF_PARAM_USE_MULTIPATHD, DEFAULT_USE_MULTIPATHD)
+    if not isinstance(use_multipathd, bool):
+        raise YMLFileWrongValue(CONF_PARAM_USE_MULTIPATHD, bool)
+
     driver_conf = {
         str(CONF_PARAM_DEFAULT_SERVICE): default_resource,
         str(CONF_PARAM_HOSTNAME): hostname_aligned,
+        str(CONF_PARAM_REFRESH_INTERVAL): refresh_interval,
+        str(CONF_PARAM_OPERATION_TIMEOUT): operation_timeout,
+        str(CONF_PARAM_OPTIMISTIC_ATTACH_DETACH): optimistic_attach_detach,
+        str(CONF_PARAM_RESCAN_WINDOW): rescan_window,
+        str(CONF_PARAM_TARGETED_LUN_SCAN): targeted_lun_scan,
+        str(CONF_PARAM_USE_MULTIPATHD): use_multipathd,
     }
 
-    return IBMStorageBlockDeviceAPI(
+    api = IBMStorageBlockDeviceAPI(
         backend_client=client,
         cluster_id=cluster_id,
         driver_conf=driver_conf,
     )
 
+    # Warm up the backend host records used by attach and detach
+    client.preload_host(api.compute_instance_id())
+
+    return api
+
 
 def get_connection_info_from_conf(conf_dict):
     """
@@ -111,6 +208,100 @@ def get_connection_info_from_conf(conf_dict):
 
     port = conf_dict.get(CONF_PARAM_PORT)  # default set by the client object
 
+    # Optional client tuning, only the configured ones are passed
+    options = {}
+    if CONF_PARAM_INCREMENTAL_SYNC in conf_dict:
+        incremental_sync = conf_dict[CONF_PARAM_INCREMENTAL_SYNC]
+        if not isinstance(incremental_sync, bool):
+            raise YMLFileWrongValue(CONF_PARAM_INCREMENTAL_SYNC, bool)
+        options[CONF_PARAM_INCREMENTAL_SYNC] = incremental_sync
+    if CONF_PARAM_FULL_SYNC_INTERVAL in conf_dict:
+        options[CONF_PARAM_FULL_SYNC_INTERVAL] = get_seconds_from_conf(
+            conf_dict, CONF_PARAM_FULL_SYNC_INTERVAL,
+            DEFAULT_FULL_SYNC_INTERVAL)
+    if CONF_PARAM_PAGE_SIZE in conf_dict:
+        options[CONF_PARAM_PAGE_SIZE] = get_int_from_conf(
+            conf_dict, CONF_PARAM_PAGE_SIZE, DEFAULT_PAGE_SIZE)
+    if CONF_PARAM_VOLUME_QUERY_PUSHDOWN in conf_dict:
+        query_pushdown = conf_dict[CONF_PARAM_VOLUME_QUERY_PUSHDOWN]
+        if not isinstance(query_pushdown, bool):
+            raise YMLFileWrongValue(CONF_PARAM_VOLUME_QUERY_PUSHDOWN, bool)
+        options[CONF_PARAM_VOLUME_QUERY_PUSHDOWN] = query_pushdown
+    if CONF_PARAM_MAX_CONCURRENT_REQUESTS in conf_dict:
+        options[CONF_PARAM_MAX_CONCURRENT_REQUESTS] = get_int_from_conf(
+            conf_dict, CONF_PARAM_MAX_CONCURRENT_REQUESTS,
+            DEFAULT_MAX_CONCURRENT_REQUESTS, minimum=1)
+    if CONF_PARAM_TOKEN_LIFETIME in conf_dict:
+        options[CONF_PARAM_TOKEN_LIFETIME] = get_seconds_from_conf(
+            conf_dict, CONF_PARAM_TOKEN_LIFETIME, DEFAULT_TOKEN_LIFETIME)
+    if CONF_PARAM_TOKEN_CACHE_DIR in conf_dict:
+        token_cache_dir = conf_dict[CONF_PARAM_TOKEN_CACHE_DIR]
+        if not isinstance(token_cache_dir, basestring):
+            raise YMLFileWrongValue(CONF_PARAM_TOKEN_CACHE_DIR,
+                                    'a directory path')
+        options[CONF_PARAM_TOKEN_CACHE_DIR] = token_cache_dir
+    if CONF_PARAM_CONNECTION_POOLS in conf_dict:
+        options[CONF_PARAM_CONNECTION_POOLS] = get_int_from_conf(
+            conf_dict, CONF_PARAM_CONNECTION_POOLS, DEFAULT_CONNECTION_POOLS,
+            minimum=1)
+    if CONF_PARAM_MAX_CONNECTIONS_PER_HOST in conf_dict:
+        options[CONF_PARAM_MAX_CONNECTIONS_PER_HOST] = get_int_from_conf(
+            conf_dict, CONF_PARAM_MAX_CONNECTIONS_PER_HOST,
+            DEFAULT_MAX_CONNECTIONS_PER_HOST, minimum=1)
+    if CONF_PARAM_KEEP_ALIVE in conf_dict:
+        keep_alive = conf_dict[CONF_PARAM_KEEP_ALIVE]
+        if not isinstance(keep_alive, bool):
+            raise YMLFileWrongValue(CONF_PARAM_KEEP_ALIVE, bool)
+        options[CONF_PARAM_KEEP_ALIVE] = keep_alive
+    if CONF_PARAM_IDLE_CONNECTION_TIMEOUT in conf_dict:
+        options[CONF_PARAM_IDLE_CONNECTION_TIMEOUT] = get_seconds_from_conf(
+            conf_dict, CONF_PARAM_IDLE_CONNECTION_TIMEOUT,
+            DEFAULT_IDLE_CONNECTION_TIMEOUT)
+    if CONF_PARAM_CONNECT_TIMEOUT in conf_dict:
+        options[CONF_PARAM_CONNECT_TIMEOUT] = get_seconds_from_conf(
+            conf_dict, CONF_PARAM_CONNECT_TIMEOUT, DEFAULT_CONNECT_TIMEOUT)
+    if CONF_PARAM_READ_TIMEOUT in conf_dict:
+        options[CONF_PARAM_READ_TIMEOUT] = get_seconds_from_conf(
+            conf_dict, CONF_PARAM_READ_TIMEOUT, DEFAULT_READ_TIMEOUT)
+    if CONF_PARAM_ENDPOINT_READ_TIMEOUTS in conf_dict:
+        endpoint_timeouts = conf_dict[CONF_PARAM_ENDPOINT_READ_TIMEOUTS]
+        if not isinstance(endpoint_timeouts, dict) or not all(
+                isinstance(endpoint, basestring)
+                for endpoint in endpoint_timeouts):
+            raise YMLFileWrongValue(CONF_PARAM_ENDPOINT_READ_TIMEOUTS,
+                                    'a dict of endpoint: seconds')
+        options[CONF_PARAM_ENDPOINT_READ_TIMEOUTS] = {
+            '/' + endpoint.strip('/'): get_seconds_from_conf(
+                endpoint_timeouts, endpoint, DEFAULT_READ_TIMEOUT)
+            for endpoint in endpoint_timeouts}
+    if CONF_PARAM_MAX_RETRIES in conf_dict:
+        options[CONF_PARAM_MAX_RETRIES] = get_int_from_conf(
+            conf_dict, CONF_PARAM_MAX_RETRIES, DEFAULT_MAX_RETRIES)
+    if CONF_PARAM_RETRY_BACKOFF in conf_dict:
+        options[CONF_PARAM_RETRY_BACKOFF] = get_seconds_from_conf(
+            conf_dict, CONF_PARAM_RETRY_BACKOFF, DEFAULT_RETRY_BACKOFF)
+    if CONF_PARAM_CIRCUIT_BREAKER_THRESHOLD in conf_dict:
+        threshold = conf_dict[CONF_PARAM_CIRCUIT_BREAKER_THRESHOLD]
+        if isinstance(threshold, bool) or \
+                not isinstance(threshold, (int, long, float)) or \
+                not 0 <= threshold <= 1:
+            raise YMLFileWrongValue(CONF_PARAM_CIRCUIT_BREAKER_THRESHOLD,
+                                    'an error rate between 0 and 1')
+        options[CONF_PARAM_CIRCUIT_BREAKER_THRESHOLD] = threshold
+    if CONF_PARAM_CIRCUIT_BREAKER_RESET_TIMEOUT in conf_dict:
+        options[CONF_PARAM_CIRCUIT_BREAKER_RESET_TIMEOUT] = \
+            get_seconds_from_conf(
+                conf_dict, CONF_PARAM_CIRCUIT_BREAKER_RESET_TIMEOUT,
+                DEFAULT_CIRCUIT_BREAKER_RESET_TIMEOUT)
+    if CONF_PARAM_COALESCE_REQUESTS in conf_dict:
+        coalesce_requests = conf_dict[CONF_PARAM_COALESCE_REQUESTS]
+        if not isinstance(coalesce_requests, bool):
+            raise YMLFileWrongValue(CONF_PARAM_COALESCE_REQUESTS, bool)
+        options[CONF_PARAM_COALESCE_REQUESTS] = coalesce_requests
+    if CONF_PARAM_BATCH_WINDOW in conf_dict:
+        options[CONF_PARAM_BATCH_WINDOW] = get_seconds_from_conf(
+            conf_dict, CONF_PARAM_BATCH_WINDOW, DEFAULT_BATCH_WINDOW)
+
     # Define Connection info from the configuration
     return ConnectionInfo(
         conf_dict[u"management_ip"],
@@ -119,9 +310,44 @@ def get_connection_info_from_conf(conf_dict):
         port=port,
         verify_ssl=verify_ssl,
         debug_level=debug,
+        options=options,
     )
 
 
+def get_seconds_from_conf(conf_dict, param, default):
+    """
+    Get a duration parameter from the configuration dict.
+    :param conf_dict:
+    :param param: The parameter name
+    :param default: The value if the parameter is not configured
+    :raise YMLFileWrongValue: if the value is not a non-negative number
+    :return: number of seconds
+    """
+    value = conf_dict.get(param, default)
+    if isinstance(value, bool) or \
+            not isinstance(value, (int, long, float)) or value < 0:
+        raise YMLFileWrongValue(param, 'a non-negative number of seconds')
+    return value
+
+
+def get_int_from_conf(conf_dict, param, default, minimum=0):
+    """
+    Get an integer parameter from the configuration dict.
+    :param conf_dict:
+    :param param: The parameter name
+    :param default: The value if the parameter is not configured
+    :param minimum: The minimal legal value
+    :raise YMLFileWrongValue: if the value is not an integer >= minimum
+    :return: int
+    """
+    value = conf_dict.get(param, default)
+    if isinstance(value, bool) or \
+            not isinstance(value, (int, long)) or value < minimum:
+        raise YMLFileWrongValue(
+            param, 'an integer of at least {}'.format(minimum))
+    return value
+
+
 def verify_default_service_exists(default_service_name, client):
     """
     Check if default service exists or at least one service is available
@@ -278,14 +504,58 @@ class IBMStorageBlockDeviceAPI(object):
         self._storage_resource = driver_conf[CONF_PARAM_DEFAULT_SERVICE]
         self._instance_id = self._get_host(driver_conf)
         self._cluster_id_slug = uuid2slug(self._cluster_id)
-        self._host_ops = HostActions(backend_client.con_info.debug_level)
+        self._host_ops = HostActions(
+            backend_client.con_info.debug_level,
+            multipathd=MultipathdClient() if driver_conf.get(
+                CONF_PARAM_USE_MULTIPATHD, DEFAULT_USE_MULTIPATHD) else None)
         self._is_multipathing = self._host_ops.is_multipath_active()
+        self._inventory = VolumeInventory(INVENTORY_MAX_AGE)
+        self._refresher = self._start_inventory_refresher(driver_conf.get(
+            CONF_PARAM_REFRESH_INTERVAL, DEFAULT_REFRESH_INTERVAL))
+        self._operation_timeout = driver_conf.get(
+            CONF_PARAM_OPERATION_TIMEOUT, DEFAULT_OPERATION_TIMEOUT)
+        self._optimistic_attach_detach = driver_conf.get(
+            CONF_PARAM_OPTIMISTIC_ATTACH_DETACH,
+            DEFAULT_OPTIMISTIC_ATTACH_DETACH)
+        self._targeted_lun_scan = driver_conf.get(
+            CONF_PARAM_TARGETED_LUN_SCAN, DEFAULT_TARGETED_LUN_SCAN)
+        # concurrent attach and detach operations share their host rescans
+        self._rescan_coalescer = RescanCoalescer(
+            self._rescan_host, driver_conf.get(
+                CONF_PARAM_RESCAN_WINDOW, DEFAULT_RESCAN_WINDOW))
         LOG.info(messages.DRIVER_INITIALIZATION.format(
             backend_type=self._client.backend_type,
             backend_ip=self._client.con_info.management_ip,
             username=self._client.con_info.credential['username'],
         ))
 
+    def _start_inventory_refresher(self, interval):
+        """
+        Start the background inventory refresher, if enabled.
+        :param interval: Seconds between refreshes, 0 disables the refresher
+        :return: InventoryRefresher or None
+        """
+        if not interval:
+            return None
+        refresher = InventoryRefresher(
+            self._refresh_inventory,
+            interval,
+            stale_after=max(interval * INVENTORY_STALE_FACTOR,
+                            INVENTORY_MAX_AGE),
+        )
+        refresher.start()
+        return refresher
+
+    def inventory_refresh_stats(self):
+        """
+        :return: dict with the background refresh metrics
+                 (age, duration, refreshes, failures, stale, last_error)
+                 or None if the refresher is disabled
+        """
+        if self._refresher is None:
+            return None
+        return self._refresher.stats()
+
     @staticmethod
     def _get_host(driver_conf):
         hostname = driver_conf[CONF_PARAM_HOSTNAME] or \
@@ -301,10 +571,26 @@ class IBMStorageBlockDeviceAPI(object):
         :raise: UnknownVolume - in case the volume does not exist
         :return: BlockDeviceVolume
         """
-        return self._get_blockdevicevolume_by_vol(
-            self._get_volume_object(blockdevice_id)
-        )
+        return self._get_volume_and_object(blockdevice_id)[0]
+
+    @memoized
+    def _get_volume_and_object(self, blockdevice_id):
+        """
+        Return BlockDeviceVolume and VolInfo if exists, else raise exception.
+        Served from the volume inventory when it holds a fresh entry.
+
+        :param unicode blockdevice_id: Name of the volume to check
+        :raise: UnknownVolume - in case the volume does not exist
+        :return: tuple of (BlockDeviceVolume, VolInfo)
+        """
+        entry = self._inventory.get(blockdevice_id)
+        if entry is not None:
+            return self._get_blockdevicevolume_by_entry(entry), entry.vol_info
 
+        vol_info = self._get_volume_object(blockdevice_id)
+        return self._get_blockdevicevolume_by_vol(vol_info), vol_info
+
+    @memoized
     def _get_volume_object(self, blockdevice_id):
         """
         Return VolInfo if exist else raise exception.
@@ -313,6 +599,10 @@ class IBMStorageBlockDeviceAPI(object):
         :raise: UnknownVolume - in case volume not exist
         :return: BlockDeviceVolume
         """
+        entry = self._inventory.get(blockdevice_id)
+        if entry is not None:
+            return entry.vol_info
+
         vol_objs = self._client.list_volumes(wwn=blockdevice_id)
         if not vol_objs:
             LOG.error("Volume does not exists: " + str(blockdevice_id))
@@ -358,6 +648,8 @@ class IBMStorageBlockDeviceAPI(object):
         return self._client.allocation_unit()
 
     @logme(LOG, PREFIX)
+    @with_deadline('_operation_timeout')
+    @with_lookup_scope
     def create_volume_with_profile(self, dataset_id, size, profile_name):
         """
         Create a new volume with the specified profile.
@@ -386,10 +678,13 @@ class IBMStorageBlockDeviceAPI(object):
             size=vol_obj.size,
             profile=profile_name,
             wwn=vol_obj.wwn))
+        self._inventory.put(vol_obj, dataset_id)
 
         return _get_blockdevicevolume(dataset_id, vol_obj.wwn, vol_obj.size)
 
     @logme(LOG, PREFIX)
+    @with_deadline('_operation_timeout')
+    @with_lookup_scope
     def create_volume(self, dataset_id, size):
         """
         Create a new volume.
@@ -412,6 +707,8 @@ class IBMStorageBlockDeviceAPI(object):
                                                default_profile)
 
     @logme(LOG, PREFIX)
+    @with_deadline('_operation_timeout')
+    @with_lookup_scope
     def destroy_volume(self, blockdevice_id):
         """
         Destroy an existing volume.
@@ -424,13 +721,19 @@ class IBMStorageBlockDeviceAPI(object):
         """
         # raise exception if not exist
         vol = self._get_volume_object(blockdevice_id)
-        self._client.delete_volume(blockdevice_id)
+        try:
+            self._client.delete_volume(blockdevice_id)
+        finally:
+            self._inventory.remove(blockdevice_id)
+            lookup_scope.invalidate()
         LOG.info(messages.DRIVER_OPERATION_VOL_DESTROY.format(
             volname=vol.name,
             wwn=blockdevice_id,
         ))
 
     @logme(LOG, PREFIX)
+    @with_deadline('_operation_timeout')
+    @with_lookup_scope
     def attach_volume(self, blockdevice_id, attach_to):
         """
         Attach ``blockdevice_id`` to ``host``.
@@ -447,30 +750,80 @@ class IBMStorageBlockDeviceAPI(object):
         :returns: A ``BlockDeviceVolume`` with a ``host`` attribute set to
             ``host``.
         """
-        # Raises UnknownVolume
-        volume = self._get_volume(blockdevice_id)
-
-        # raises AlreadyAttachedVolume
-        if volume.attached_to is not None:
-            LOG.error("Could Not attach Volume {} is already attached".
-                      format(str(blockdevice_id)))
-            raise AlreadyAttachedVolume(blockdevice_id)
-
-        # Try to map the volume
-        self._client.map_volume(wwn=blockdevice_id, host=attach_to)
-
-        attached_volume = volume.set(attached_to=attach_to)
-        LOG.info(messages.DRIVER_OPERATION_VOL_ATTACH.format(
-            blockdevice_id=blockdevice_id, attach_to=attach_to))
+        attached_volume, lun = self._attach_volume(blockdevice_id, attach_to)
 
         # Rescan the OS to discover the attached volume
         LOG.info(messages.DRIVER_OPERATION_VOL_RESCAN_START_ATTACH.format(
             blockdevice_id=blockdevice_id))
-        self._host_ops.rescan_scsi()
+        self._rescan_coalescer.rescan(
+            self._rescan_target(blockdevice_id, attach_to, lun))
 
         return attached_volume
 
     @logme(LOG, PREFIX)
+    @with_deadline('_operation_timeout')
+    def attach_volumes(self, attachments):
+        """
+        Attach several volumes, the volumes are mapped concurrently and the
+        host is rescanned once for all of them.
+
+        :param attachments: list of (blockdevice_id, attach_to)
+        :returns: list with the attached ``BlockDeviceVolume`` of each
+            attachment, or the exception it failed with (e.g
+            ``UnknownVolume``), in the order of the attachments.
+        """
+        results = self._run_batch(
+            [partial(self._attach_volume, blockdevice_id, attach_to)
+             for blockdevice_id, attach_to in attachments])
+        attached = [result for result in results
+                    if not isinstance(result, Exception)]
+        if attached:
+            LOG.info(messages.DRIVER_OPERATION_VOL_RESCAN_START_ATTACH.format(
+                blockdevice_id=', '.join(
+                    volume.blockdevice_id for volume, _ in attached)))
+            targets = {self._rescan_target(
+                volume.blockdevice_id, volume.attached_to, lun)
+                for volume, lun in attached}
+            if None in targets:
+                targets = {None}  # the full rescan discovers all of them
+            self._rescan_coalescer.rescan(*targets)
+        return [result if isinstance(result, Exception) else result[0]
+                for result in results]
+
+    def _attach_volume(self, blockdevice_id, attach_to):
+        """
+        Map the volume to the host, without rescanning the host.
+
+        :raise UnknownVolume, AlreadyAttachedVolume:
+        :return: The attached ``BlockDeviceVolume``, and the LUN of its
+                 mapping (None if unknown)
+        """
+        # Raises UnknownVolume, AlreadyAttachedVolume
+        if self._optimistic_attach_detach:
+            volume, lun = self._map_volume_optimistic(
+                blockdevice_id, attach_to)
+        else:
+            volume, lun = self._map_volume_checked(blockdevice_id, attach_to)
+        self._inventory.set_attached(blockdevice_id, attach_to)
+
+        LOG.info(messages.DRIVER_OPERATION_VOL_ATTACH.format(
+            blockdevice_id=blockdevice_id, attach_to=attach_to))
+        return volume.set(attached_to=attach_to), lun
+
+    def _rescan_target(self, blockdevice_id, attach_to, lun):
+        """
+        :return: The (lun, blockdevice_id) to scan for the attached volume,
+                 or None for a full rescan (targeted LUN scan disabled, LUN
+                 unknown, or the volume was attached to another node)
+        """
+        if not self._targeted_lun_scan or lun is None or \
+                attach_to != self._instance_id:
+            return None
+        return lun, blockdevice_id
+
+    @logme(LOG, PREFIX)
+    @with_deadline('_operation_timeout')
+    @with_lookup_scope
     def detach_volume(self, blockdevice_id):
         """
         Detach ``blockdevice_id`` from whatever host it is attached to.
@@ -484,6 +837,204 @@ class IBMStorageBlockDeviceAPI(object):
             not attached to anything.
         :returns: ``None``
         """
+        devices = self._detach_volume(blockdevice_id)
+
+        # Remove the devices of the detached volume from the OS
+        self._remove_devices({blockdevice_id: devices})
+
+    @logme(LOG, PREFIX)
+    @with_deadline('_operation_timeout')
+    def detach_volumes(self, blockdevice_ids):
+        """
+        Detach several volumes, the volumes are unmapped concurrently and
+        their devices are removed together (or the host is rescanned once
+        for all of them).
+
+        :param blockdevice_ids: list of the unique identifiers of the block
+            devices being detached.
+        :returns: list with ``None`` for each detached volume, or the
+            exception it failed with (e.g ``UnattachedVolume``), in the
+            order of the volumes.
+        """
+        results = self._run_batch(
+            [partial(self._detach_volume, blockdevice_id)
+             for blockdevice_id in blockdevice_ids])
+        detached = {blockdevice_id: devices for blockdevice_id, devices
+                    in zip(blockdevice_ids, results)
+                    if not isinstance(devices, Exception)}
+        if detached:
+            self._remove_devices(detached)
+        return [result if isinstance(result, Exception) else None
+                for result in results]
+
+    def _detach_volume(self, blockdevice_id):
+        """
+        Unmap the volume from its host, without rescanning the host.
+
+        :raise UnknownVolume, UnattachedVolume:
+        :return: The SCSI devices of the volume on this node to remove, or
+                 None if unknown
+        """
+        # raises UnknownVolume, UnattachedVolume
+        if self._optimistic_attach_detach:
+            detached_from, devices = self._unmap_volume_optimistic(
+                blockdevice_id)
+        else:
+            detached_from, devices = self._unmap_volume_checked(
+                blockdevice_id)
+        self._inventory.set_attached(blockdevice_id, None)
+        LOG.info(messages.DRIVER_OPERATION_VOL_DETTACH.format(
+            blockdevice_id=blockdevice_id, attach_to=detached_from))
+        return devices
+
+    def _remove_devices(self, detached):
+        """
+        Remove the SCSI devices of detached volumes from the OS. Only the
+        recorded devices are removed, the host is rescanned (once for all
+        the volumes) if the devices of a volume are unknown or cannot be
+        removed.
+        :param detached: dict of blockdevice_id: the SCSI devices of the
+                         volume, or None if unknown
+        :return: None
+        """
+        unknown = [blockdevice_id for blockdevice_id, devices
+                   in detached.items() if devices is None]
+        devices = sorted(set(sum(
+            [devices for devices in detached.values() if devices], [])))
+        if devices:
+            LOG.info(messages.DRIVER_OPERATION_VOL_RESCAN_START_DELETE.format(
+                devices=devices, blockdevice_id=', '.join(
+                    blockdevice_id for blockdevice_id in detached
+                    if blockdevice_id not in unknown)))
+            try:
+                self._host_ops.delete_scsi_devices(devices)
+            except (IOError, OSError) as e:
+                LOG.warn(messages.DEVICE_DELETE_FAILED.format(
+                    devices=devices, exception=e))
+                unknown = list(detached)
+        if unknown:
+            LOG.info(messages.DRIVER_OPERATION_VOL_RESCAN_START_DETACH.format(
+                blockdevice_id=', '.join(unknown)))
+            self._rescan_coalescer.rescan()
+
+    @staticmethod
+    def _run_batch(calls):
+        """
+        Run the calls of a batch operation concurrently, each within its own
+        lookup scope.
+        :param calls: list of callables without arguments
+        :return: list of the result of each call, or the exception it failed
+                 with
+        """
+        def run(call):
+            with lookup_scope.lookup_scope():
+                try:
+                    return call()
+                except Exception as e:  # pylint: disable=broad-except
+                    return e
+        return run_concurrently([partial(run, call) for call in calls])
+
+    def _rescan_host(self, targets):
+        """
+        Rescan the host, run by the rescan coalescer.
+        :param targets: list of the (lun, blockdevice_id) to scan, None for
+                        a full rescan
+        """
+        if None in targets:
+            self._host_ops.rescan_scsi()
+        else:
+            self._host_ops.discover_luns(
+                [lun for lun, _ in targets],
+                [blockdevice_id for _, blockdevice_id in targets])
+
+    def rescan_stats(self):
+        """
+        :return: dict of the rescan requests of attach and detach, and the
+                 rescans that ran for them
+        """
+        return self._rescan_coalescer.stats()
+
+    def _map_volume_checked(self, blockdevice_id, attach_to):
+        """
+        Look up the volume and its mapping, then map it.
+
+        :raise UnknownVolume, AlreadyAttachedVolume:
+        :return: BlockDeviceVolume of the volume before the attach, and the
+                 LUN of the mapping
+        """
+        # Raises UnknownVolume
+        volume = self._get_volume(blockdevice_id)
+
+        # raises AlreadyAttachedVolume
+        if volume.attached_to is not None:
+            LOG.error("Could Not attach Volume {} is already attached".
+                      format(str(blockdevice_id)))
+            raise AlreadyAttachedVolume(blockdevice_id)
+
+        # Try to map the volume
+        try:
+            lun = self._client.map_volume(wwn=blockdevice_id, host=attach_to)
+        except Exception:
+            self._inventory.invalidate(blockdevice_id)
+            raise
+        finally:
+            lookup_scope.invalidate()  # the mapping changed
+        return volume, lun
+
+    def _map_volume_optimistic(self, blockdevice_id, attach_to):
+        """
+        Map the volume without looking up its mapping first, the backend
+        rejects the mapping of a mapped volume. The mapping is looked up
+        only if the backend rejects the request for an unknown reason.
+
+        :raise UnknownVolume, AlreadyAttachedVolume:
+        :return: BlockDeviceVolume of the volume before the attach, and the
+                 LUN of the mapping
+        """
+        # Raises UnknownVolume (served by the inventory when fresh)
+        vol_info = self._get_volume_object(blockdevice_id)
+        if not self._is_cluster_volume(vol_info.name):
+            raise UnknownVolume(blockdevice_id)
+
+        try:
+            lun = self._client.map_volume(wwn=blockdevice_id, host=attach_to)
+        except UnknownVolumeError:
+            self._inventory.remove(blockdevice_id)
+            raise UnknownVolume(blockdevice_id)
+        except VolumeAlreadyMappedError:
+            self._inventory.invalidate(blockdevice_id)
+            raise AlreadyAttachedVolume(blockdevice_id)
+        except Exception:
+            self._inventory.invalidate(blockdevice_id)
+            lookup_scope.invalidate()
+            if self._is_attached(blockdevice_id):
+                raise AlreadyAttachedVolume(blockdevice_id)
+            raise
+        finally:
+            lookup_scope.invalidate()  # the mapping changed
+        return _get_blockdevicevolume(
+            get_dataset_id_from_vol_name(vol_info.name),
+            vol_info.wwn,
+            vol_info.size), lun
+
+    def _is_attached(self, blockdevice_id):
+        """
+        :return: True if the volume is attached, False if it is not or its
+                 state cannot be looked up
+        """
+        try:
+            return self._get_volume(blockdevice_id).attached_to is not None
+        except Exception:  # pylint: disable=broad-except
+            return False
+
+    def _unmap_volume_checked(self, blockdevice_id):
+        """
+        Look up the volume and its mapping, then unmap it from its host.
+
+        :raise UnknownVolume, UnattachedVolume:
+        :return: The host the volume was detached from, and its SCSI devices
+                 on this node (None if unknown)
+        """
         # raises UnknownVolume
         volume = self._get_volume(blockdevice_id)
 
@@ -493,15 +1044,74 @@ class IBMStorageBlockDeviceAPI(object):
                       format(str(blockdevice_id)))
             raise UnattachedVolume(blockdevice_id)
 
-        self._clean_up_device_before_unmap(blockdevice_id)
-        self._client.unmap_volume(wwn=blockdevice_id, host=volume.attached_to)
-        LOG.info(messages.DRIVER_OPERATION_VOL_DETTACH.format(
-            blockdevice_id=blockdevice_id, attach_to=volume.attached_to))
+        devices = self._clean_up_device_before_unmap(blockdevice_id)
+        try:
+            self._client.unmap_volume(
+                wwn=blockdevice_id, host=volume.attached_to)
+        except Exception:
+            self._inventory.invalidate(blockdevice_id)
+            raise
+        finally:
+            lookup_scope.invalidate()  # the mapping changed
+        return volume.attached_to, devices
+
+    def _unmap_volume_optimistic(self, blockdevice_id):
+        """
+        Unmap the volume from this node without looking it up first.
+        If the backend says it is not mapped to this node, or rejects the
+        request for an unknown reason, fall back to looking up its mapping.
 
-        # Rescan the OS to clean the detached volume
-        LOG.info(messages.DRIVER_OPERATION_VOL_RESCAN_START_ATTACH.format(
-            blockdevice_id=blockdevice_id))
-        self._host_ops.rescan_scsi()
+        :raise UnknownVolume, UnattachedVolume:
+        :return: The host the volume was detached from, and its SCSI devices
+                 on this node (None if unknown)
+        """
+        # Raises UnknownVolume (served by the inventory when fresh)
+        vol_info = self._get_volume_object(blockdevice_id)
+        if not self._is_cluster_volume(vol_info.name):
+            raise UnknownVolume(blockdevice_id)
+
+        host = self._instance_id
+        devices = self._clean_up_local_device(blockdevice_id)
+        try:
+            self._client.unmap_volume(wwn=blockdevice_id, host=host)
+        except UnknownVolumeError:
+            self._inventory.remove(blockdevice_id)
+            raise UnknownVolume(blockdevice_id)
+        except VolumeNotMappedError:
+            LOG.info(messages.OPTIMISTIC_DETACH_FALLBACK.format(
+                wwn=blockdevice_id, host=host))
+            lookup_scope.invalidate()
+            return self._unmap_volume_checked(blockdevice_id)
+        except Exception as e:  # pylint: disable=broad-except
+            LOG.warn(messages.OPTIMISTIC_DETACH_REJECTED.format(
+                wwn=blockdevice_id, host=host, exception=e))
+            self._inventory.invalidate(blockdevice_id)
+            lookup_scope.invalidate()
+            return self._unmap_volume_checked(blockdevice_id)
+        finally:
+            lookup_scope.invalidate()  # the mapping changed
+        return host, devices
+
+    def _clean_up_local_device(self, blockdevice_id):
+        """
+        Clean the multipath device of the volume on this node, if there is
+        one, without looking up the volume in the backend.
+        :param blockdevice_id:
+        :return: The SCSI devices of the multipath device, or None if unknown
+        """
+        if not self._is_multipathing:
+            LOG.debug(messages.NO_NEED_TO_CLEAN_IF_NO_MULTIPATHING)
+            return None
+        try:
+            device_path = self._host_ops.get_multipath_device(
+                vol_wwn=blockdevice_id)
+        except (host_actions.MultipathDeviceNotFound,
+                host_actions.MultipathDeviceFilePathNotFound,
+                host_actions.CalledProcessError):
+            LOG.debug(messages.NO_DEVICE_FOUND_FOR_WWN.format(
+                wwn=blockdevice_id))
+            return None
+        return self._host_ops.clean_mp_device(device_path)
 
     @logme(LOG)
     def _clean_up_device_before_unmap(self, blockdevice_id):
@@ -520,20 +1130,20 @@ class IBMStorageBlockDeviceAPI(object):
           `- 4:0:0:3 sdg 8:96  active faulty running
 
         :param blockdevice_id:
-        :return: None
+        :return: The SCSI devices of the multipath device, or None if unknown
         """
 
         if not self._is_multipathing:
             LOG.debug(messages.NO_NEED_TO_CLEAN_IF_NO_MULTIPATHING)
-            return
+            return None
         try:
             device_path = self.get_device_path(blockdevice_id)
         except UnknownVolume:
             LOG.debug(messages.NO_DEVICE_FOUND_FOR_WWN.format(
                 wwn=blockdevice_id))
-            return
+            return None
 
-        self._host_ops.clean_mp_device(device_path.path)
+        return self._host_ops.clean_mp_device(device_path.path)
 
     def _is_cluster_volume(self, vol_name):
         """
@@ -548,6 +1158,8 @@ class IBMStorageBlockDeviceAPI(object):
         return False
 
     @logme(LOG, PREFIX)
+    @with_deadline('_operation_timeout')
+    @with_lookup_scope
     def list_volumes(self):
         """
         List all the block devices available via the back end API.
@@ -556,15 +1168,53 @@ class IBMStorageBlockDeviceAPI(object):
 
         :returns: A ``list`` of ``BlockDeviceVolume``s.
         """
+        if self._refresher is not None and \
+                self._refresher.last_success_at is None:
+            # Nothing to serve yet, so wait for the first listing
+            self._refresher.refresh()
+
+        if self._refresher is None or self._refresher.last_success_at is None:
+            # never fully loaded (e.g the first refresh was dropped)
+            generation = self._inventory.generation
+            volumes, inventory_entries = self._fetch_volumes()
+            self._inventory.replace(inventory_entries, generation)
+            return volumes
+
+        if self._refresher.is_stale():
+            LOG.warning(messages.INVENTORY_SERVED_STALE.format(
+                age=self._refresher.age(),
+                error=self._refresher.last_error))
+        return [self._get_blockdevicevolume_by_entry(entry)
+                for entry in self._inventory.entries()]
+
+    def _refresh_inventory(self):
+        """
+        List the volumes from the backend into the inventory, with the
+        write-through updates made meanwhile.
+        :return: True if the inventory was replaced
+        """
+        generation = self._inventory.generation
+        inventory_entries = self._fetch_volumes()[1]
+        return self._inventory.replace(inventory_entries, generation)
+
+    def _fetch_volumes(self):
+        """
+        List the cluster volumes from the backend.
+        :return: tuple of (list of BlockDeviceVolume, list of InventoryEntry)
+        """
         volumes = []
+        inventory_entries = []
 
-        vol_list = self._client.list_volumes(resource=self._storage_resource)
-        map_dict = self._client.get_vols_mapping()
-        host_dict = self._client.get_hosts()
+        # Get only the mappings and hosts of the cluster volumes
+        vol_list = [vol for vol in self._list_service_volumes()
+                    if self._is_cluster_volume(vol.name)]
+        map_dict = self._client.get_vols_mapping(
+            wwns=[vol.wwn for vol in vol_list]) if vol_list else {}
+        host_ids = set(map_dict.values())
+        host_dict = self._client.get_hosts(
+            host_ids=host_ids) if host_ids else {}
 
         for vol in vol_list:
-            if not self._is_cluster_volume(vol.name):
-                continue
             host_id = map_dict.get(vol.wwn)  # vol can be mapped to one host.
             hostname = host_dict.get(host_id) if host_id else None
             if hostname:
@@ -578,7 +1228,31 @@ class IBMStorageBlockDeviceAPI(object):
                 vol.size,
                 attach_to)
             volumes.append(block_device_volume)
-        return volumes
+            inventory_entries.append(
+                InventoryEntry(vol, vol_dataset_id, attach_to))
+
+        return volumes, inventory_entries
+
+    def _list_service_volumes(self):
+        """
+        :return: list of VolInfo of the cluster volumes in all the services
+        """
+        return self._client.list_volumes(
+            name_prefix=VOL_NAME_FLOCKER_PREFIX,
+            name_suffix=VOL_NAME_DELIMITER_CLUSTER_HASHED +
+            self._cluster_id_slug)
+
+    @staticmethod
+    def _get_blockdevicevolume_by_entry(entry):
+        """
+        :param entry: InventoryEntry
+        :return: BlockDeviceVolume
+        """
+        return _get_blockdevicevolume(
+            entry.dataset_id,
+            entry.vol_info.wwn,
+            entry.vol_info.size,
+            entry.attached_to)
 
     def _get_blockdevicevolume_by_vol(self, vol_obj):
         """
@@ -603,6 +1277,8 @@ class IBMStorageBlockDeviceAPI(object):
         return block_device_volume
 
     @logme(LOG, PREFIX)
+    @with_deadline('_operation_timeout')
+    @with_lookup_scope
     def get_device_path(self, blockdevice_id):
         """
         Return the device path that has been allocated to the block device on
@@ -617,8 +1293,7 @@ class IBMStorageBlockDeviceAPI(object):
         :returns: A ``FilePath`` for the device.
         """
         # raises UnknownVolume
-        vol_info = self._get_volume_object(blockdevice_id)
-        volume = self._get_blockdevicevolume_by_vol(vol_info)
+        volume, vol_info = self._get_volume_and_object(blockdevice_id)
 
         if volume.attached_to is None:
             LOG.error(messages.BLOCKDEVICE_NOT_ATTACHED_STOP_SEARCHING.
@@ -26,11 +26,37 @@ class CreateVolumeError(ExceptionStorageClient):
     pass
 
 
+class UnknownVolumeError(ExceptionStorageClient):
+
+    def __init__(self, wwn):
+        ExceptionStorageClient.__init__(
+            self, messages.VOLUME_NOT_FOUND_ON_BACKEND.format(wwn=wwn))
+        self.wwn = wwn
+
+
+class VolumeAlreadyMappedError(ExceptionStorageClient):
+
+    def __init__(self, wwn, host):
+        ExceptionStorageClient.__init__(
+            self, messages.VOLUME_ALREADY_MAPPED.format(wwn=wwn, host=host))
+        self.wwn = wwn
+        self.host = host
+
+
+class VolumeNotMappedError(ExceptionStorageClient):
+
+    def __init__(self, wwn, host):
+        ExceptionStorageClient.__init__(
+            self, messages.VOLUME_NOT_MAPPED.format(wwn=wwn, host=host))
+        self.wwn = wwn
+        self.host = host
+
+
 class ConnectionInfo(object):
     # pylint: disable=too-many-arguments
 
     def __init__(self, management_ip, username, password, port=None,
-                 verify_ssl=None, debug_level=None):
+                 verify_ssl=None, debug_level=None, options=None):
         """
         This object holds connection information about the management system.
         :param management_ip:
@@ -38,11 +64,15 @@ class ConnectionInfo(object):
         :param password:
         :param port:
         :param verify_ssl:
+        :param debug_level:
+        :param options: dict of optional client tuning parameters
+                        (keys are the CONF_PARAM_* names of the yml file)
         """
         self.management_ip = management_ip
         self.port = port
         self.verify_ssl = verify_ssl
         self.debug_level = debug_level
+        self.options = options or {}
         # TODO consider to support specific SSL certification path
         self.credential = dict(
             username=username,
@@ -89,11 +119,14 @@ class IBMStorageAbsClient(object):
         raise NotImplementedError
 
     @abc.abstractmethod
-    def list_volumes(self, wwn=None, vol_name=None, resource=None):
+    def list_volumes(self, wwn=None, vol_name=None, resource=None,
+                     name_prefix=None, name_suffix=None):
         """
         :param wwn:
         :param vol_name:
         :param resource: Relevant only for direct mode
+        :param name_prefix: List only the volumes with this name prefix
+        :param name_suffix: List only the volumes with this name suffix
         :return: list of VolInfo
         """
         raise NotImplementedError
@@ -114,7 +147,11 @@ class IBMStorageAbsClient(object):
         :param host: The host name in the storage system for mapping
         :param lun: LUN for mapping, if None the function will
                     find automatically the next available LUN.
-        :return:
+        :raise UnknownVolumeError: if the volume does not exist
+        :raise VolumeAlreadyMappedError: if the storage system rejected the
+                                         mapping because the volume is
+                                         already mapped
+        :return: The LUN of the mapping, or None if unknown
         """
         raise NotImplementedError
 
@@ -124,10 +161,22 @@ class IBMStorageAbsClient(object):
         unmap a volume from the host
         :param wwn:
         :param host:
+        :raise UnknownVolumeError: if the volume does not exist
+        :raise VolumeNotMappedError: if the volume is not mapped to the host
         :return:
         """
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def preload_host(self, host):
+        """
+        Load and cache the storage system records of the given host,
+        so later attach and detach operations do not need to look them up.
+        :param host: The host name in the storage system
+        :return: None
+        """
+        raise NotImplementedError
+
     @abc.abstractmethod
     def allocation_unit(self):
         raise NotImplementedError
@@ -167,15 +216,17 @@ class IBMStorageAbsClient(object):
         raise NotImplementedError
 
     @abc.abstractmethod
-    def get_vols_mapping(self):
+    def get_vols_mapping(self, wwns=None):
         """
+        :param wwns: list of WWNs to get the mapping of (default all)
         :return: dict of {[wwn]=[host_id],...}
         """
         raise NotImplementedError
 
     @abc.abstractmethod
-    def get_hosts(self):
+    def get_hosts(self, host_ids=None):
         """
+        :param host_ids: list of host IDs to get (default all)
         :return: dict of {[host_id]=[hostname],...}
         """
         raise NotImplementedError
@@ -0,0 +1,128 @@
+##############################################################################
+# Copyright 2016 IBM Corp.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##############################################################################
+
+
+import time
+import threading
+from ibm_storage_flocker_driver.lib import deadline
+
+
+class _Batch(object):
+
+    def __init__(self):
+        self.keys = []
+        self.done = threading.Event()
+        self.results = None
+        self.error = None
+
+    def wait(self, key):
+        while not self.done.wait(deadline.timeout()):
+            deadline.check()
+        if self.error is not None:
+            raise self.error
+        return self.results.get(key)
+
+
+class BatchLoader(object):
+    """
+    Collect the keys that callers load at the same time and load them with
+    one call of batch_func (like DataLoader). The first caller of a batch
+    waits for the window, and for the previous batch to end, while the
+    keys of the other callers join its batch. Then it loads the batch and
+    every caller gets the result of its key. Results are not cached.
+    """
+
+    def __init__(self, batch_func, window=0, max_batch_size=100):
+        """
+        :param batch_func: callable that gets a list of keys and returns a
+                           dict of key: result (missing keys get None)
+        :param window: Seconds to collect keys before loading a batch
+        :param max_batch_size: Maximum number of keys per batch
+        """
+        self._batch_func = batch_func
+        self._window = window
+        self._max_batch_size = max_batch_size
+        self._pending = None  # the batch that collects keys
+        self._loading = False  # a batch is being loaded
+        self._cond = threading.Condition()
+        self._stats = dict(loads=0, batches=0)
+
+    def load(self, key):
+        """
+        :param key: hashable key
+        :return: The result of the key (or None if batch_func skipped it)
+        """
+        return self.load_many([key])[0]
+
+    def load_many(self, keys):
+        """
+        Load keys in the same batch, which may exceed max_batch_size for
+        them.
+        :param keys: list of hashable keys
+        :return: list of the results of the keys
+        """
+        with self._cond:
+            self._stats['loads'] += len(keys)
+            batch = self._pending
+            first = batch is None or \
+                len(batch.keys) >= self._max_batch_size
+            if first:
+                batch = self._pending = _Batch()
+            for key in keys:
+                if key not in batch.keys:
+                    batch.keys.append(key)
+        if first:
+            self._dispatch(batch)
+        return [batch.wait(key) for key in keys]
+
+    def _dispatch(self, batch):
+        try:
+            self._wait_turn(batch)
+        except Exception as e:  # pylint: disable=broad-except
+            with self._cond:
+                if self._pending is batch:
+                    self._pending = None
+            batch.error = e  # e.g the deadline of the first caller
+            batch.done.set()
+            return
+        try:
+            batch.results = self._batch_func(list(batch.keys))
+        except Exception as e:  # pylint: disable=broad-except
+            batch.error = e  # raised to every caller of the batch
+        finally:
+            with self._cond:
+                self._loading = False
+                self._cond.notify()
+            batch.done.set()
+
+    def _wait_turn(self, batch):
+        if self._window:
+            time.sleep(max(deadline.timeout(self._window), 0))
+        with self._cond:
+            while self._loading:
+                self._cond.wait(deadline.timeout())
+                deadline.check()
+            self._loading = True
+            if self._pending is batch:
+                self._pending = None  # the next keys start a new batch
+            self._stats['batches'] += 1
+
+    def stats(self):
+        """
+        :return: dict of the loaded keys and the batches they were loaded in
+        """
+        with self._cond:
+            return dict(self._stats)
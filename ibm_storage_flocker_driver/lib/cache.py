@@ -0,0 +1,201 @@
+##############################################################################
+# Copyright 2016 IBM Corp.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##############################################################################
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from ibm_storage_flocker_driver.lib import messages
+from ibm_storage_flocker_driver.lib.utils import config_logger
+
+LOG = config_logger(logging.getLogger(__name__))
+
+
+class ServiceCatalog(object):
+    """
+    In-memory catalog of the storage services (service name -> service ID).
+    The catalog is loaded once and reloaded only when its TTL expires,
+    when it is invalidated or when a service name is missing from it.
+    """
+
+    def __init__(self, loader, ttl):
+        """
+        :param loader: callable that returns the list of services,
+                       each service is a dict with at least name and id.
+        :param ttl: Seconds to keep the catalog before reloading it
+        """
+        self._loader = loader
+        self._ttl = ttl
+        self._services = None
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def _is_expired(self):
+        return self._services is None or \
+            time.time() - self._loaded_at > self._ttl
+
+    def load(self):
+        """
+        Reload the catalog from the backend.
+        :return: OrderedDict of {[service name]=[service id],...}
+        """
+        services = OrderedDict()
+        for _service in self._loader():
+            # TODO should handle multiple services with same name
+            services.setdefault(_service['name'], _service['id'])
+
+        with self._lock:
+            self._services = services
+            self._loaded_at = time.time()
+        LOG.debug(messages.SERVICE_CATALOG_LOADED.format(
+            num=len(services), services=services.keys()))
+        return services
+
+    def _get_services(self):
+        """
+        :return: tuple of (services, True if the catalog was just reloaded)
+        """
+        with self._lock:
+            expired = self._is_expired()
+            services = self._services
+        if expired:
+            return self.load(), True
+        return services, False
+
+    def names(self):
+        """
+        :return: list of service names
+        """
+        return self._get_services()[0].keys()
+
+    def get_id(self, name):
+        """
+        Resolve a service name to its ID. A name that is not in the catalog
+        triggers one reload, in case the service was added after the load.
+        :param name: service name
+        :return: The service ID or None if the service does not exist
+        """
+        services, reloaded = self._get_services()
+        if name not in services and not reloaded:
+            services = self.load()
+        return services.get(name)
+
+    def invalidate(self):
+        """
+        Drop the catalog, so the next lookup reloads it.
+        """
+        with self._lock:
+            self._services = None
+            self._loaded_at = None
+
+
+class ExpiringLRUCache(object):
+    """
+    Thread safe key value cache, entries are evicted when their TTL expires
+    or when the cache is full (least recently used first).
+    """
+
+    def __init__(self, max_size, ttl):
+        """
+        :param max_size: Maximum number of entries to keep
+        :param ttl: Seconds to keep an entry
+        """
+        self._max_size = max_size
+        self._ttl = ttl
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._items.pop(key, None)
+            if item is None:
+                return default
+            value, stored_at = item
+            if time.time() - stored_at > self._ttl:
+                return default
+            # re-insert to mark the entry as the most recently used
+            self._items[key] = item
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._items.pop(key, None)
+            self._items[key] = (value, time.time())
+            while len(self._items) > self._max_size:
+                self._items.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            item = self._items.pop(key, None)
+        return default if item is None else item[0]
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+
+class HostDirectory(object):
+    """
+    Bidirectional cache of the storage system hosts:
+    (array ID, hostname) -> host ID and host ID -> hostname.
+    """
+
+    def __init__(self, max_size, ttl):
+        """
+        :param max_size: Maximum number of hosts to keep
+        :param ttl: Seconds to keep a host
+        """
+        self._ids = ExpiringLRUCache(max_size, ttl)
+        self._hosts = ExpiringLRUCache(max_size, ttl)
+
+    def add(self, host):
+        """
+        :param host: dict with the host info (at least id, array and name)
+        """
+        self._ids.set((host['array'], host['name']), host['id'])
+        self._hosts.set(host['id'], host)
+
+    def get_id(self, array_id, hostname):
+        """
+        :return: The host ID of hostname on the given array or None
+        """
+        return self._ids.get((array_id, hostname))
+
+    def get_host(self, host_id):
+        """
+        :return: dict with the host info of the given host ID or None
+        """
+        return self._hosts.get(host_id)
+
+    def invalidate(self, host_id=None, array_id=None, hostname=None):
+        """
+        Drop the host entries of the given host ID and/or array and hostname.
+        """
+        if host_id is not None:
+            host = self._hosts.pop(host_id)
+            if host:
+                self._ids.pop((host['array'], host['name']))
+        if hostname is not None:
+            host_id = self._ids.pop((array_id, hostname))
+            if host_id is not None:
+                self._hosts.pop(host_id)
+
+    def clear(self):
+        self._ids.clear()
+        self._hosts.clear()
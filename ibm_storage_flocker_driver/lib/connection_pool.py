@@ -0,0 +1,179 @@
+##############################################################################
+# Copyright 2016 IBM Corp.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##############################################################################
+
+import time
+import logging
+import threading
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.poolmanager import PoolManager
+from requests.packages.urllib3.connectionpool import (
+    HTTPConnectionPool, HTTPSConnectionPool,
+)
+from requests.packages.urllib3.connection import (
+    HTTPConnection, HTTPSConnection,
+)
+from ibm_storage_flocker_driver.lib import messages
+from ibm_storage_flocker_driver.lib.utils import config_logger
+
+LOG = config_logger(logging.getLogger(__name__))
+
+
+class ConnectionPoolStats(object):
+    """
+    Counters of the connection pools of one HTTP adapter.
+    A request served on an open pooled connection is a hit, a request that
+    had to connect (TCP and TLS handshake) is a miss.
+    """
+    EVENTS = (
+        'requests',  # connections taken from the pool
+        'connects',  # new TCP (and TLS) connections
+        'reaped',  # idle connections closed instead of reused
+    )
+
+    def __init__(self):
+        self._counters = dict.fromkeys(self.EVENTS, 0)
+        self._lock = threading.Lock()
+
+    def count(self, event):
+        with self._lock:
+            self._counters[event] += 1
+
+    def snapshot(self):
+        """
+        :return: dict of the counters, with the hits and misses
+        """
+        with self._lock:
+            stats = dict(self._counters)
+        stats['misses'] = stats['connects']
+        stats['hits'] = max(stats['requests'] - stats['connects'], 0)
+        return stats
+
+
+class _CountingConnectionMixin(object):
+    pool_stats = None
+
+    def connect(self):
+        if self.pool_stats is not None:
+            self.pool_stats.count('connects')
+        super(_CountingConnectionMixin, self).connect()
+
+
+class CountingHTTPConnection(_CountingConnectionMixin, HTTPConnection):
+    pass
+
+
+class CountingHTTPSConnection(_CountingConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _CountingPoolMixin(object):
+    """
+    Counts the pool usage, and closes connections that were idle for longer
+    than idle_timeout instead of reusing them (the server may have closed
+    them already).
+    """
+    stats = None
+    idle_timeout = 0  # seconds, 0 means never
+
+    def _new_conn(self):
+        conn = super(_CountingPoolMixin, self)._new_conn()
+        conn.pool_stats = self.stats
+        return conn
+
+    def _get_conn(self, timeout=None):
+        conn = super(_CountingPoolMixin, self)._get_conn(timeout)
+        if self.stats is not None:
+            self.stats.count('requests')
+        last_used = getattr(conn, 'last_used', None)
+        if self.idle_timeout and last_used is not None and \
+                conn.sock is not None and \
+                time.time() - last_used > self.idle_timeout:
+            LOG.debug(messages.IDLE_CONNECTION_REAPED.format(
+                host=self.host, idle=time.time() - last_used))
+            conn.close()
+            if self.stats is not None:
+                self.stats.count('reaped')
+        return conn
+
+    def _put_conn(self, conn):
+        if conn is not None:
+            conn.last_used = time.time()
+        super(_CountingPoolMixin, self)._put_conn(conn)
+
+
+class CountingHTTPConnectionPool(_CountingPoolMixin, HTTPConnectionPool):
+    ConnectionCls = CountingHTTPConnection
+
+
+class CountingHTTPSConnectionPool(_CountingPoolMixin, HTTPSConnectionPool):
+    ConnectionCls = CountingHTTPSConnection
+
+
+class _CountingPoolManager(PoolManager):
+
+    def __init__(self, stats, idle_timeout, *args, **kwargs):
+        PoolManager.__init__(self, *args, **kwargs)
+        self.stats = stats
+        self.idle_timeout = idle_timeout
+        self.pool_classes_by_scheme = dict(
+            http=CountingHTTPConnectionPool,
+            https=CountingHTTPSConnectionPool,
+        )
+
+    def _new_pool(self, *args, **kwargs):
+        pool = PoolManager._new_pool(self, *args, **kwargs)
+        pool.stats = self.stats
+        pool.idle_timeout = self.idle_timeout
+        return pool
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter with pool hit/miss counters, idle connection reaping and
+    a default timeout for the requests sent without one.
+    """
+
+    def __init__(self, pool_connections, pool_maxsize, idle_timeout=0,
+                 timeout=None):
+        """
+        :param pool_connections: Number of hosts to keep a pool for
+        :param pool_maxsize: Maximum connections kept open per host
+        :param idle_timeout: Seconds a connection may be idle and still be
+                             reused, 0 means no limit
+        :param timeout: callable that gets the request and returns its
+                        timeout (as the requests timeout argument)
+        """
+        self.stats = ConnectionPoolStats()
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        HTTPAdapter.__init__(self, pool_connections=pool_connections,
+                             pool_maxsize=pool_maxsize)
+
+    def init_poolmanager(self, connections, maxsize, block=False,
+                         **pool_kwargs):
+        # pylint: disable=attribute-defined-outside-init
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+        self.poolmanager = _CountingPoolManager(
+            self.stats, self.idle_timeout, num_pools=connections,
+            maxsize=maxsize, block=block, strict=True, **pool_kwargs)
+
+    def send(self, request, **kwargs):
+        # pylint: disable=arguments-differ
+        if kwargs.get('timeout') is None and self.timeout is not None:
+            kwargs['timeout'] = self.timeout(request)
+        return HTTPAdapter.send(self, request, **kwargs)
@@ -33,6 +33,31 @@ END_INDEX_DATASET_ID_IN_VOL_NAME = (
 DEFAULT_DEBUG_LEVEL = 'INFO'  # aka default log_level
 DEFAULT_SERVICE = '-DEFAULT-'
 DEFAULT_VERIFY_SSL = True
+DEFAULT_REFRESH_INTERVAL = 0  # seconds, 0 means no background refresh
+DEFAULT_INCREMENTAL_SYNC = False
+DEFAULT_FULL_SYNC_INTERVAL = 600  # seconds between full volume reconciles
+DEFAULT_PAGE_SIZE = 0  # 0 means fetch the collections in one request
+DEFAULT_VOLUME_QUERY_PUSHDOWN = False
+DEFAULT_MAX_CONCURRENT_REQUESTS = 4
+DEFAULT_TOKEN_LIFETIME = 0  # seconds, 0 means unknown
+DEFAULT_TOKEN_CACHE_DIR = None  # None means no on-disk token cache
+DEFAULT_CONNECTION_POOLS = 10  # number of hosts to keep connections to
+DEFAULT_MAX_CONNECTIONS_PER_HOST = 10
+DEFAULT_KEEP_ALIVE = True
+DEFAULT_IDLE_CONNECTION_TIMEOUT = 0  # seconds, 0 means never reap
+DEFAULT_CONNECT_TIMEOUT = 10  # seconds
+DEFAULT_READ_TIMEOUT = 120  # seconds between bytes of a reply
+DEFAULT_OPERATION_TIMEOUT = 0  # seconds, 0 means no operation deadline
+DEFAULT_MAX_RETRIES = 0  # retries of a failed request, 0 means no retry
+DEFAULT_RETRY_BACKOFF = 0.5  # seconds of the first retry backoff
+DEFAULT_CIRCUIT_BREAKER_THRESHOLD = 0  # error rate, 0 means disabled
+DEFAULT_CIRCUIT_BREAKER_RESET_TIMEOUT = 30  # seconds
+DEFAULT_COALESCE_REQUESTS = False
+DEFAULT_BATCH_WINDOW = 0  # seconds, 0 batches only the lookups that queue
+DEFAULT_OPTIMISTIC_ATTACH_DETACH = False
+DEFAULT_RESCAN_WINDOW = 0  # seconds to merge the rescans of attach/detach
+DEFAULT_TARGETED_LUN_SCAN = False
+DEFAULT_USE_MULTIPATHD = False
 
 CONF_PARAM_DEFAULT_SERVICE = u'default_service'
 MANDATORY_CONFIGURATIONS_IN_YML_FILE = {
@@ -46,11 +71,63 @@ CONF_PARAM_DEBUG = u"log_level"
 CONF_PARAM_BACKEND_TYPE = u"management_type"
 CONF_PARAM_VERIFY_SSL = u"verify_ssl_certificate"
 CONF_PARAM_HOSTNAME = u"hostname"
+CONF_PARAM_REFRESH_INTERVAL = u"inventory_refresh_interval"
+CONF_PARAM_INCREMENTAL_SYNC = u"incremental_volume_sync"
+CONF_PARAM_FULL_SYNC_INTERVAL = u"full_volume_sync_interval"
+CONF_PARAM_PAGE_SIZE = u"page_size"
+CONF_PARAM_VOLUME_QUERY_PUSHDOWN = u"volume_query_pushdown"
+CONF_PARAM_MAX_CONCURRENT_REQUESTS = u"max_concurrent_requests"
+CONF_PARAM_TOKEN_LIFETIME = u"token_lifetime"
+CONF_PARAM_TOKEN_CACHE_DIR = u"token_cache_dir"
+CONF_PARAM_CONNECTION_POOLS = u"connection_pools"
+CONF_PARAM_MAX_CONNECTIONS_PER_HOST = u"max_connections_per_host"
+CONF_PARAM_KEEP_ALIVE = u"keep_alive"
+CONF_PARAM_IDLE_CONNECTION_TIMEOUT = u"idle_connection_timeout"
+CONF_PARAM_CONNECT_TIMEOUT = u"connect_timeout"
+CONF_PARAM_READ_TIMEOUT = u"read_timeout"
+CONF_PARAM_ENDPOINT_READ_TIMEOUTS = u"endpoint_read_timeouts"
+CONF_PARAM_OPERATION_TIMEOUT = u"operation_timeout"
+CONF_PARAM_MAX_RETRIES = u"max_retries"
+CONF_PARAM_RETRY_BACKOFF = u"retry_backoff"
+CONF_PARAM_CIRCUIT_BREAKER_THRESHOLD = u"circuit_breaker_threshold"
+CONF_PARAM_CIRCUIT_BREAKER_RESET_TIMEOUT = u"circuit_breaker_reset_timeout"
+CONF_PARAM_COALESCE_REQUESTS = u"coalesce_requests"
+CONF_PARAM_BATCH_WINDOW = u"batch_window"
+CONF_PARAM_OPTIMISTIC_ATTACH_DETACH = u"optimistic_attach_detach"
+CONF_PARAM_RESCAN_WINDOW = u"rescan_window"
+CONF_PARAM_TARGETED_LUN_SCAN = u"targeted_lun_scan"
+CONF_PARAM_USE_MULTIPATHD = u"use_multipathd"
 OPTIONAL_CONFIGURATIONS_IN_YML_FILE = {
     CONF_PARAM_BACKEND_TYPE,
     CONF_PARAM_DEBUG,
     CONF_PARAM_VERIFY_SSL,
     CONF_PARAM_PORT,
     CONF_PARAM_HOSTNAME,
+    CONF_PARAM_REFRESH_INTERVAL,
+    CONF_PARAM_INCREMENTAL_SYNC,
+    CONF_PARAM_FULL_SYNC_INTERVAL,
+    CONF_PARAM_PAGE_SIZE,
+    CONF_PARAM_VOLUME_QUERY_PUSHDOWN,
+    CONF_PARAM_MAX_CONCURRENT_REQUESTS,
+    CONF_PARAM_TOKEN_LIFETIME,
+    CONF_PARAM_TOKEN_CACHE_DIR,
+    CONF_PARAM_CONNECTION_POOLS,
+    CONF_PARAM_MAX_CONNECTIONS_PER_HOST,
+    CONF_PARAM_KEEP_ALIVE,
+    CONF_PARAM_IDLE_CONNECTION_TIMEOUT,
+    CONF_PARAM_CONNECT_TIMEOUT,
+    CONF_PARAM_READ_TIMEOUT,
+    CONF_PARAM_ENDPOINT_READ_TIMEOUTS,
+    CONF_PARAM_OPERATION_TIMEOUT,
+    CONF_PARAM_MAX_RETRIES,
+    CONF_PARAM_RETRY_BACKOFF,
+    CONF_PARAM_CIRCUIT_BREAKER_THRESHOLD,
+    CONF_PARAM_CIRCUIT_BREAKER_RESET_TIMEOUT,
+    CONF_PARAM_COALESCE_REQUESTS,
+    CONF_PARAM_BATCH_WINDOW,
+    CONF_PARAM_OPTIMISTIC_ATTACH_DETACH,
+    CONF_PARAM_RESCAN_WINDOW,
+    CONF_PARAM_TARGETED_LUN_SCAN,
+    CONF_PARAM_USE_MULTIPATHD,
 }
 CONF_PARAM_DEBUG_OPTIONS = ["DEBUG", "INFO", "WARN", "ERROR"]
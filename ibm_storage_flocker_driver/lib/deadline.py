@@ -0,0 +1,128 @@
+##############################################################################
+# Copyright 2016 IBM Corp.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##############################################################################
+
+import time
+import threading
+from functools import wraps
+from contextlib import contextmanager
+from ibm_storage_flocker_driver.lib import messages
+
+_local = threading.local()
+
+
+class DeadlineExceeded(Exception):
+
+    def __init__(self, operation, budget):
+        Exception.__init__(
+            self,
+            messages.DEADLINE_EXCEEDED.format(operation=operation,
+                                              budget=budget),
+        )
+        self.operation = operation
+        self.budget = budget
+
+
+class Deadline(object):
+    """
+    Deadline budget of a driver operation. The deadline is kept per thread,
+    so the REST calls, retries and commands of the operation are bounded
+    by it without passing it around.
+    """
+
+    def __init__(self, operation, budget):
+        """
+        :param operation: Name of the operation (for the error message)
+        :param budget: Seconds the operation may take
+        """
+        self.operation = operation
+        self.budget = budget
+        self.expires_at = time.time() + budget
+
+    def remaining(self):
+        return self.expires_at - time.time()
+
+
+def current():
+    """
+    :return: The Deadline of the running operation, or None
+    """
+    return getattr(_local, 'deadline', None)
+
+
+def set_current(current_deadline):
+    """
+    Run the calls of this thread within the given deadline
+    (e.g a worker thread of an operation).
+    """
+    _local.deadline = current_deadline
+
+
+@contextmanager
+def deadline(operation, budget):
+    """
+    Run the block within a deadline of budget seconds. A nested deadline
+    can only shorten the outer one.
+    :param operation: Name of the operation
+    :param budget: Seconds, 0 or None means no deadline
+    """
+    outer = current()
+    inner = Deadline(operation, budget) if budget else outer
+    if outer is not None and inner.expires_at > outer.expires_at:
+        inner = outer
+    set_current(inner)
+    try:
+        yield inner
+    finally:
+        set_current(outer)
+
+
+def with_deadline(budget_attr):
+    """
+    Decorator for running a method within a deadline.
+    :param budget_attr: Name of the attribute with the budget in seconds
+    """
+    def decorate(func):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            with deadline(func.__name__, getattr(self, budget_attr)):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def check():
+    """
+    :raise DeadlineExceeded: if the deadline of the operation passed
+    """
+    current_deadline = current()
+    if current_deadline is not None and current_deadline.remaining() <= 0:
+        raise DeadlineExceeded(current_deadline.operation,
+                               current_deadline.budget)
+
+
+def timeout(default=None):
+    """
+    :param default: The timeout of the call without a deadline
+                    (None means no timeout)
+    :raise DeadlineExceeded: if the deadline of the operation passed
+    :return: Seconds the next blocking call may take, or None for no limit
+    """
+    check()
+    current_deadline = current()
+    if current_deadline is None:
+        return default
+    remaining = current_deadline.remaining()
+    return remaining if default is None else min(default, remaining)
@@ -14,20 +14,33 @@
 # limitations under the License.
 ##############################################################################
 
-import re
 import os
+import glob
+import math
 import logging
+import threading
+from io import BytesIO
+from functools import partial
 from distutils.spawn import find_executable
 from subprocess import check_output, CalledProcessError, STDOUT
-from ibm_storage_flocker_driver.lib import messages
-from ibm_storage_flocker_driver.lib.utils import logme, config_logger
+from ibm_storage_flocker_driver.lib import messages, deadline
+from ibm_storage_flocker_driver.lib.utils import (
+    logme,
+    config_logger,
+    run_concurrently,
+)
 from ibm_storage_flocker_driver.lib.constants import DEFAULT_DEBUG_LEVEL
+from ibm_storage_flocker_driver.lib.multipathd import MultipathdError
+from ibm_storage_flocker_driver.lib.multipath_topology import (
+    MultipathTopology,
+    find_multipath_map,
+)
 
 LOG = config_logger(logging.getLogger(__name__))
 
-MULTIPATH_LINE_IDENTIFIER_RE = '{wwn}.* IBM'
 PREFIX_DEVICE_PATH = '/dev/mapper'
 TIMEOUT_FOR_MULTIPATH_CMD = 40
+TIMEOUT_CMD = 'timeout'
 
 MULTIPATH_LIST_ARGS = " -v2 -ll"
 RESCAN_CMDS = [
@@ -36,17 +49,31 @@ RESCAN_CMDS = [
 ]
 ISCSIADM_CMD = 'iscsiadm'
 MULTIPATH_CMD = 'multipath'
+SCSI_HOST_SYSFS = '/sys/class/scsi_host'
+SCSI_DEVICE_SYSFS = '/sys/class/scsi_device'
+BLOCK_SYSFS = '/sys/block'
+DM_UUID_MULTIPATH_PREFIX = 'mpath-'
+SCSI_VENDOR_IBM = 'IBM'
+SCAN_ALL = '-'  # wildcard of the channel and target of a SCSI host scan
 LOG_PREFIX = '{} : '.format(__name__)
 
 
 class HostActions(object):
 
-    def __init__(self, debug_level=DEFAULT_DEBUG_LEVEL):
+    def __init__(self, debug_level=DEFAULT_DEBUG_LEVEL, multipathd=None):
         """
         Initialize host action object.
         TODO : Consider to use os-brick for rescan and get device.
+        :param multipathd: MultipathdClient to query and reload multipath
+                           through the multipathd socket, None to run the
+                           multipath command only
         """
         LOG.setLevel(debug_level)
+        self._multipathd = multipathd
+        # multipath -ll index, until the next multipath reload or map change
+        self._topology = None
+        self._topology_generation = 0
+        self._topology_lock = threading.Lock()
 
         # set required commands path
         self._rescan_cmd = self._find_rescan_cmd()
@@ -67,8 +94,25 @@ class HostActions(object):
 
         self.multipath_cmd_ll = self._multipath_cmd + MULTIPATH_LIST_ARGS
 
+    @staticmethod
+    def timeout_prefix(default=None):
+        """
+        The timeout command line to bound a command by the operation
+        deadline.
+
+        :param default: Seconds the command may take without a deadline
+                        (None means no limit)
+        :raise DeadlineExceeded: if the operation deadline passed
+        :return: list of the timeout command arguments, or [] for no limit
+        """
+        seconds = deadline.timeout(default)
+        if seconds is None:
+            return []
+        return [TIMEOUT_CMD, str(int(math.ceil(seconds)))]
+
     # pylint: disable=too-many-arguments
-    def check_out(self, cmd, cmd_list, msg, retries=0, wwn=None):
+    def check_out(self, cmd, cmd_list, msg, retries=0, wwn=None,
+                  timeout=None):
         """
         Execute check_output function and wrap it with retry flow
 
@@ -77,13 +121,16 @@ class HostActions(object):
         :param msg: Message to log before
         :param retries: Number of retries if command fails
         :param wwn: If given, then stop retries if device is  found
+        :param timeout: Seconds each try may take (bounded by the deadline)
+        :raise DeadlineExceeded: if the operation deadline passed
         :return:
         """
         max_retries = retries
         LOG.debug(msg)
         while retries >= 0:
             try:
-                out = check_output(cmd_list, stderr=STDOUT)
+                out = check_output(self.timeout_prefix(timeout) + cmd_list,
+                                   stderr=STDOUT)
                 LOG.debug(
                     'Finished CMD {} with output : \n{}'.format(cmd, out))
                 break
@@ -93,9 +140,10 @@ class HostActions(object):
                     trynum=(max_retries - retries), total_tries=max_retries
                 )
                 LOG.error(msg)
+                deadline.check()
                 if retries == 0:
                     raise
-                if wwn and self._get_multipath_device_native(wwn):
+                if wwn and self._find_multipath_device_name(wwn):
                     LOG.error("Stop retry because the wanted wwn"
                               " ({}) found in the {}".format(wwn, cmd))
                     break
@@ -140,13 +188,132 @@ class HostActions(object):
             self._rescan_cmd_list,
             "Rescanning the host")
 
+        self._reload_multipath(wwn)
+
+    def _reload_multipath(self, wwn=None):
+        """
+        Reload the multipath devices.
+        :param wwn: If given, stop the retries once its device is found
+        """
+        try:
+            self._reload_multipath_maps(wwn)
+        finally:
+            self.invalidate_multipath_topology()
+
+    def _reload_multipath_maps(self, wwn):
+        if self._multipathd is not None:
+            LOG.info(messages.DRIVER_OPERATION_VOL_RESCAN_MULTIPATH.format(
+                cmd='multipathd reconfigure'))
+            try:
+                self._multipathd.reconfigure()
+                return
+            except MultipathdError as e:
+                LOG.warn(messages.MULTIPATHD_FALLBACK.format(exception=e))
         LOG.info(messages.DRIVER_OPERATION_VOL_RESCAN_MULTIPATH.format(
             cmd=' '.join(self._multipath_cmd_list)))
         self.check_out(
             self._multipath_cmd,
-            ["timeout", TIMEOUT_FOR_MULTIPATH_CMD.__str__()] +
             self._multipath_cmd_list,
-            "Multipath rescan", retries=3, wwn=wwn)
+            "Multipath rescan", retries=3, wwn=wwn,
+            timeout=TIMEOUT_FOR_MULTIPATH_CMD)
+
+    @logme(LOG)
+    def discover_luns(self, luns, wwns):
+        """
+        Discover newly mapped volumes by scanning only their LUNs (see
+        scan_luns) instead of the whole SCSI bus, then reload multipath.
+        If the scan fails, or the device of a volume does not appear, fall
+        back to the full rescan (rescan_scsi).
+
+        :param luns: The LUNs the volumes were mapped with
+        :param wwns: The WWNs of the volumes
+        :return: None
+        """
+        try:
+            self.scan_luns(luns)
+            self._reload_multipath()
+        except (IOError, OSError, CalledProcessError) as e:
+            LOG.warn(messages.LUN_SCAN_FAILED.format(exception=e))
+            self.rescan_scsi()
+            return
+
+        missing = [wwn for wwn in wwns
+                   if not self._get_multipath_device_sysfs(wwn)]
+        if missing:
+            missing = self._find_missing_multipath_devices(missing)
+        if missing:
+            LOG.warn(messages.LUN_SCAN_DEVICE_NOT_FOUND.format(wwns=missing))
+            self.rescan_scsi(wwn=missing[0])
+
+    def _find_missing_multipath_devices(self, wwns):
+        """
+        :param wwns: list of WWNs
+        :return: The WWNs that have no multipath device, by multipathd or
+                 by one multipath -ll
+        """
+        if self._multipathd is not None:
+            try:
+                maps = self._multipathd.show_maps()
+                return [wwn for wwn in wwns
+                        if not self._multipathd.find_map(wwn, maps)]
+            except MultipathdError as e:
+                LOG.warn(messages.MULTIPATHD_FALLBACK.format(exception=e))
+        topology = self.multipath_topology()
+        return [wwn for wwn in wwns
+                if not self._find_ibm_map(topology.find(wwn))]
+
+    @logme(LOG)
+    def scan_luns(self, luns):
+        """
+        Scan only the given LUNs, by writing "channel target lun" to the
+        scan file of the SCSI hosts, for the targets of the IBM storage
+        systems (e.g /sys/class/scsi_host/host3/scan <- "0 0 5").
+        If the node has no IBM targets yet, the LUNs are scanned on every
+        target of every SCSI host ("- - 5").
+
+        :param luns: list of LUN numbers
+        :raise IOError: if a scan file cannot be written
+        :return: None
+        """
+        targets = self.array_targets()
+        if not targets:
+            targets = {(os.path.basename(host)[len('host'):],
+                        SCAN_ALL, SCAN_ALL)
+                       for host in glob.glob(
+                           os.path.join(SCSI_HOST_SYSFS, 'host*'))}
+        for host, channel, target in sorted(targets):
+            scan_file = os.path.join(
+                SCSI_HOST_SYSFS, 'host{}'.format(host), 'scan')
+            for lun in sorted(set(luns)):
+                deadline.check()
+                LOG.info(messages.DRIVER_OPERATION_VOL_RESCAN_LUN.format(
+                    scan_file=scan_file, channel=channel, target=target,
+                    lun=lun))
+                with open(scan_file, 'w') as scan:
+                    scan.write('{} {} {}'.format(channel, target, lun))
+
+    @staticmethod
+    def array_targets():
+        """
+        The SCSI targets of the IBM storage systems, by the SCSI devices
+        that the node already has (e.g /sys/class/scsi_device/3:0:0:1 with
+        the vendor IBM).
+
+        :return: set of (host, channel, target) strings
+        """
+        targets = set()
+        for device in glob.glob(os.path.join(SCSI_DEVICE_SYSFS, '*')):
+            address = os.path.basename(device).split(':')
+            if len(address) != 4:
+                continue
+            try:
+                with open(os.path.join(device, 'device', 'vendor')) as f:
+                    vendor = f.read().strip()
+            except IOError:
+                continue
+            if vendor == SCSI_VENDOR_IBM:
+                targets.add(tuple(address[:3]))
+        return targets
 
     @classmethod
     def _find_rescan_cmd(cls):
@@ -209,24 +376,148 @@ class HostActions(object):
         :param vol_wwn:
         :return: str: the device path
         """
-        cmd_out = check_output([self.multipath_cmd_ll], shell=True)
+        with self._topology_lock:
+            topology = self._topology
+        mp_map = self._find_ibm_map(topology and topology.find(vol_wwn))
+        if mp_map is None:
+            # not cached, or mapped since the index was built
+            mp_map = self._find_ibm_map(find_multipath_map(
+                BytesIO(self._list_multipath()), vol_wwn))
+        device = mp_map.name if mp_map else None
+        if device is None:
+            LOG.error("device for vol_wwn {} not found in {}".format(
+                vol_wwn, self.multipath_cmd_ll))
+        return device
+
+    def _list_multipath(self):
+        """
+        :return: The multipath -ll output
+        """
+        cmd_out = check_output(
+            [' '.join(self.timeout_prefix(TIMEOUT_FOR_MULTIPATH_CMD) +
+                      [self.multipath_cmd_ll])], shell=True)
         LOG.debug("{multipath_cmd}   Out put : {output}".format(
             multipath_cmd=self.multipath_cmd_ll, output=cmd_out))
+        return cmd_out
 
-        for line in cmd_out.split('\n'):
-            line_match = re.search(
-                MULTIPATH_LINE_IDENTIFIER_RE.format(wwn=vol_wwn),
-                line,
-                flags=re.IGNORECASE
-            )
-            if line_match:
-                device = line.split()[0]  # the first item is the device name
-                return device
-
-        LOG.error("device for vol_wwn {} not found in {}".format(
-            vol_wwn, self.multipath_cmd_ll))
+    @staticmethod
+    def _find_ibm_map(mp_map):
+        """
+        :param mp_map: A MultipathMap, or None
+        :return: The map if it is of an IBM storage system, or None
+        """
+        if mp_map is not None and mp_map.vendor == SCSI_VENDOR_IBM:
+            return mp_map
         return None
 
+    def multipath_topology(self):
+        """
+        The multipath maps of the node, parsed from multipath -ll. The index
+        is cached until the next multipath reload or map change on the node
+        (see invalidate_multipath_topology).
+
+        :return: MultipathTopology
+        """
+        with self._topology_lock:
+            topology = self._topology
+            generation = self._topology_generation
+        if topology is None:
+            topology = MultipathTopology.parse(
+                BytesIO(self._list_multipath()))
+            with self._topology_lock:
+                # unless the maps changed while multipath -ll ran
+                if generation == self._topology_generation:
+                    self._topology = topology
+        return topology
+
+    def invalidate_multipath_topology(self):
+        """
+        Drop the cached multipath index (e.g after a rescan).
+        """
+        with self._topology_lock:
+            self._topology = None
+            self._topology_generation += 1
+
+    @staticmethod
+    def _get_multipath_device_sysfs(vol_wwn):
+        """
+        Find the multipath device name of a given WWN by the device mapper
+        devices in sysfs, without running multipath. The uuid of a
+        multipath device is mpath-<wwid>, where the wwid ends with the WWN,
+        and its paths (slaves) have the vendor IBM.
+
+        Example :
+        # XIV
+        /sys/block/dm-0/dm/uuid : mpath-200173800fdf50f86
+        /sys/block/dm-0/dm/name : 200173800fdf50f86
+        # SVC
+        /sys/block/dm-0/dm/uuid : mpath-36005076801d9053a180000000002ccd3
+        /sys/block/dm-0/dm/name : 36005076801d9053a180000000002ccd3
+        # redhat (user friendly names)
+        /sys/block/dm-8/dm/uuid : mpath-36001738cfc9035e80000000000013aff
+        /sys/block/dm-8/dm/name : mpathd
+        /sys/block/dm-8/slaves/sdb -> /sys/block/sdb/device/vendor : IBM
+
+        :param vol_wwn:
+        :return: str: the device name, or None if not found
+        """
+        wwn = vol_wwn.lower()
+        for dm_device in glob.glob(os.path.join(BLOCK_SYSFS, 'dm-*')):
+            try:
+                with open(os.path.join(dm_device, 'dm', 'uuid')) as f:
+                    uuid = f.read().strip()
+                if not uuid.startswith(DM_UUID_MULTIPATH_PREFIX) or \
+                        not uuid.lower().endswith(wwn):
+                    continue
+                if not HostActions._is_ibm_dm_device(dm_device):
+                    continue
+                with open(os.path.join(dm_device, 'dm', 'name')) as f:
+                    return f.read().strip()
+            except (IOError, OSError):
+                continue  # e.g the device was removed meanwhile
+        return None
+
+    @staticmethod
+    def _is_ibm_dm_device(dm_device):
+        """
+        Whether a device mapper device has a path (slave) with the vendor
+        IBM (e.g /sys/block/dm-0/slaves/sdb -> /sys/block/sdb/device/vendor).
+
+        :param dm_device: The device sysfs path (e.g /sys/block/dm-0)
+        :raise OSError: if the slaves cannot be read
+        :return: bool
+        """
+        for slave in os.listdir(os.path.join(dm_device, 'slaves')):
+            vendor_file = os.path.join(BLOCK_SYSFS, slave, 'device', 'vendor')
+            try:
+                with open(vendor_file) as f:
+                    if f.read().strip() == SCSI_VENDOR_IBM:
+                        return True
+            except IOError:
+                continue
+        return False
+
+    def _find_multipath_device_name(self, vol_wwn):
+        """
+        Find the multipath device name of a given WWN in sysfs, or by
+        multipathd (if set) or multipath -ll if sysfs does not have it.
+
+        :param vol_wwn:
+        :return: str: the device name, or None if not found
+        """
+        device = self._get_multipath_device_sysfs(vol_wwn)
+        if device:
+            return device
+        LOG.debug("device for vol_wwn {} not found in {}".format(
+            vol_wwn, BLOCK_SYSFS))
+        if self._multipathd is not None:
+            try:
+                mp_map = self._multipathd.find_map(vol_wwn)
+                return mp_map['name'] if mp_map else None
+            except MultipathdError as e:
+                LOG.warn(messages.MULTIPATHD_FALLBACK.format(exception=e))
+        return self._get_multipath_device_native(vol_wwn)
+
     @logme(LOG)
     def get_multipath_device(self, vol_wwn):
         """
@@ -234,7 +525,7 @@ class HostActions(object):
         :raise: MultipathDeviceFilePathNotFound
         :return: DeviveAbsPath - Multipath device path
         """
-        devmapper_device = self._get_multipath_device_native(vol_wwn)
+        devmapper_device = self._find_multipath_device_name(vol_wwn)
 
         if not devmapper_device:
             raise MultipathDeviceNotFound(vol_wwn)
@@ -254,27 +545,97 @@ class HostActions(object):
         (use it before unmapping a volume from the storage system)
 
         :param device_path:
-        :return:
+        :return: The SCSI devices of the multipath device, recorded before
+                 it was flushed (see get_path_devices)
         """
         mp_device_name = os.path.basename(device_path)
+        devices = self.get_path_devices(device_path)
 
         self.run_cmd(
             ['dmsetup message {} 0 "fail_if_no_path"'.format(mp_device_name)])
+        try:
+            self._flush_multipath(mp_device_name)
+        finally:
+            self.invalidate_multipath_topology()
+
+        LOG.debug("cleaned multiple device {} (paths {})".format(
+            device_path, devices))
+        return devices
+
+    def _flush_multipath(self, mp_device_name):
+        """
+        Flush a multipath device, by multipathd (if set) or multipath -f.
+        """
+        if self._multipathd is not None:
+            try:
+                self._multipathd.remove_map(mp_device_name)
+                return
+            except MultipathdError as e:
+                LOG.warn(messages.MULTIPATHD_FALLBACK.format(exception=e))
         self.run_cmd(['multipath -f {}'.format(mp_device_name)], retries=3)
 
-        LOG.debug("cleaned multiple device {}".format(device_path))
+    @staticmethod
+    def get_path_devices(device_path):
+        """
+        The SCSI devices (paths) of a multipath device, by its slaves in
+        sysfs (e.g /dev/mapper/mpatha -> /dev/dm-0 ->
+        /sys/block/dm-0/slaves/sdb).
+
+        :param device_path: The multipath device path
+        :return: list of the device names (e.g ['sdb', 'sdc']), or None if
+                 the slaves cannot be read
+        """
+        dm_device = os.path.basename(os.path.realpath(device_path))
+        try:
+            return sorted(os.listdir(
+                os.path.join(BLOCK_SYSFS, dm_device, 'slaves')))
+        except OSError as e:
+            LOG.warn(messages.PATH_DEVICES_NOT_FOUND.format(
+                device_path=device_path, exception=e))
+            return None
+
+    @logme(LOG)
+    def delete_scsi_devices(self, devices):
+        """
+        Remove SCSI devices from the node (e.g the paths of an unmapped
+        volume), by writing 1 to /sys/block/sdX/device/delete, in parallel.
+        A device that is already gone is skipped.
+
+        :param devices: list of device names (e.g ['sdb', 'sdc'])
+        :raise IOError: if a device cannot be deleted
+        :return: None
+        """
+        try:
+            run_concurrently([partial(self._delete_scsi_device, device)
+                              for device in devices])
+        finally:
+            self.invalidate_multipath_topology()
 
     @staticmethod
-    def run_cmd(cmd, retries=0):
+    def _delete_scsi_device(device):
+        delete_file = os.path.join(BLOCK_SYSFS, device, 'device', 'delete')
+        if not os.path.exists(delete_file):
+            LOG.debug("device {} already removed".format(device))
+            return
+        deadline.check()
+        LOG.info(messages.DRIVER_OPERATION_VOL_DELETE_DEVICE.format(
+            device=device, delete_file=delete_file))
+        with open(delete_file, 'w') as delete:
+            delete.write('1')
+
+    @classmethod
+    def run_cmd(cls, cmd, retries=0):
         max_retries = retries
         while retries >= 0:
             try:
-                out = check_output(cmd, shell=True)
+                out = check_output(
+                    [' '.join(cls.timeout_prefix() + cmd)], shell=True)
                 LOG.debug("cmd {} output : {}".format(cmd, out))
                 return out
             except CalledProcessError as e:
                 LOG.error("{}: error, {}  (retries {} of {})".format(
                     cmd, str(e), max_retries - retries, max_retries))
+                deadline.check()
                 if retries == 0:
                     raise
                 LOG.error("let try again to run the command {}".format(cmd))
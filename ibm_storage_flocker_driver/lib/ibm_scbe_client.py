@@ -15,16 +15,80 @@
 ##############################################################################
 
 import json
+import time
 import logging
-from functools import wraps
+import threading
+from collections import OrderedDict
+from functools import partial, wraps
+from urlparse import urlparse
 import requests
+from requests.exceptions import (
+    Timeout as RequestTimeout,
+    ConnectionError as RequestConnectionError,
+    ConnectTimeout,
+)
+from requests.packages.urllib3.exceptions import NewConnectionError
 from bitmath import MiB
-from ibm_storage_flocker_driver.lib import messages
+from ibm_storage_flocker_driver.lib import messages, deadline
 from ibm_storage_flocker_driver.lib.abstract_client import (
-    IBMStorageAbsClient, VolInfo, CreateVolumeError,
+    IBMStorageAbsClient, VolInfo, CreateVolumeError, UnknownVolumeError,
+    VolumeAlreadyMappedError, VolumeNotMappedError,
 )
 from ibm_storage_flocker_driver.ibm_storage_blockdevice import DEFAULT_SERVICE
-from ibm_storage_flocker_driver.lib.utils import logme, config_logger
+from ibm_storage_flocker_driver.lib.utils import (
+    logme, config_logger, run_concurrently, iter_json_array,
+)
+from ibm_storage_flocker_driver.lib.cache import (
+    ServiceCatalog, HostDirectory, ExpiringLRUCache,
+)
+from ibm_storage_flocker_driver.lib.token_cache import TokenCache
+from ibm_storage_flocker_driver.lib.connection_pool import PooledHTTPAdapter
+from ibm_storage_flocker_driver.lib.single_flight import SingleFlight
+from ibm_storage_flocker_driver.lib.batch_loader import BatchLoader
+from ibm_storage_flocker_driver.lib.retry import (
+    RetryPolicy, CircuitBreaker, parse_retry_after,
+)
+from ibm_storage_flocker_driver.lib.constants import (
+    CONF_PARAM_INCREMENTAL_SYNC,
+    DEFAULT_INCREMENTAL_SYNC,
+    CONF_PARAM_FULL_SYNC_INTERVAL,
+    DEFAULT_FULL_SYNC_INTERVAL,
+    CONF_PARAM_PAGE_SIZE,
+    DEFAULT_PAGE_SIZE,
+    CONF_PARAM_VOLUME_QUERY_PUSHDOWN,
+    DEFAULT_VOLUME_QUERY_PUSHDOWN,
+    CONF_PARAM_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    CONF_PARAM_TOKEN_LIFETIME,
+    DEFAULT_TOKEN_LIFETIME,
+    CONF_PARAM_TOKEN_CACHE_DIR,
+    DEFAULT_TOKEN_CACHE_DIR,
+    CONF_PARAM_CONNECTION_POOLS,
+    DEFAULT_CONNECTION_POOLS,
+    CONF_PARAM_MAX_CONNECTIONS_PER_HOST,
+    DEFAULT_MAX_CONNECTIONS_PER_HOST,
+    CONF_PARAM_KEEP_ALIVE,
+    DEFAULT_KEEP_ALIVE,
+    CONF_PARAM_IDLE_CONNECTION_TIMEOUT,
+    DEFAULT_IDLE_CONNECTION_TIMEOUT,
+    CONF_PARAM_CONNECT_TIMEOUT,
+    DEFAULT_CONNECT_TIMEOUT,
+    CONF_PARAM_READ_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    CONF_PARAM_ENDPOINT_READ_TIMEOUTS,
+    CONF_PARAM_MAX_RETRIES,
+    DEFAULT_MAX_RETRIES,
+    CONF_PARAM_RETRY_BACKOFF,
+    DEFAULT_RETRY_BACKOFF,
+    CONF_PARAM_CIRCUIT_BREAKER_THRESHOLD,
+    DEFAULT_CIRCUIT_BREAKER_THRESHOLD,
+    CONF_PARAM_CIRCUIT_BREAKER_RESET_TIMEOUT,
+    DEFAULT_CIRCUIT_BREAKER_RESET_TIMEOUT,
+    CONF_PARAM_COALESCE_REQUESTS,
+    DEFAULT_COALESCE_REQUESTS,
+    CONF_PARAM_BATCH_WINDOW,
+    DEFAULT_BATCH_WINDOW,
+)
 
 LOG = config_logger(logging.getLogger(__name__))
 
@@ -39,6 +103,51 @@ URL_SCBE_RESOURCE_HOST = '/hosts'
 SCBE_FLOCKER_GROUP_PARAM = dict(group='flocker')
 ALLOCATION_UNIT = int(MiB(1).to_Byte().value)
 DEFAULT_SSL_PORT = 443
+SERVICE_CATALOG_TTL = 300  # seconds
+HOST_DIRECTORY_TTL = 600  # seconds
+HOST_DIRECTORY_MAX_SIZE = 1024
+VOLUME_ARRAY_CACHE_MAX_SIZE = 4096
+TOKEN_EXPIRES_IN = 'expires_in'  # optional token lifetime in the login reply
+TOKEN_REFRESH_RATIO = 0.8  # refresh the token at 80% of its lifetime
+TOKEN_REFRESH_RETRY_INTERVAL = 30  # seconds
+TOKEN_MIN_LEARNED_LIFETIME = 60  # seconds, younger tokens were revoked
+MAX_RETRY_BACKOFF = 30  # seconds
+SCBE_VOLUME_LAST_UPDATE = 'last_update_time'
+SCBE_VOLUME_SERVICE_NAME = 'service_name'
+SCBE_VOLUME_PENDING_DELETION = 'is_pending_deletion'
+SCBE_VOLUME_CHANGED_SINCE_PARAM = SCBE_VOLUME_LAST_UPDATE + '__gte'
+# The volume fields the client uses, the others are dropped while streaming
+SCBE_VOLUME_FIELDS = (
+    'name',
+    'logical_capacity',
+    'volume_id',
+    'scsi_identifier',
+    'array',
+    SCBE_VOLUME_SERVICE_NAME,
+    SCBE_VOLUME_LAST_UPDATE,
+    SCBE_VOLUME_PENDING_DELETION,
+)
+STREAM_CHUNK_SIZE = 64 * 1024  # bytes
+SCBE_FIELDS_PARAM = 'fields'
+SCBE_NAME_PREFIX_PARAM = 'name__startswith'
+SCBE_NAME_SUFFIX_PARAM = 'name__endswith'
+SCBE_MAPPING_VOLUME_IN_PARAM = 'volume__in'
+SCBE_HOST_ID_IN_PARAM = 'id__in'
+SCBE_VOLUME_WWN_IN_PARAM = 'scsi_identifier__in'
+SCBE_MAPPINGS = 'mappings'
+SCBE_MAPPING_LUN = 'lun_number'
+# error code of a rejected request, in the JSON reply of SCBE
+SCBE_ERROR_CODE = 'error_code'
+SCBE_ERROR_VOLUME_NOT_FOUND = 'VOLUME_NOT_FOUND'
+SCBE_ERROR_VOLUME_ALREADY_MAPPED = 'VOLUME_ALREADY_MAPPED'
+SCBE_ERROR_VOLUME_NOT_MAPPED = 'VOLUME_NOT_MAPPED'
+SCBE_ERROR_SERVICE_NOT_FOUND = 'SERVICE_NOT_FOUND'
+QUERY_BATCH_SIZE = 100  # values per __in filter, keeps the URL short
+PAGE_LIMIT_PARAM = 'limit'
+PAGE_OFFSET_PARAM = 'offset'
+PAGE_RESULTS = 'results'
+PAGE_COUNT = 'count'
+PAGE_NEXT = 'next'
 
 
 class RestClientException(Exception):
@@ -50,8 +159,13 @@ class RestClientException(Exception):
 def _retry_if_token_expire(func):
     @wraps(func)
     def wrapped(self, *args, **kwargs):
+        self.refresh_token_if_due()
+        generation = self.token_generation
         try:
             return func(self, *args, **kwargs)
+        except RequestTimeout:
+            deadline.check()  # the operation ran out of time, not the call
+            raise
         except RestClientException as e:
             response = e.args[0]
             if response.status_code == \
@@ -64,10 +178,12 @@ def _retry_if_token_expire(func):
                            reason=getattr(response, 'reason', ''),
                            content=getattr(response, 'content', '')))
 
-                # Get new token
-                self.get_token_and_update_header()
+                # Get new token, unless another call already did
+                self.count_token_event('replays')
+                self.refresh_token(generation, expired=True)
 
                 # Run again the same REST API
+                deadline.check()
                 return func(self, *args, **kwargs)
             else:
                 raise
@@ -75,6 +191,58 @@ def _retry_if_token_expire(func):
     return wrapped
 
 
+def _is_connect_error(error):
+    """
+    :return: True if the request failed before it was sent
+    """
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(error, ConnectTimeout) or \
+        isinstance(reason, NewConnectionError)
+
+
+def _retry_on_failure(idempotent):
+    """
+    Decorator for retrying requests that failed on a server or network
+    error, with backoff, through the circuit breaker of the client.
+    :param idempotent: True if the request may be retried even if the
+                       server may have handled it (e.g GET)
+    """
+    def decorate(func):
+        @wraps(func)
+        def wrapped(self, *args, **kwargs):
+            attempt = 0
+            while True:
+                self.circuit_breaker.before_call()
+                try:
+                    result = func(self, *args, **kwargs)
+                except (RestClientException, RequestConnectionError,
+                        RequestTimeout) as e:
+                    failed, retryable, retry_after = \
+                        self.classify_failure(e, idempotent)
+                    self.circuit_breaker.record(failed)
+                    if not retryable or \
+                            attempt >= self.retry_policy.max_retries:
+                        raise
+                    delay = self.retry_policy.delay(attempt, retry_after)
+                    if deadline.timeout(delay) < delay:
+                        raise  # no time left to retry
+                    attempt += 1
+                    LOG.warning(messages.REQUEST_RETRY.format(
+                        func_name=func.__name__, error=e, attempt=attempt,
+                        max_retries=self.retry_policy.max_retries,
+                        delay=delay))
+                    self.count_retry()
+                    time.sleep(delay)
+                except Exception:
+                    self.circuit_breaker.record(False)  # e.g deadline
+                    raise
+                else:
+                    self.circuit_breaker.record(False)
+                    return result
+        return wrapped
+    return decorate
+
+
 class RestClient(object):
     """
         Wrapper for http requests to provide easy REST API operations.
@@ -83,10 +251,21 @@ class RestClient(object):
         SUCCESS=200,
         CREATED=201,
         DELETED=204,
+        BAD_REQUEST=400,
         UNAUTHORIZED=401,
+        NOT_FOUND=404,
+        CONFLICT=409,
     )
     LOG_PREFIX = 'rest_client :'
     AUTH_KEY = 'Authorization'
+    TOKEN_EVENTS = (
+        'logins',  # every successful login
+        'proactive_refreshes',  # logins before the token expired
+        'replays',  # calls replayed after 401 UNAUTHORIZED
+        'coalesced',  # 401 that reused a login of another call
+        'cache_hits',  # cached tokens used instead of login
+        'cache_rejected',  # cached tokens the server rejected
+    )
 
     def __init__(self, connection_info, base_url, auth_url, referer=None):
         """
@@ -101,15 +280,124 @@ class RestClient(object):
         self.session = requests.Session()
         self.session.verify = connection_info.verify_ssl
 
+        # Connection pooling, keep the connections open between calls
+        options = connection_info.options
+        self._connect_timeout = options.get(
+            CONF_PARAM_CONNECT_TIMEOUT, DEFAULT_CONNECT_TIMEOUT)
+        self._read_timeout = options.get(
+            CONF_PARAM_READ_TIMEOUT, DEFAULT_READ_TIMEOUT)
+        self._endpoint_read_timeouts = options.get(
+            CONF_PARAM_ENDPOINT_READ_TIMEOUTS, {})
+        self._adapter = PooledHTTPAdapter(
+            options.get(CONF_PARAM_CONNECTION_POOLS,
+                        DEFAULT_CONNECTION_POOLS),
+            options.get(CONF_PARAM_MAX_CONNECTIONS_PER_HOST,
+                        DEFAULT_MAX_CONNECTIONS_PER_HOST),
+            options.get(CONF_PARAM_IDLE_CONNECTION_TIMEOUT,
+                        DEFAULT_IDLE_CONNECTION_TIMEOUT),
+            timeout=self._request_timeout,
+        )
+        self.session.mount('https://', self._adapter)
+        self.session.mount('http://', self._adapter)
+
+        # Retry and circuit breaker
+        self.retry_policy = RetryPolicy(
+            options.get(CONF_PARAM_MAX_RETRIES, DEFAULT_MAX_RETRIES),
+            options.get(CONF_PARAM_RETRY_BACKOFF, DEFAULT_RETRY_BACKOFF),
+            MAX_RETRY_BACKOFF)
+        self.circuit_breaker = CircuitBreaker(
+            connection_info.management_ip,
+            options.get(CONF_PARAM_CIRCUIT_BREAKER_THRESHOLD,
+                        DEFAULT_CIRCUIT_BREAKER_THRESHOLD),
+            options.get(CONF_PARAM_CIRCUIT_BREAKER_RESET_TIMEOUT,
+                        DEFAULT_CIRCUIT_BREAKER_RESET_TIMEOUT))
+        self._retries = 0
+        self._retries_lock = threading.Lock()
+
+        # One request serves identical GETs that run at the same time
+        self._single_flight = SingleFlight() if options.get(
+            CONF_PARAM_COALESCE_REQUESTS, DEFAULT_COALESCE_REQUESTS) \
+            else None
+
         # Basic headers
         self.session.headers.update({'Content-Type': 'application/json'})
         if referer:
             self.session.headers.update({'referer': referer})
+        if not options.get(CONF_PARAM_KEEP_ALIVE, DEFAULT_KEEP_ALIVE):
+            self.session.headers.update({'Connection': 'close'})
+
+        # Token lifecycle, the lifetime is configured, given by the
+        # server on login or learned from the first expiration
+        self._token_lock = threading.RLock()
+        self.token_generation = 0
+        self._token_issued_at = None
+        self._token_lifetime = connection_info.options.get(
+            CONF_PARAM_TOKEN_LIFETIME, DEFAULT_TOKEN_LIFETIME) or None
+        self._token_stats = dict.fromkeys(self.TOKEN_EVENTS, 0)
+        self._token_refresher = None
+        self._token_refresher_wakeup = threading.Event()
+        self._closed = False
+        self._token_cache = self._create_token_cache()
+        self._token_from_cache = False
+
+        # The cached token is validated by the first request (401 on failure)
+        if not self._use_cached_token():
+            self.get_token_and_update_header()
+
+    def _create_token_cache(self):
+        """
+        :return: TokenCache if the token cache is enabled, else None
+        """
+        directory = self.con_info.options.get(
+            CONF_PARAM_TOKEN_CACHE_DIR, DEFAULT_TOKEN_CACHE_DIR)
+        if not directory:
+            return None
+        return TokenCache(directory, self.con_info.management_ip,
+                          self.con_info.port,
+                          self.con_info.credential.get('username'))
 
-        self.get_token_and_update_header()
+    def _use_cached_token(self):
+        """
+        :return: True if a cached token was loaded into the session
+        """
+        if self._token_cache is None:
+            return False
+        cached = self._token_cache.load()
+        if cached is None:
+            return False
+        lifetime = self._token_lifetime or cached['lifetime']
+        if lifetime and time.time() - cached['issued_at'] >= lifetime:
+            return False  # expired, the login overwrites it
+        LOG.debug(messages.TOKEN_CACHE_USED.format(
+            issued_at=cached['issued_at']))
+        with self._token_lock:
+            self.session.headers.update(
+                {self.AUTH_KEY: 'Token {}'.format(cached['token'])})
+            self.token_generation += 1
+            self._token_issued_at = cached['issued_at']
+            self._token_lifetime = lifetime or None
+            self._token_from_cache = True
+            self.count_token_event('cache_hits')
+        self._start_token_refresher()
+        return True
+
+    def _request_timeout(self, request):
+        """
+        :param request: The prepared request
+        :raise DeadlineExceeded: if the operation deadline passed
+        :return: tuple of the (connect, read) timeouts of the request,
+                 bounded by the operation deadline
+        """
+        resource = urlparse(request.url).path[
+            len(urlparse(self.base_url).path):]
+        endpoint = '/' + resource.strip('/').split('/')[0]
+        read_timeout = self._endpoint_read_timeouts.get(
+            endpoint, self._read_timeout)
+        return (deadline.timeout(self._connect_timeout or None),
+                deadline.timeout(read_timeout or None))
 
     def _generic_action(self, action, resource_url, payload=None,
-                        exit_status=None):
+                        exit_status=None, headers=None):
         """
         Trigger request action on given URL and payload, and verify the
         respond exit_status.
@@ -117,31 +405,202 @@ class RestClient(object):
         :param resource_url:
         :param payload:
         :param exit_status:
+        :param headers: headers to override for this request
+                        (None value removes the session header)
         :return: the request response
         """
         payload_json = json.dumps(payload)
         url = self.base_url + resource_url
         LOG.debug(messages.HTTP_REQUEST_DEBUG.format(
             action=action, url=url, payload=payload))
-        response = getattr(self.session, action)(url, data=payload_json)
+        kwargs = dict(headers=headers) if headers else {}
+        response = getattr(self.session, action)(
+            url, data=payload_json, **kwargs)
         self.verify_status_code(response, exit_status, action)
         return response
 
     def get_token_and_update_header(self):
-        # remove the token from header if exist
-        self.session.headers.pop(self.AUTH_KEY, None)
-
-        token = self._get_token(self.auth_url, self.con_info.credential)
+        with self._token_lock:
+            # login without the current token, it may have expired
+            token = self._get_token(self.auth_url, self.con_info.credential)
 
-        # update token in header
-        self.session.headers.update({self.AUTH_KEY: 'Token {}'.format(token)})
+            # update token in header
+            self.session.headers.update(
+                {self.AUTH_KEY: 'Token {}'.format(token)})
+            self.token_generation += 1
+            self._token_issued_at = time.time()
+            self._token_from_cache = False
+            self.count_token_event('logins')
+            if self._token_cache is not None:
+                self._token_cache.save(token, self._token_issued_at,
+                                       self._token_lifetime)
+        self._start_token_refresher()
 
     def _get_token(self, resource_url, payload,
                    exit_status=HTTP_EXIT_STATUS['SUCCESS']):
         response = self._generic_action('post', resource_url, payload,
-                                        exit_status)
-        return response.json()['token']
+                                        exit_status,
+                                        headers={self.AUTH_KEY: None})
+        token_info = response.json()
+        if token_info.get(TOKEN_EXPIRES_IN):
+            self._token_lifetime = token_info[TOKEN_EXPIRES_IN]
+        return token_info['token']
+
+    def refresh_token(self, generation=None, expired=False):
+        """
+        Login again. Concurrent calls for the same token login only once.
+        :param generation: The token generation the caller used. If the
+                           token was replaced since then, do not login.
+        :param expired: True if the token was rejected by the server
+        :return: True if logged in, False if the token was already replaced
+        """
+        with self._token_lock:
+            if generation is not None and generation != self.token_generation:
+                self.count_token_event('coalesced')
+                return False
+            if expired and self._token_from_cache:
+                # The age of a cached token says nothing about its lifetime
+                LOG.debug(messages.TOKEN_CACHE_REJECTED)
+                self.count_token_event('cache_rejected')
+                self._token_cache.discard()
+            elif expired:
+                self._learn_token_lifetime()
+            self.get_token_and_update_header()
+            return True
+
+    def _learn_token_lifetime(self):
+        """
+        The token expired, so its lifetime is at most its age.
+        A known lifetime is kept, and a young token was probably revoked
+        (e.g SCBE restart) rather than expired.
+        """
+        age = time.time() - self._token_issued_at
+        if self._token_lifetime is None and age >= TOKEN_MIN_LEARNED_LIFETIME:
+            LOG.debug(messages.TOKEN_LIFETIME_LEARNED.format(lifetime=age))
+            self._token_lifetime = age
+
+    def _token_refresh_due_in(self):
+        """
+        :return: Seconds until the token should be refreshed, or None if
+                 the token lifetime is unknown
+        """
+        if self._token_lifetime is None:
+            return None
+        return self._token_issued_at + \
+            self._token_lifetime * TOKEN_REFRESH_RATIO - time.time()
+
+    def refresh_token_if_due(self):
+        """
+        Login again if the token is about to expire (in case the background
+        refresh did not run yet)
+        """
+        due_in = self._token_refresh_due_in()
+        if due_in is not None and due_in <= 0:
+            if self.refresh_token(self.token_generation):
+                self.count_token_event('proactive_refreshes')
+
+    def _start_token_refresher(self):
+        if self._token_lifetime is None or self._closed:
+            return
+        if self._token_refresher is not None:
+            self._token_refresher_wakeup.set()  # reschedule
+            return
+        self._token_refresher = threading.Thread(
+            target=self._run_token_refresher, name='ibm-token-refresher')
+        self._token_refresher.daemon = True
+        self._token_refresher.start()
+
+    def _run_token_refresher(self):
+        while not self._closed:
+            self._token_refresher_wakeup.wait(
+                max(self._token_refresh_due_in(), 0))
+            self._token_refresher_wakeup.clear()
+            if self._closed:
+                return
+            try:
+                self.refresh_token_if_due()
+            except Exception as e:  # pylint: disable=broad-except
+                LOG.warning(messages.TOKEN_REFRESH_FAILED.format(
+                    exception=e))
+                self._token_refresher_wakeup.wait(
+                    TOKEN_REFRESH_RETRY_INTERVAL)
+
+    def close(self):
+        """
+        Stop the background token refresh and close the connections
+        """
+        self._closed = True
+        self._token_refresher_wakeup.set()
+        self.session.close()
+
+    def pool_stats(self):
+        """
+        :return: dict of the connection pool counters (requests, connects,
+                 reaped, hits and misses)
+        """
+        return self._adapter.stats.snapshot()
+
+    def coalesce_stats(self):
+        """
+        :return: dict of the GET calls, the coalesced ones (served by an
+                 identical request in flight) and the coalesce rate
+        """
+        if self._single_flight is None:
+            return dict(calls=0, coalesced=0, coalesce_rate=0.0)
+        return self._single_flight.stats()
+
+    def classify_failure(self, error, idempotent):
+        """
+        :param error: The exception of the request
+        :param idempotent: True if the request may be sent again
+        :return: tuple of (True if the server or network failed,
+                           True if the request should be retried,
+                           seconds the server asked to wait or None)
+        """
+        if isinstance(error, RestClientException):
+            response = error.args[0]
+            status_code = getattr(response, 'status_code', None)
+            if status_code not in self.retry_policy.RETRY_STATUSES:
+                return False, False, None
+            headers = getattr(response, 'headers', None) or {}
+            return (True,
+                    self.retry_policy.is_retryable_status(
+                        status_code, idempotent),
+                    parse_retry_after(headers.get('Retry-After')))
+        if isinstance(error, RequestConnectionError):
+            return True, idempotent or _is_connect_error(error), None
+        return True, False, None  # read timeout, do not wait twice
 
+    def count_retry(self):
+        with self._retries_lock:
+            self._retries += 1
+
+    def retry_stats(self):
+        """
+        :return: dict with the number of retries and the circuit breaker
+                 state, error rate and counters (opened, rejected)
+        """
+        stats = self.circuit_breaker.stats()
+        with self._retries_lock:
+            stats['retries'] = self._retries
+        return stats
+
+    def count_token_event(self, event):
+        with self._token_lock:
+            self._token_stats[event] += 1
+
+    def token_stats(self):
+        """
+        :return: dict with the token counters (see TOKEN_EVENTS),
+                 the token age and its lifetime (None if unknown)
+        """
+        with self._token_lock:
+            stats = dict(self._token_stats)
+            stats['age'] = time.time() - self._token_issued_at
+            stats['lifetime'] = self._token_lifetime
+        return stats
+
+    @_retry_on_failure(idempotent=False)
     @_retry_if_token_expire
     def post(self, resource_url, payload=None,
              exit_status=HTTP_EXIT_STATUS['CREATED']):
@@ -150,28 +609,135 @@ class RestClient(object):
                                         payload, exit_status)
         return json.loads(response.content)
 
+    @_retry_on_failure(idempotent=False)
     @_retry_if_token_expire
     def delete(self, resource_url, payload=None,
                exit_status=HTTP_EXIT_STATUS['DELETED']):
         return self._generic_action('delete', resource_url, payload,
                                     exit_status)
 
-    @_retry_if_token_expire
     def get(self, resource_url, payload=None,
             exit_status=HTTP_EXIT_STATUS['SUCCESS']):
         """
-        Send get request with params=payload
+        Send get request with params=payload. Identical requests in flight
+        are sent once, each caller decodes its own copy of the response.
         :param resource_url:
         :param payload: parameters for the get request
         :param exit_status:
         :return: get response passed to json
         """
+        if self._single_flight is None:
+            content = self._get_content(resource_url, payload, exit_status)
+        else:
+            key = (resource_url, json.dumps(payload, sort_keys=True),
+                   exit_status)
+            content = self._single_flight.do(key, lambda: self._get_content(
+                resource_url, payload, exit_status))
+        return json.loads(content)
+
+    @_retry_on_failure(idempotent=True)
+    @_retry_if_token_expire
+    def _get_content(self, resource_url, payload, exit_status):
         url = self.base_url + resource_url
         LOG.debug('http get request to {} {}'.format(url, payload))
         response = self.session.get(url, params=payload)
         self.verify_status_code(response, exit_status, 'get')
+        return response.content
+
+    @_retry_on_failure(idempotent=True)
+    @_retry_if_token_expire
+    def _get_url(self, url, exit_status=HTTP_EXIT_STATUS['SUCCESS']):
+        """
+        Send get request to a full URL (e.g the next page link)
+        :param url:
+        :param exit_status:
+        :return: get response passed to json
+        """
+        LOG.debug('http get request to {}'.format(url))
+        response = self.session.get(url)
+        self.verify_status_code(response, exit_status, 'get')
         return json.loads(response.content)
 
+    def get_pages(self, resource_url, payload, page_size, max_workers):
+        """
+        Get a collection page by page (limit and offset parameters).
+        When the server returns the page count, the other pages are
+        fetched concurrently, otherwise the next page links are followed.
+        If the server does not paginate, the whole collection is returned
+        as a single page.
+        :param resource_url:
+        :param payload: parameters for the get request
+        :param page_size: Number of items per page
+        :param max_workers: Maximum number of pages to fetch at the same time
+        :return: generator of the pages (lists of items) in order
+        """
+        params = dict(payload or {})
+        first = self.get(resource_url, dict(
+            params, **{PAGE_LIMIT_PARAM: page_size, PAGE_OFFSET_PARAM: 0}))
+        if not isinstance(first, dict) or PAGE_RESULTS not in first:
+            yield first  # the server does not paginate
+            return
+        yield first[PAGE_RESULTS]
+
+        count = first.get(PAGE_COUNT)
+        if count is None:
+            next_url = first.get(PAGE_NEXT)
+            while next_url:
+                page = self._get_url(next_url)
+                yield page[PAGE_RESULTS]
+                next_url = page.get(PAGE_NEXT)
+            return
+
+        # Use the page size of the server, it may be smaller than asked
+        page_size = len(first[PAGE_RESULTS]) or page_size
+        offsets = range(page_size, count, page_size)
+        for start in range(0, len(offsets), max_workers):
+            pages = run_concurrently([
+                self._page_func(resource_url, params, page_size, offset)
+                for offset in offsets[start:start + max_workers]])
+            for page in pages:
+                yield page[PAGE_RESULTS]
+
+    def _page_func(self, resource_url, params, page_size, offset):
+        def get_page():
+            return self.get(resource_url, dict(
+                params,
+                **{PAGE_LIMIT_PARAM: page_size, PAGE_OFFSET_PARAM: offset}))
+        return get_page
+
+    @_retry_on_failure(idempotent=True)
+    @_retry_if_token_expire
+    def get_stream(self, resource_url, payload=None,
+                   exit_status=HTTP_EXIT_STATUS['SUCCESS']):
+        """
+        Send get request with params=payload, and decode the JSON array
+        response while it is received.
+        :param resource_url:
+        :param payload: parameters for the get request
+        :param exit_status:
+        :return: generator of the array items
+        """
+        url = self.base_url + resource_url
+        LOG.debug('http get (stream) request to {} {}'.format(url, payload))
+        response = self.session.get(url, params=payload, stream=True)
+        try:
+            self.verify_status_code(response, exit_status, 'get')
+        except RestClientException:
+            response.close()
+            raise
+        return self._iter_response(response)
+
+    @staticmethod
+    def _iter_response(response):
+        try:
+            for item in iter_json_array(
+                    response.iter_content(STREAM_CHUNK_SIZE),
+                    response.encoding or 'utf-8'):
+                deadline.check()
+                yield item
+        finally:
+            response.close()
+
     @staticmethod
     def verify_status_code(response, status_code, action):
         """
@@ -199,7 +765,7 @@ class ExceptionSCBEClient(Exception):
     pass
 
 
-class VolumeNotFound(ExceptionSCBEClient):
+class VolumeNotFound(ExceptionSCBEClient, UnknownVolumeError):
     pass
 
 
@@ -208,7 +774,7 @@ class HostIDNotFound(ExceptionSCBEClient):
         super(HostIDNotFound, self).__init__(
             self,
             messages.HOST_NOT_FOUND_BY_VOLNAME.format(
-                host_id, wwn),
+                host_id=host_id, wwn=wwn),
         )
 
 
@@ -221,6 +787,109 @@ class HostIdNotFoundByWwn(ExceptionSCBEClient):
         )
 
 
+class VolumeDeltaSync(object):
+    """
+    Local copy of the SCBE volumes, kept up to date by listing only the
+    volumes that changed since the last listing (by last_update_time).
+    Volumes pending deletion are tombstones, so they are dropped.
+    Volumes deleted by others are not listed as changes, so a periodic
+    full listing reconciles the copy.
+    """
+
+    def __init__(self, vol_list, convert, full_sync_interval):
+        """
+        :param vol_list: callable(**filters) that lists volume records
+        :param convert: callable that converts a volume record to VolInfo
+        :param full_sync_interval: Seconds between two full listings
+        """
+        self._vol_list = vol_list
+        self._convert = convert
+        self._full_sync_interval = full_sync_interval
+        self._lock = threading.Lock()
+        self._vols = OrderedDict()
+        self._watermark = None
+        self._full_sync_at = None
+        self._delta_supported = True
+
+    def _needs_full_sync(self):
+        return self._watermark is None or not self._delta_supported or \
+            time.time() - self._full_sync_at > self._full_sync_interval
+
+    def volumes(self):
+        """
+        :return: list of VolInfo of all the volumes
+        """
+        with self._lock:
+            if self._needs_full_sync():
+                self._full_sync(self._vol_list())
+            else:
+                self._delta_sync()
+            return list(self._vols.values())
+
+    def _full_sync(self, records):
+        self._vols = OrderedDict()
+        self._watermark = None
+        self._apply(records)
+        self._full_sync_at = time.time()
+        LOG.debug(messages.VOLUME_FULL_SYNC.format(
+            num=len(self._vols), watermark=self._watermark))
+
+    def _delta_sync(self):
+        watermark = self._watermark
+        records = list(self._vol_list(
+            **{SCBE_VOLUME_CHANGED_SINCE_PARAM: watermark}))
+        for _vol in records:
+            updated = _vol.get(SCBE_VOLUME_LAST_UPDATE)
+            if updated is None or updated < watermark:
+                # SCBE ignored the filter, so this is a full listing
+                LOG.warning(messages.VOLUME_DELTA_SYNC_NOT_SUPPORTED.format(
+                    param=SCBE_VOLUME_CHANGED_SINCE_PARAM))
+                self._delta_supported = False
+                self._full_sync(records)
+                return
+        self._apply(records)
+        LOG.debug(messages.VOLUME_DELTA_SYNC.format(
+            num=len(records), watermark=watermark))
+
+    def _apply(self, records):
+        for _vol in records:
+            wwn = _vol['scsi_identifier']
+            if _vol.get(SCBE_VOLUME_PENDING_DELETION):
+                self._vols.pop(wwn, None)
+            else:
+                self._vols[wwn] = self._convert(_vol)
+            updated = _vol.get(SCBE_VOLUME_LAST_UPDATE)
+            if updated and (self._watermark is None or
+                            updated > self._watermark):
+                self._watermark = updated
+
+    def update(self, record):
+        """
+        Add or update a volume we changed (e.g created).
+        The watermark is not moved, so changes made by others meanwhile
+        are still listed by the next delta.
+        :param record: The SCBE volume record
+        """
+        with self._lock:
+            if self._watermark is not None:
+                self._vols[record['scsi_identifier']] = self._convert(record)
+
+    def forget(self, wwn):
+        """
+        Drop a volume we deleted
+        :param wwn:
+        """
+        with self._lock:
+            self._vols.pop(wwn, None)
+
+    def invalidate(self):
+        """
+        Make the next listing a full one
+        """
+        with self._lock:
+            self._watermark = None
+
+
 class IBMSCBEClientAPI(IBMStorageAbsClient):
     backend_type = messages.SCBE_STRING
 
@@ -244,6 +913,31 @@ class IBMSCBEClientAPI(IBMStorageAbsClient):
         self._client = RestClient(
             self.con_info, base_url, URL_SCBE_RESOURCE_GET_AUTH, referer,
         )
+        self._service_catalog = ServiceCatalog(
+            self._service_list, SERVICE_CATALOG_TTL)
+        self._host_directory = HostDirectory(
+            HOST_DIRECTORY_MAX_SIZE, HOST_DIRECTORY_TTL)
+        # The array of a volume never changes, so keep it with the hosts TTL
+        self._vol_arrays = ExpiringLRUCache(
+            VOLUME_ARRAY_CACHE_MAX_SIZE, HOST_DIRECTORY_TTL)
+        self._page_size = self.con_info.options.get(
+            CONF_PARAM_PAGE_SIZE, DEFAULT_PAGE_SIZE)
+        self._query_pushdown = self.con_info.options.get(
+            CONF_PARAM_VOLUME_QUERY_PUSHDOWN, DEFAULT_VOLUME_QUERY_PUSHDOWN)
+        self._max_concurrent_requests = self.con_info.options.get(
+            CONF_PARAM_MAX_CONCURRENT_REQUESTS,
+            DEFAULT_MAX_CONCURRENT_REQUESTS)
+        self._volume_sync = self._create_volume_sync()
+        # Per-volume and per-host lookups made at the same time are sent
+        # as one query with volume query pushdown, else concurrently
+        batch_window = self.con_info.options.get(
+            CONF_PARAM_BATCH_WINDOW, DEFAULT_BATCH_WINDOW)
+        self._vol_loader = BatchLoader(
+            self._vols_by_wwn, batch_window, QUERY_BATCH_SIZE)
+        self._mapping_loader = BatchLoader(
+            self._mappings_by_wwn, batch_window, QUERY_BATCH_SIZE)
+        self._host_loader = BatchLoader(
+            self._hosts_by_id, batch_window, QUERY_BATCH_SIZE)
         LOG.debug(
             messages.INIT_CLIENT.format(backend=messages.SCBE_STRING,
                                         ip=self.con_info.management_ip))
@@ -254,6 +948,21 @@ class IBMSCBEClientAPI(IBMStorageAbsClient):
             con_info.port = DEFAULT_SCBE_PORT
         return con_info
 
+    def _create_volume_sync(self):
+        """
+        :return: VolumeDeltaSync if incremental sync is enabled, else None
+        """
+        options = self.con_info.options
+        if not options.get(CONF_PARAM_INCREMENTAL_SYNC,
+                           DEFAULT_INCREMENTAL_SYNC):
+            return None
+        return VolumeDeltaSync(
+            self._vol_records,
+            self._get_vol_info,
+            options.get(CONF_PARAM_FULL_SYNC_INTERVAL,
+                        DEFAULT_FULL_SYNC_INTERVAL),
+        )
+
     @logme(LOG)
     def create_volume(self, vol, resource, size):
         """
@@ -262,55 +971,221 @@ class IBMSCBEClientAPI(IBMStorageAbsClient):
         :param size: in bytes
         :return: TODO, currently return the SCBE REST response
         """
-        if not self.resource_exists(resource):
+        service_id = self._service_catalog.get_id(resource)
+        if service_id is None:
             msg = messages.VOLUME_CREATE_FAIL_BECAUSE_NO_SERVICES_EXIST.\
                 format(vol, resource, self.con_info.management_ip)
             LOG.error(msg)
             raise CreateVolumeError(msg)
 
-        # TODO should handle multiple services with same name
         payload = dict(
-            service=self._service_list(name=resource)[0]['id'],
+            service=service_id,
             name=vol,
             size=size,
             size_unit="byte",
         )
 
-        post_response = self._client.post(URL_SCBE_RESOURCE_VOLUME, payload)
+        try:
+            post_response = self._client.post(
+                URL_SCBE_RESOURCE_VOLUME, payload)
+        except RestClientException as e:
+            if not self._is_unknown_service_error(e.args[0]):
+                raise
+            LOG.warning(messages.SERVICE_UNKNOWN_ON_VOLUME_CREATE.format(
+                vol=vol, service=resource, service_id=service_id))
+            self._service_catalog.invalidate()
+
+            # Retry only if the service was recreated with a new ID
+            new_service_id = self._service_catalog.get_id(resource)
+            if new_service_id is None or new_service_id == service_id:
+                raise
+            payload['service'] = new_service_id
+            post_response = self._client.post(
+                URL_SCBE_RESOURCE_VOLUME, payload)
+
+        if self._volume_sync is not None:
+            self._volume_sync.update(post_response)
         return self._get_vol_info(post_response)
 
+    @staticmethod
+    def _is_unknown_service_error(response):
+        """
+        :param response: The response of a failed volume creation
+        :return: True if SCBE rejected the request because of the service
+        """
+        status_code = getattr(response, 'status_code', None)
+        return status_code in (
+            RestClient.HTTP_EXIT_STATUS['BAD_REQUEST'],
+            RestClient.HTTP_EXIT_STATUS['NOT_FOUND'],
+        ) and IBMSCBEClientAPI._get_error_code(
+            response) == SCBE_ERROR_SERVICE_NOT_FOUND
+
+    @staticmethod
+    def _get_error_code(response):
+        """
+        :param response: The response of a failed request
+        :return: The SCBE error code of the response, or None if it is not
+                 an SCBE error reply
+        """
+        try:
+            return json.loads(
+                getattr(response, 'content', None)).get(SCBE_ERROR_CODE)
+        except (TypeError, ValueError, AttributeError):
+            return None
+
+    def _get_pages(self, resource_url, params=None):
+        """
+        :return: generator of the collection pages
+        """
+        return self._client.get_pages(
+            resource_url, params, self._page_size,
+            self._max_concurrent_requests)
+
+    def _get_collection(self, resource_url, params=None):
+        """
+        Get a whole collection, page by page if pagination is enabled
+        :param resource_url:
+        :param params: For filtering purposes
+        :return: list
+        """
+        if not self._page_size:
+            return self._client.get(resource_url, params)
+        items = []
+        for page in self._get_pages(resource_url, params):
+            items.extend(page)
+        return items
+
     def _service_list(self, **kwargs):
         """
         :param kwargs: For filtering purposes, e.g name
         :return: list
         """
-        return self._client.get(URL_SCBE_RESOURCE_SERVICE, kwargs)
+        return self._get_collection(URL_SCBE_RESOURCE_SERVICE, kwargs)
 
     def _vol_list(self, **kwargs):
-        return self._client.get(URL_SCBE_RESOURCE_VOLUME, kwargs)
+        return self._get_collection(URL_SCBE_RESOURCE_VOLUME, kwargs)
 
-    def list_volumes(self, wwn=None, vol_name=None, resource=None):
+    def _vol_records(self, name_prefix=None, name_suffix=None, **kwargs):
+        """
+        Stream the volumes, keeping only the fields the client uses.
+        With volume query pushdown, the name filters and the fields are
+        also sent to SCBE, so it returns less data if it supports them.
+        :param name_prefix: Drop the volumes without this name prefix
+        :param name_suffix: Drop the volumes without this name suffix
+        :param kwargs: For filtering purposes, e.g name
+        :return: generator of volume records
+        """
+        params = dict(kwargs)
+        if self._query_pushdown:
+            params[SCBE_FIELDS_PARAM] = ','.join(SCBE_VOLUME_FIELDS)
+            if name_prefix:
+                params[SCBE_NAME_PREFIX_PARAM] = name_prefix
+            if name_suffix:
+                params[SCBE_NAME_SUFFIX_PARAM] = name_suffix
+
+        if self._page_size:
+            # Every page is bounded, so decode it at once
+            vols = (_vol for page in self._get_pages(
+                URL_SCBE_RESOURCE_VOLUME, params) for _vol in page)
+        else:
+            vols = self._client.get_stream(URL_SCBE_RESOURCE_VOLUME, params)
+        for _vol in vols:
+            # In case the filters are not supported by SCBE
+            if not self._match_name(
+                    _vol.get('name', ''), name_prefix, name_suffix):
+                continue
+            yield {field: _vol[field]
+                   for field in SCBE_VOLUME_FIELDS if field in _vol}
+
+    @staticmethod
+    def _match_name(name, name_prefix, name_suffix):
+        return (not name_prefix or name.startswith(name_prefix)) and \
+            (not name_suffix or name.endswith(name_suffix))
+
+    def list_volumes(self, wwn=None, vol_name=None, resource=None,
+                     name_prefix=None, name_suffix=None):
         """
         :param wwn:
         :param vol_name:
-        :param resource: Not implemented for SCBE
+        :param resource: SCBE service name or list of service names
+                         (default all the services). With volume query
+                         pushdown, the services are listed concurrently,
+                         all the services by a freshly loaded catalog.
+                         Else the volumes are listed once and filtered.
+                         (ignored with incremental volume sync,
+                         which lists all the services)
+        :param name_prefix: List only the volumes with this name prefix.
+        :param name_suffix: List only the volumes with this name suffix.
+                            With a name filter, the response is decoded
+                            while received and the other volumes are
+                            dropped on the way (with volume query
+                            pushdown, the filters and the needed fields
+                            are also sent to SCBE).
         :return: list of VolInfo
         """
+        if self._volume_sync is not None and not wwn and not vol_name:
+            return [vol for vol in self._volume_sync.volumes()
+                    if self._match_name(vol.name, name_prefix, name_suffix)]
+
+        if wwn and not vol_name and resource is None and \
+                name_prefix is None and name_suffix is None:
+            return [self._get_vol_info(_vol)
+                    for _vol in self._vol_loader.load(wwn)]
+
         payload = {}
         if wwn:
             payload["scsi_identifier"] = wwn
         if vol_name:
             payload["name"] = vol_name
-        response = self._vol_list(**payload)
-        return [self._get_vol_info(_vol) for _vol in response]
+        if name_prefix is None and name_suffix is None:
+            vol_list = self._vol_list
+        else:
+            def vol_list(**kwargs):
+                return self._vol_records(name_prefix, name_suffix, **kwargs)
 
-    @staticmethod
-    def _get_vol_info(vol_rest_respond):
+        if resource is None and self._query_pushdown and not payload:
+            # So no service is missed, e.g a service added meanwhile
+            resource = self._service_catalog.load().keys() or None
+        elif isinstance(resource, basestring):
+            resource = [resource]
+        if resource is None:
+            return [self._get_vol_info(_vol) for _vol in vol_list(**payload)]
+        if not self._query_pushdown:
+            # One listing, filtered here (SCBE may not support the filter)
+            return [self._get_vol_info(_vol) for _vol in vol_list(**payload)
+                    if _vol.get(SCBE_VOLUME_SERVICE_NAME) in resource]
+        vols = []
+        for service_vols in run_concurrently(
+                [self._service_vol_list_func(vol_list, service, payload)
+                 for service in resource]):
+            vols.extend(service_vols)
+        return vols
+
+    def _service_vol_list_func(self, vol_list, service, payload):
+        """
+        :param vol_list: callable that lists the volume records
+        :param service: SCBE service name
+        :param payload: other filters
+        :return: callable that lists the VolInfo of the service
+        """
+        def service_vol_list():
+            response = vol_list(
+                **dict(payload, **{SCBE_VOLUME_SERVICE_NAME: service}))
+            # In case the filter is not supported by SCBE
+            return [self._get_vol_info(_vol) for _vol in response
+                    if _vol.get(SCBE_VOLUME_SERVICE_NAME, service) ==
+                    service]
+        return service_vol_list
+
+    def _get_vol_info(self, vol_rest_respond):
         """
         Convert volumes REST response to list of VolInfo objects
         :param vol_rest_respond:
         :return: list of VolInfo
         """
+        if 'array' in vol_rest_respond:
+            self._vol_arrays.set(vol_rest_respond['scsi_identifier'],
+                                 vol_rest_respond['array'])
         return VolInfo(
             vol_rest_respond['name'],
             vol_rest_respond['logical_capacity'],
@@ -321,7 +1196,11 @@ class IBMSCBEClientAPI(IBMStorageAbsClient):
     @logme(LOG)
     def delete_volume(self, wwn):
         resource = '{}/{}'.format(URL_SCBE_RESOURCE_VOLUME, wwn)
-        return self._client.delete(resource)
+        self._vol_arrays.pop(wwn)
+        response = self._client.delete(resource)
+        if self._volume_sync is not None:
+            self._volume_sync.forget(wwn)
+        return response
 
     @logme(LOG)
     def map_volume(self, wwn, host, lun=None):
@@ -332,13 +1211,36 @@ class IBMSCBEClientAPI(IBMStorageAbsClient):
         :param host: The host name in the storage system for mapping
         :param lun: LUN for mapping,
                     if not not found, the next available LUN
-        :return:
+        :return: The LUN of the mapping, or None if SCBE did not return it
         """
         host_id = self._get_host_id_by_vol(wwn, host)
         payload = dict(volume_id=wwn, host_id=host_id)
         if lun:
             payload['lun'] = lun
-        return self._client.post(URL_SCBE_RESOURCE_MAPPING, payload)
+        try:
+            response = self._client.post(URL_SCBE_RESOURCE_MAPPING, payload)
+        except RestClientException as e:
+            self._invalidate_host_of_vol(wwn, host)
+            self._raise_mapping_error(e, wwn, host, unmap=False)
+            raise
+        return self._get_mapping_lun(response, lun)
+
+    @staticmethod
+    def _get_mapping_lun(response, lun=None):
+        """
+        :param response: The mapping response, e.g
+                         {"mappings": [{"volume": WWN, "lun_number": 1,
+                                        "host": 331, "id": 845}]}
+        :param lun: The requested LUN, if any
+        :return: The LUN number of the mapping, or lun if the response
+                 does not include it
+        """
+        mappings = response.get(SCBE_MAPPINGS) \
+            if isinstance(response, dict) else None
+        for mapping in mappings or []:
+            if mapping.get(SCBE_MAPPING_LUN) is not None:
+                return int(mapping[SCBE_MAPPING_LUN])
+        return lun
 
     @logme(LOG)
     def _get_host_id_by_vol(self, wwn, host):
@@ -347,21 +1249,58 @@ class IBMSCBEClientAPI(IBMStorageAbsClient):
         :param host: The host name defined in the storage system
         :return: The host ID from the storage system of the volume
         """
-        _vol = self._vol_list(scsi_identifier=wwn)
-        if not _vol:
-            raise VolumeNotFound(wwn)
-        _vol = _vol[0]
-        _host = self._host_list(array_id=_vol['array'], name=host)
+        array_id = self._get_vol_array(wwn)
+        host_id = self._host_directory.get_id(array_id, host)
+        if host_id is not None:
+            return host_id
+
+        _host = self._host_list(array_id=array_id, name=host)
         if not _host or len(_host) > 1:
-            raise HostIdNotFoundByWwn(wwn, host, _vol['array'], _host)
+            self._invalidate_host_of_vol(wwn, host, array_id)
+            raise HostIdNotFoundByWwn(wwn, host, array_id, _host)
+        self._host_directory.add(_host[0])
         return _host[0]['id']
 
+    def _get_vol_array(self, wwn):
+        """
+        :param wwn: WWN of the volume
+        :return: The array ID of the volume
+        """
+        array_id = self._vol_arrays.get(wwn)
+        if array_id is not None:
+            return array_id
+
+        _vol = self._vol_loader.load(wwn)
+        if not _vol:
+            raise VolumeNotFound(wwn)
+        array_id = _vol[0]['array']
+        self._vol_arrays.set(wwn, array_id)
+        return array_id
+
+    def _invalidate_host_of_vol(self, wwn, host, array_id=None):
+        """
+        Drop the cached array of the volume and the cached host ID of host
+        on that array.
+        """
+        array_id = self._vol_arrays.pop(wwn, array_id)
+        self._host_directory.invalidate(array_id=array_id, hostname=host)
+
+    @logme(LOG)
+    def preload_host(self, host):
+        """
+        Load the host records of the given host name from all the arrays
+        :param host: The host name defined in the storage system
+        :return: None
+        """
+        for _host in self._host_list(name=host):
+            self._host_directory.add(_host)
+
     def _host_list(self, **kwargs):
         """
         get host list by filters
         :return: list of dicts per matching host
         """
-        return self._client.get(URL_SCBE_RESOURCE_HOST, kwargs)
+        return self._get_collection(URL_SCBE_RESOURCE_HOST, kwargs)
 
     def _host_by_id(self, _id):
         """
@@ -369,8 +1308,7 @@ class IBMSCBEClientAPI(IBMStorageAbsClient):
         :param: id : The SCBE host ID
         :return: Dict with the host info that applies to the ID
         """
-        url = '{}/{}'.format(URL_SCBE_RESOURCE_HOST, _id)
-        return self._client.get(url)
+        return self._host_loader.load(_id)
 
     @logme(LOG)
     def unmap_volume(self, wwn, host):
@@ -382,7 +1320,38 @@ class IBMSCBEClientAPI(IBMStorageAbsClient):
         """
         host_id = self._get_host_id_by_vol(wwn, host)
         payload = dict(volume_id=wwn, host_id=host_id)
-        return self._client.delete(URL_SCBE_RESOURCE_MAPPING, payload)
+        try:
+            return self._client.delete(URL_SCBE_RESOURCE_MAPPING, payload)
+        except RestClientException as e:
+            self._invalidate_host_of_vol(wwn, host)
+            self._raise_mapping_error(e, wwn, host, unmap=True)
+            raise
+
+    @staticmethod
+    def _raise_mapping_error(error, wwn, host, unmap):
+        """
+        Translate the SCBE response of a rejected mapping or unmapping to
+        the generic client errors, by its status and SCBE error code. Other
+        responses are left to the caller.
+        :param error: RestClientException
+        :param unmap: True for unmapping, False for mapping
+        :raise UnknownVolumeError, VolumeAlreadyMappedError,
+               VolumeNotMappedError: by the response
+        """
+        response = error.args[0]
+        status_code = getattr(response, 'status_code', None)
+        error_code = IBMSCBEClientAPI._get_error_code(response)
+        if error_code is None:
+            return  # not an SCBE error reply
+        if status_code == RestClient.HTTP_EXIT_STATUS['NOT_FOUND']:
+            if error_code == SCBE_ERROR_VOLUME_NOT_FOUND:
+                raise UnknownVolumeError(wwn)
+            if unmap and error_code == SCBE_ERROR_VOLUME_NOT_MAPPED:
+                raise VolumeNotMappedError(wwn, host)
+        if (not unmap and
+                status_code == RestClient.HTTP_EXIT_STATUS['CONFLICT'] and
+                error_code == SCBE_ERROR_VOLUME_ALREADY_MAPPED):
+            raise VolumeAlreadyMappedError(wwn, host)
 
     def allocation_unit(self):
         return ALLOCATION_UNIT
@@ -393,8 +1362,7 @@ class IBMSCBEClientAPI(IBMStorageAbsClient):
         :param resource: SCBE service name
         :return: boolean
         """
-        return resource in (_service['name']
-                            for _service in self._service_list(name=resource))
+        return self._service_catalog.get_id(resource) is not None
 
     def get_vol_mapping(self, wwn):
         """
@@ -407,25 +1375,28 @@ class IBMSCBEClientAPI(IBMStorageAbsClient):
         if not vol_mapping:
             return None
         host_id = vol_mapping[0]['host']
-        host_name = self._host_by_id(host_id)
-        if not host_name:
-            raise HostIDNotFound(host_id, wwn)
+        host = self._host_directory.get_host(host_id)
+        if host is None:
+            host = self._host_by_id(host_id)
+            if not host:
+                self._host_directory.invalidate(host_id=host_id)
+                raise HostIDNotFound(host_id, wwn)
+            self._host_directory.add(host)
 
-        return host_name['name']
+        return host['name']
 
     def _vol_mapping_list(self, volume_wwn):
         """
         :param volume_wwn: vol id to show the mapping
         :return:
         """
-        params = dict(volume=volume_wwn)
-        return self._client.get(URL_SCBE_RESOURCE_MAPPING, params)
+        return self._mapping_loader.load(volume_wwn)
 
     def list_service_names(self):
         """
         :return: list of available services
         """
-        return [_service['name'] for _service in self._service_list()]
+        return self._service_catalog.names()
 
     def handle_default_profile(self, default_profile):
         if default_profile is DEFAULT_SERVICE:
@@ -433,16 +1404,166 @@ class IBMSCBEClientAPI(IBMStorageAbsClient):
         else:
             return default_profile
 
-    def get_vols_mapping(self):
+    def get_vols_mapping(self, wwns=None):
         """
+        :param wwns: list of WWNs to get the mapping of (default all).
+                     With volume query pushdown, the WWNs are queried in
+                     concurrent batches.
         :return: dict of {[wwn]=[host_id],...}
         """
-        mapping_list = self._client.get(URL_SCBE_RESOURCE_MAPPING)
+        if wwns is None or not self._query_pushdown:
+            mapping_list = self._get_collection(URL_SCBE_RESOURCE_MAPPING)
+        else:
+            mapping_list = self._get_collection_in(
+                URL_SCBE_RESOURCE_MAPPING, SCBE_MAPPING_VOLUME_IN_PARAM,
+                sorted(set(wwns)))
+        if wwns is not None:
+            # Without the filter, or in case SCBE does not support it
+            wwns = set(wwns)
+            mapping_list = [_map for _map in mapping_list
+                            if _map['volume'] in wwns]
         return {_map['volume']: _map['host'] for _map in mapping_list}
 
-    def get_hosts(self):
+    def get_hosts(self, host_ids=None):
         """
+        :param host_ids: list of host IDs to get (default all).
+                         Hosts that are not in the host directory are
+                         queried in concurrent batches with volume query
+                         pushdown, else taken from the whole host list.
         :return: dict of {[host_id]=[hostname],...}
         """
-        host_list = self._host_list()
+        if host_ids is None:
+            host_list = self._host_list()
+        else:
+            host_list = []
+            missing = set()
+            for host_id in set(host_ids):
+                host = self._host_directory.get_host(host_id)
+                if host is None:
+                    missing.add(host_id)
+                else:
+                    host_list.append(host)
+            if missing:
+                if self._query_pushdown:
+                    missing_hosts = self._get_collection_in(
+                        URL_SCBE_RESOURCE_HOST, SCBE_HOST_ID_IN_PARAM,
+                        sorted(missing))
+                else:
+                    missing_hosts = self._host_list()
+                host_list.extend(
+                    _host for _host in missing_hosts
+                    # Without the filter, or in case SCBE does not support it
+                    if _host['id'] in missing)
+        for _host in host_list:
+            self._host_directory.add(_host)
         return {_host['id']: _host['name'] for _host in host_list}
+
+    def _vols_by_wwn(self, wwns):
+        """
+        Batch function of the volume loader
+        :param wwns: list of WWNs
+        :return: dict of {[wwn]=[list of volume records],...}
+        """
+        if len(wwns) == 1 or not self._query_pushdown:
+            return self._get_each(
+                lambda wwn: self._vol_list(scsi_identifier=wwn), wwns)
+        return self._group_by(
+            self._get_collection_in(
+                URL_SCBE_RESOURCE_VOLUME, SCBE_VOLUME_WWN_IN_PARAM, wwns),
+            'scsi_identifier', wwns)
+
+    def _mappings_by_wwn(self, wwns):
+        """
+        Batch function of the mapping loader
+        :param wwns: list of volume WWNs
+        :return: dict of {[wwn]=[list of mapping records],...}
+        """
+        if len(wwns) == 1 or not self._query_pushdown:
+            return self._get_each(
+                lambda wwn: self._get_collection(
+                    URL_SCBE_RESOURCE_MAPPING, dict(volume=wwn)), wwns)
+        return self._group_by(
+            self._get_collection_in(
+                URL_SCBE_RESOURCE_MAPPING, SCBE_MAPPING_VOLUME_IN_PARAM,
+                wwns),
+            'volume', wwns)
+
+    def _hosts_by_id(self, host_ids):
+        """
+        Batch function of the host loader
+        :param host_ids: list of SCBE host IDs
+        :return: dict of {[host_id]=[host record],...}
+        """
+        if len(host_ids) == 1 or not self._query_pushdown:
+            return self._get_each(
+                lambda host_id: self._client.get(
+                    '{}/{}'.format(URL_SCBE_RESOURCE_HOST, host_id)),
+                host_ids)
+        hosts = self._group_by(
+            self._get_collection_in(
+                URL_SCBE_RESOURCE_HOST, SCBE_HOST_ID_IN_PARAM, host_ids),
+            'id', host_ids)
+        return {host_id: _hosts[0] if _hosts else None
+                for host_id, _hosts in hosts.items()}
+
+    def _get_each(self, get, keys):
+        """
+        Get the items of the keys by concurrent exact match queries, one
+        per key (without volume query pushdown, SCBE may not support the
+        __in filters)
+        :param get: callable that gets the item of one key
+        :param keys: list of keys
+        :return: dict of {[key]=[item],...}
+        """
+        return dict(zip(keys, run_concurrently(
+            [partial(get, key) for key in keys],
+            self._max_concurrent_requests)))
+
+    @staticmethod
+    def _group_by(items, field, keys):
+        """
+        :return: dict of {[key]=[list of the items with field=key],...}
+                 (items of other keys are dropped, in case the filter
+                 is not supported by SCBE)
+        """
+        groups = {key: [] for key in keys}
+        for item in items:
+            if item.get(field) in groups:
+                groups[item[field]].append(item)
+        return groups
+
+    def batch_stats(self):
+        """
+        :return: dict of the loads and batches of every lookup loader
+        """
+        return dict(
+            volumes=self._vol_loader.stats(),
+            mappings=self._mapping_loader.stats(),
+            hosts=self._host_loader.stats(),
+        )
+
+    def _get_collection_in(self, resource_url, param, values):
+        """
+        Get the items of a collection that match a list of values,
+        by concurrent queries of QUERY_BATCH_SIZE values each
+        :param resource_url:
+        :param param: The __in filter parameter, e.g volume__in
+        :param values: list of values
+        :return: list
+        """
+        items = []
+        for batch_items in run_concurrently(
+                [self._collection_in_func(
+                    resource_url, param,
+                    values[start:start + QUERY_BATCH_SIZE])
+                 for start in range(0, len(values), QUERY_BATCH_SIZE)],
+                self._max_concurrent_requests):
+            items.extend(batch_items)
+        return items
+
+    def _collection_in_func(self, resource_url, param, values):
+        def get_collection_in():
+            return self._get_collection(
+                resource_url,
+                {param: ','.join(unicode(value) for value in values)})
+        return get_collection_in
@@ -0,0 +1,280 @@
+##############################################################################
+# Copyright 2016 IBM Corp.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##############################################################################
+
+import time
+import logging
+import threading
+from collections import OrderedDict, deque
+from ibm_storage_flocker_driver.lib import messages
+from ibm_storage_flocker_driver.lib.utils import config_logger
+
+LOG = config_logger(logging.getLogger(__name__))
+
+
+class InventoryEntry(object):
+
+    def __init__(self, vol_info, dataset_id, attached_to):
+        """
+        Holds what the driver knows about one volume of the cluster
+        :param vol_info: VolInfo
+        :param dataset_id: UUID of the Flocker dataset
+        :param attached_to: The hostname the volume is attached to or None
+        """
+        self.vol_info = vol_info
+        self.dataset_id = dataset_id
+        self.attached_to = attached_to
+        self.updated_at = time.time()
+
+
+class VolumeInventory(object):
+    """
+    In-memory inventory of the cluster volumes, indexed by WWN. Entries
+    older than max_age are not served, so the caller falls back to the
+    backend.
+    Every write-through update bumps the inventory generation and is kept
+    in a journal, so it is replayed onto a full listing that started before
+    it instead of being overridden by it.
+    """
+    MAX_JOURNAL = 1000  # write-through updates kept for replay
+
+    def __init__(self, max_age):
+        """
+        :param max_age: Seconds an entry is considered fresh
+        """
+        self._max_age = max_age
+        self._lock = threading.RLock()
+        self._by_wwn = OrderedDict()
+        self._generation = 0
+        self._journal = deque()  # (generation, change) since the listing
+        self._journal_start = 0  # generation of the last dropped change
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def _is_fresh(self, entry):
+        return time.time() - entry.updated_at <= self._max_age
+
+    @staticmethod
+    def _add(by_wwn, entry):
+        wwn = entry.vol_info.wwn
+        by_wwn.pop(wwn, None)
+        by_wwn[wwn] = entry
+
+    def _write(self, change):
+        """
+        Apply a write-through update, and journal it for the listings that
+        run meanwhile.
+        :param change: callable that updates the given WWN to entry dict
+        """
+        with self._lock:
+            self._generation += 1
+            change(self._by_wwn)
+            self._journal.append((self._generation, change))
+            if len(self._journal) > self.MAX_JOURNAL:
+                self._journal_start = self._journal.popleft()[0]
+
+    def replace(self, entries, generation=None):
+        """
+        Replace the whole inventory (e.g after a full volume listing)
+        :param entries: list of InventoryEntry
+        :param generation: The inventory generation when the listing started.
+                           If given, the updates since then are replayed onto
+                           the entries. If they are no longer all kept, the
+                           entries are dropped.
+        :return: True if the inventory was replaced
+        """
+        with self._lock:
+            if generation is not None and generation < self._journal_start:
+                return False
+            by_wwn = OrderedDict()
+            for entry in entries:
+                self._add(by_wwn, entry)
+            if generation is not None:
+                for change_generation, change in self._journal:
+                    if change_generation > generation:
+                        change(by_wwn)
+            self._by_wwn = by_wwn
+            self._journal.clear()
+            self._journal_start = self._generation
+            return True
+
+    def put(self, vol_info, dataset_id, attached_to=None):
+        """
+        Add or update a volume
+        :param vol_info: VolInfo
+        :param dataset_id: UUID
+        :param attached_to: hostname or None
+        """
+        entry = InventoryEntry(vol_info, dataset_id, attached_to)
+        self._write(lambda by_wwn: self._add(by_wwn, entry))
+
+    def set_attached(self, wwn, attached_to):
+        """
+        Update the attached host of a volume that is in the inventory
+        :param wwn:
+        :param attached_to: hostname or None
+        """
+        def change(by_wwn):
+            entry = by_wwn.get(wwn)
+            if entry is not None:
+                self._add(by_wwn, InventoryEntry(
+                    entry.vol_info, entry.dataset_id, attached_to))
+        self._write(change)
+
+    def invalidate(self, wwn):
+        """
+        Keep listing the volume, but stop serving lookups of it until the
+        next full listing (e.g its state is unknown after a failure)
+        :param wwn:
+        """
+        def change(by_wwn):
+            entry = by_wwn.get(wwn)
+            if entry is not None:
+                entry.updated_at = 0
+        self._write(change)
+
+    def remove(self, wwn):
+        """
+        Drop a volume (e.g the volume was deleted)
+        :param wwn:
+        """
+        self._write(lambda by_wwn: by_wwn.pop(wwn, None))
+
+    def get(self, wwn):
+        """
+        :param wwn:
+        :return: InventoryEntry if the volume is known and fresh, else None
+        """
+        with self._lock:
+            entry = self._by_wwn.get(wwn)
+        if entry is None or not self._is_fresh(entry):
+            return None
+        return entry
+
+    def entries(self):
+        """
+        :return: list of all the InventoryEntry, regardless of their age
+        """
+        with self._lock:
+            return self._by_wwn.values()
+
+
+class InventoryRefresher(object):
+    """
+    Background worker that keeps the volume inventory fresh, so listing the
+    volumes does not wait for the backend (stale-while-revalidate).
+    """
+
+    def __init__(self, refresh_func, interval, stale_after):
+        """
+        :param refresh_func: callable that lists the volumes from the backend
+                             and updates the inventory. Returns False if the
+                             result was dropped (see VolumeInventory.replace)
+        :param interval: Seconds between two refreshes
+        :param stale_after: Seconds after the last successful refresh before
+                            the inventory is considered stale
+        """
+        self._refresh_func = refresh_func
+        self._interval = interval
+        self._stale_after = stale_after
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+        self.last_success_at = None
+        self.last_duration = None
+        self.last_error = None
+        self.refreshes = 0
+        self.failures = 0
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._run, name='ibm-inventory-refresher')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._wakeup.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self.refresh()
+            except Exception:  # pylint: disable=broad-except
+                pass  # already logged, keep serving the last inventory
+            self._wakeup.wait(self._interval)
+            self._wakeup.clear()
+
+    def wakeup(self):
+        """
+        Trigger a refresh now instead of waiting for the next interval
+        """
+        self._wakeup.set()
+
+    def refresh(self):
+        """
+        Refresh the inventory in the calling thread.
+        :raise: the backend exception if the refresh failed
+        """
+        with self._lock:
+            start = time.time()
+            try:
+                applied = self._refresh_func()
+            except Exception as e:
+                self.failures += 1
+                self.last_error = e
+                LOG.warning(messages.INVENTORY_REFRESH_FAILED.format(
+                    exception=e, age=self.age()))
+                raise
+            self.last_duration = time.time() - start
+            if not applied:
+                # too many updates during the listing, list again on the
+                # next interval
+                LOG.debug(messages.INVENTORY_REFRESH_DROPPED)
+                return
+            self.refreshes += 1
+            self.last_success_at = time.time()
+            self.last_error = None
+            LOG.debug(messages.INVENTORY_REFRESHED.format(
+                duration=self.last_duration))
+
+    def age(self):
+        """
+        :return: Seconds since the last successful refresh or None
+        """
+        if self.last_success_at is None:
+            return None
+        return time.time() - self.last_success_at
+
+    def is_stale(self):
+        age = self.age()
+        return age is None or age > self._stale_after
+
+    def stats(self):
+        """
+        :return: dict with the refresh metrics for monitoring
+        """
+        return dict(
+            age=self.age(),
+            duration=self.last_duration,
+            refreshes=self.refreshes,
+            failures=self.failures,
+            stale=self.is_stale(),
+            last_error=str(self.last_error) if self.last_error else None,
+        )
@@ -0,0 +1,86 @@
+##############################################################################
+# Copyright 2016 IBM Corp.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##############################################################################
+
+
+import threading
+from functools import wraps
+from contextlib import contextmanager
+
+_local = threading.local()
+
+
+def current():
+    """
+    :return: dict of the memoized lookups of the running operation, or None
+    """
+    return getattr(_local, 'lookups', None)
+
+
+@contextmanager
+def lookup_scope():
+    """
+    Memoize the lookups of the block (see memoized). The scope is kept per
+    thread, and a nested scope shares the lookups of the outer one, so the
+    nested calls of an operation do not repeat its lookups.
+    """
+    if current() is not None:
+        yield
+        return
+    _local.lookups = {}
+    try:
+        yield
+    finally:
+        _local.lookups = None
+
+
+def with_lookup_scope(func):
+    """
+    Decorator for running a method within a lookup scope.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with lookup_scope():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def memoized(func):
+    """
+    Decorator for memoizing a lookup method within the lookup scope, by its
+    arguments. Out of a scope the lookup is not memoized, and errors are
+    never memoized.
+    """
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        lookups = current()
+        if lookups is None:
+            return func(self, *args, **kwargs)
+        key = (id(self), func.__name__, args,
+               tuple(sorted(kwargs.items())))
+        if key not in lookups:
+            lookups[key] = func(self, *args, **kwargs)
+        return lookups[key]
+    return wrapper
+
+
+def invalidate():
+    """
+    Drop the memoized lookups of the running operation, e.g after it
+    changed the backend (map, unmap, delete).
+    """
+    lookups = current()
+    if lookups is not None:
+        lookups.clear()
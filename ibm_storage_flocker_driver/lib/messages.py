@@ -143,6 +143,39 @@ DRIVER_OPERATION_VOL_RESCAN_OS = \
 DRIVER_OPERATION_VOL_RESCAN_MULTIPATH = \
     'RESCAN: Executing multipathing rescan: {cmd}'
 
+DRIVER_OPERATION_VOL_RESCAN_LUN = \
+    'RESCAN: Scanning LUN {lun}: "{channel} {target} {lun}" > {scan_file}'
+
+DRIVER_OPERATION_VOL_DELETE_DEVICE = \
+    'RESCAN: Removing SCSI device {device}: "1" > {delete_file}'
+
+DRIVER_OPERATION_VOL_RESCAN_START_DELETE = \
+    'RESCAN: Removing the SCSI devices {devices} of WWN [{blockdevice_id}].'
+
+PATH_DEVICES_NOT_FOUND = \
+    'Cannot read the SCSI devices of the multipath device {device_path} ' \
+    '({exception}).'
+
+DEVICE_DELETE_FAILED = \
+    'RESCAN: Removing the SCSI devices {devices} failed ({exception}), ' \
+    'rescanning the host.'
+
+MULTIPATHD_NOT_AVAILABLE = \
+    'Cannot reach multipathd at {socket_path} ({exception}).'
+
+MULTIPATHD_COMMAND_FAILED = \
+    'multipathd command "{cmd}" failed, reply: {reply}'
+
+MULTIPATHD_FALLBACK = \
+    '{exception} Running the multipath command instead.'
+
+LUN_SCAN_FAILED = \
+    'RESCAN: LUN scan failed ({exception}), rescanning the host.'
+
+LUN_SCAN_DEVICE_NOT_FOUND = \
+    'RESCAN: Devices of WWNs {wwns} not found after the LUN scan, ' \
+    'rescanning the host.'
+
 DRIVER_OPERATION_VOL_RESCAN_START_ATTACH = \
     'RESCAN: Executing rescan commands to discover device for ' \
     'WWN [{blockdevice_id}].'
@@ -162,3 +195,90 @@ HOSTNAME_TO_BE_USE = \
 INIT_CLIENT = 'Login to {backend} IP address {ip}.'
 
 HTTP_REQUEST_DEBUG = 'HTTP {action} request to {url} {payload}'
+
+SERVICE_CATALOG_LOADED = \
+    'Loaded service catalog with {num} services: {services}.'
+
+SERVICE_UNKNOWN_ON_VOLUME_CREATE = \
+    'Volume [{vol}] creation failed because service [{service}] ' \
+    '(ID {service_id}) is unknown to the storage system. ' \
+    'Invalidating the service catalog.'
+
+INVENTORY_REFRESHED = \
+    'Volume inventory refreshed in {duration:.3f} seconds.'
+
+INVENTORY_REFRESH_DROPPED = \
+    'Volume inventory was updated too many times during the refresh, ' \
+    'refresh again on the next interval.'
+
+INVENTORY_REFRESH_FAILED = \
+    'Volume inventory refresh failed with error {exception}. ' \
+    'Last successful refresh was {age} seconds ago.'
+
+INVENTORY_SERVED_STALE = \
+    'Listing volumes from a stale inventory ' \
+    '(last successful refresh {age} seconds ago, last error {error}).'
+
+VOLUME_FULL_SYNC = \
+    'Full volume sync listed {num} volumes (watermark {watermark}).'
+
+VOLUME_DELTA_SYNC = \
+    'Delta volume sync applied {num} changes since {watermark}.'
+
+VOLUME_DELTA_SYNC_NOT_SUPPORTED = \
+    'The storage system ignored the volume filter {param}, ' \
+    'falling back to full volume sync.'
+
+TOKEN_LIFETIME_LEARNED = \
+    'Token expired after {lifetime:.0f} seconds, ' \
+    'refreshing the next tokens before that.'
+
+TOKEN_REFRESH_FAILED = \
+    'Background token refresh failed with error {exception}.'
+
+TOKEN_CACHE_READ_FAILED = \
+    'Failed to read the cached token {path}, error {exception}. ' \
+    'Logging in instead.'
+
+TOKEN_CACHE_WRITE_FAILED = \
+    'Failed to update the cached token {path}, error {exception}.'
+
+TOKEN_CACHE_USED = \
+    'Using the cached token issued at {issued_at}, skipping login.'
+
+TOKEN_CACHE_REJECTED = \
+    'The cached token was rejected, discarding it.'
+
+IDLE_CONNECTION_REAPED = \
+    'Closing the connection to {host}, it was idle for {idle:.0f} seconds.'
+
+DEADLINE_EXCEEDED = \
+    'Operation {operation} did not complete within its deadline ' \
+    'of {budget} seconds.'
+
+REQUEST_RETRY = \
+    'Request {func_name} failed with {error}, ' \
+    'retry {attempt} of {max_retries} in {delay:.2f} seconds.'
+
+CIRCUIT_STATE_CHANGED = \
+    'Circuit breaker of {name} changed from {old} to {new}.'
+
+CIRCUIT_OPEN_FAIL_FAST = \
+    'Too many failed requests to {name}, failing fast. ' \
+    'Next try in {retry_in:.0f} seconds.'
+
+VOLUME_NOT_FOUND_ON_BACKEND = \
+    'Volume {wwn} does not exist on the storage system.'
+
+VOLUME_ALREADY_MAPPED = \
+    'Cannot map volume {wwn} to host {host}, it is already mapped.'
+
+VOLUME_NOT_MAPPED = \
+    'Cannot unmap volume {wwn} from host {host}, it is not mapped to it.'
+
+OPTIMISTIC_DETACH_FALLBACK = \
+    'Volume {wwn} is not mapped to this node {host}, ' \
+    'looking up its mapping.'
+OPTIMISTIC_DETACH_REJECTED = \
+    'Unmapping volume {wwn} from this node {host} failed ({exception}), ' \
+    'looking up its mapping.'
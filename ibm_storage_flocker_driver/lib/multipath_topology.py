@@ -0,0 +1,163 @@
+##############################################################################
+# Copyright 2016 IBM Corp.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##############################################################################
+
+import re
+from collections import namedtuple
+
+# map header, e.g "mpathd (36001738cfc9035e8...) dm-8 IBM     ,2810XIV"
+# or "200173800fdf50f86 dm-0 IBM     ,2810XIV" (without user friendly name)
+_MAP_RE = re.compile(
+    r'(?P<name>\S+)\s+(?:\((?P<wwid>\S+)\)\s+)?(?P<sysfs>dm-\d+)\s+'
+    r'(?P<vendor>[^,]*),(?P<product>.*)')
+# path, e.g "  |- 3:0:0:1 sdb 8:16 active ready running"
+# or a failing one "  `- #:#:#:# -   #:# failed faulty running"
+_PATH_RE = re.compile(
+    r'(?P<hcil>[\d#]+:[\d#]+:[\d#]+:[\d#]+)\s+(?P<dev>\S+)\s+'
+    r'(?P<dev_t>[\d#]+:[\d#]+)\s+(?P<dm_st>\S+)\s+(?P<chk_st>\S+)\s+'
+    r'(?P<dev_st>\S+)')
+# the first character of the lines that are not a map header
+_NOT_HEADER_CHARS = frozenset(' \t`|\r\n')
+
+MultipathMap = namedtuple(
+    'MultipathMap', ['wwid', 'name', 'sysfs', 'vendor', 'product', 'paths'])
+MultipathPath = namedtuple(
+    'MultipathPath', ['hcil', 'dev', 'dev_t', 'dm_st', 'chk_st', 'dev_st'])
+
+
+def _parse_header(line):
+    """
+    :param line: A line of multipath -ll
+    :return: The match of a map header line, or None
+    """
+    if not line or line[0] in _NOT_HEADER_CHARS:
+        return None
+    return _MAP_RE.match(line)
+
+
+def _wwid_keys(wwid):
+    """
+    :return: The WWNs a map wwid is found by: the wwid, and the wwid
+             without its leading NAA type digit (the WWN of the volume
+             on the storage system)
+    """
+    wwid = wwid.lower()
+    return wwid, wwid[1:]
+
+
+def _new_map(header):
+    vendor, product = header.group('vendor', 'product')
+    return MultipathMap(
+        wwid=header.group('wwid') or header.group('name'),
+        name=header.group('name'),
+        sysfs=header.group('sysfs'),
+        vendor=vendor.strip(),
+        product=product.strip(),
+        paths=[],
+    )
+
+
+def _read_paths(lines, paths):
+    """
+    Read the path lines of a map into paths, until the next map header.
+    :param lines: Iterator of the multipath -ll lines
+    :param paths: list to add the MultipathPath of the map to
+    :return: The match of the next map header, or None at the end
+    """
+    for line in lines:
+        header = _parse_header(line)
+        if header:
+            return header
+        path = _PATH_RE.search(line)
+        if path:
+            paths.append(MultipathPath(*path.group(*MultipathPath._fields)))
+    return None
+
+
+def iter_multipath_maps(lines):
+    """
+    Parse the multipath -ll output line by line.
+    :param lines: Iterable of the lines (e.g a file or a pipe)
+    :return: Generator of MultipathMap
+    """
+    lines = iter(lines)
+    header = None
+    for line in lines:
+        header = _parse_header(line)
+        if header:
+            break
+    while header:
+        mp_map = _new_map(header)
+        header = _read_paths(lines, mp_map.paths)
+        yield mp_map
+
+
+def find_multipath_map(lines, wwn):
+    """
+    Find the map of a WWN in the multipath -ll output. Only the map
+    headers are parsed until the WWN is found, and the lines after its
+    map are not read.
+    :param lines: Iterable of the lines (e.g a file or a pipe)
+    :param wwn: The WWN of the volume
+    :return: The MultipathMap of the WWN, or None if not found
+    """
+    wwn = wwn.lower()
+    lines = iter(lines)
+    for line in lines:
+        # cheap test first, most headers are of other maps
+        if wwn not in line.lower():
+            continue
+        header = _parse_header(line)
+        if header and wwn in _wwid_keys(
+                header.group('wwid') or header.group('name')):
+            mp_map = _new_map(header)
+            _read_paths(lines, mp_map.paths)
+            return mp_map
+    return None
+
+
+class MultipathTopology(object):
+    """
+    Index of the multipath maps of the node by WWN, parsed from one
+    multipath -ll output.
+    """
+
+    def __init__(self, maps):
+        """
+        :param maps: Iterable of MultipathMap (see iter_multipath_maps)
+        """
+        self.maps = list(maps)
+        self._by_wwn = {}
+        for mp_map in reversed(self.maps):  # the first map of a WWN wins
+            for key in _wwid_keys(mp_map.wwid):
+                self._by_wwn[key] = mp_map
+
+    @classmethod
+    def parse(cls, lines):
+        """
+        :param lines: Iterable of the multipath -ll lines
+        :return: MultipathTopology
+        """
+        return cls(iter_multipath_maps(lines))
+
+    def find(self, wwn):
+        """
+        :param wwn: The WWN of the volume (or the wwid of the map)
+        :return: The MultipathMap of the WWN, or None if not found
+        """
+        return self._by_wwn.get(wwn.lower())
+
+    def __len__(self):
+        return len(self.maps)
@@ -0,0 +1,181 @@
+##############################################################################
+# Copyright 2016 IBM Corp.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##############################################################################
+
+import json
+import socket
+import struct
+import logging
+from ibm_storage_flocker_driver.lib import messages, deadline
+from ibm_storage_flocker_driver.lib.utils import config_logger
+
+LOG = config_logger(logging.getLogger(__name__))
+
+# abstract unix socket of multipathd (see libmpathcmd)
+MULTIPATHD_SOCKET = '\0/org/kernel/linux/storage/multipathd'
+MULTIPATHD_TIMEOUT = 10  # seconds per command
+MULTIPATHD_FAILED_REPLIES = ('fail', 'timeout')
+MULTIPATHD_MAP_UUID_PREFIX = 'mpath-'
+# the messages are framed by their length as a native size_t
+_LENGTH = struct.Struct('L')
+
+
+class MultipathdError(Exception):
+    pass
+
+
+class MultipathdNotAvailable(MultipathdError):
+
+    def __init__(self, socket_path, exception):
+        MultipathdError.__init__(
+            self,
+            messages.MULTIPATHD_NOT_AVAILABLE.format(
+                socket_path=socket_path.replace('\0', '@'),
+                exception=exception),
+        )
+
+
+class MultipathdCommandFailed(MultipathdError):
+
+    def __init__(self, cmd, reply):
+        MultipathdError.__init__(
+            self,
+            messages.MULTIPATHD_COMMAND_FAILED.format(cmd=cmd, reply=reply),
+        )
+        self.cmd = cmd
+        self.reply = reply
+
+
+class MultipathdClient(object):
+    """
+    Client of the control socket of the running multipathd daemon, the
+    same interface as multipathd -k. Queries are served from the state of
+    the daemon, without spawning multipath and running its path checkers.
+    """
+
+    def __init__(self, socket_path=MULTIPATHD_SOCKET,
+                 timeout=MULTIPATHD_TIMEOUT):
+        """
+        :param socket_path: The unix socket of multipathd, a leading NUL
+                            is the abstract namespace
+        :param timeout: Seconds a command may take (bounded by the deadline)
+        """
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def command(self, cmd):
+        """
+        Run a multipathd command (e.g "show maps json").
+        :param cmd: The command
+        :raise MultipathdNotAvailable: if multipathd cannot be reached
+        :raise MultipathdCommandFailed: if multipathd rejected the command
+        :raise DeadlineExceeded: if the operation deadline passed
+        :return: The reply
+        """
+        timeout = deadline.timeout(self.timeout)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(timeout)
+            sock.connect(self.socket_path)
+            self._send(sock, cmd)
+            reply = self._recv(sock)
+        except (socket.error, EOFError) as e:
+            deadline.check()
+            raise MultipathdNotAvailable(self.socket_path, e)
+        finally:
+            sock.close()
+        LOG.debug("multipathd {} output : {}".format(cmd, reply))
+        if reply.strip() in MULTIPATHD_FAILED_REPLIES:
+            raise MultipathdCommandFailed(cmd, reply.strip())
+        return reply
+
+    @staticmethod
+    def _send(sock, cmd):
+        data = cmd + '\0'
+        sock.sendall(_LENGTH.pack(len(data)) + data)
+
+    @classmethod
+    def _recv(cls, sock):
+        length = _LENGTH.unpack(cls._recv_exactly(sock, _LENGTH.size))[0]
+        return cls._recv_exactly(sock, length).rstrip('\0')
+
+    @staticmethod
+    def _recv_exactly(sock, size):
+        chunks = []
+        while size > 0:
+            chunk = sock.recv(size)
+            if not chunk:
+                raise EOFError('multipathd closed the connection')
+            chunks.append(chunk)
+            size -= len(chunk)
+        return ''.join(chunks)
+
+    def show_maps(self):
+        """
+        :return: list of the multipath maps (show maps json), e.g
+                 {"name": "mpatha", "uuid": "36001738cfc9035e8...",
+                  "sysfs": "dm-0", "path_groups": [{"paths": [
+                      {"dev": "sdb", "hcil": "3:0:0:1", "dm_st": "active",
+                       "chk_st": "ready", ...}]}], ...}
+        """
+        reply = self.command('show maps json')
+        try:
+            return json.loads(reply)['maps']
+        except (ValueError, KeyError, TypeError):
+            raise MultipathdCommandFailed('show maps json', reply)
+
+    def find_map(self, wwn, maps=None):
+        """
+        :param wwn: The WWN of the volume, the map wwid ends with it
+        :param maps: The maps to search (see show_maps), None to query them
+        :return: The map of the WWN (see show_maps), or None if not found
+        """
+        wwn = wwn.lower()
+        for mp_map in self.show_maps() if maps is None else maps:
+            uuid = mp_map.get('uuid', '').lower()
+            if uuid.startswith(MULTIPATHD_MAP_UUID_PREFIX):
+                uuid = uuid[len(MULTIPATHD_MAP_UUID_PREFIX):]
+            if uuid.endswith(wwn):
+                return mp_map
+        return None
+
+    @staticmethod
+    def path_states(mp_map):
+        """
+        :param mp_map: A map (see show_maps)
+        :return: dict of the path devices of the map and their states,
+                 e.g {"sdb": ("active", "ready")}
+        """
+        return {path['dev']: (path.get('dm_st'), path.get('chk_st'))
+                for group in mp_map.get('path_groups', [])
+                for path in group.get('paths', [])}
+
+    def reconfigure(self):
+        """
+        Reload the multipath maps (like multipath -r).
+        """
+        self.command('reconfigure')
+
+    def add_map(self, name):
+        """
+        Create the map of a device that multipathd knows (e.g its wwid).
+        """
+        self.command('add map {}'.format(name))
+
+    def remove_map(self, name):
+        """
+        Flush a map (like multipath -f).
+        """
+        self.command('remove map {}'.format(name))
@@ -0,0 +1,59 @@
+##############################################################################
+# Copyright 2016 IBM Corp.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##############################################################################
+
+from ibm_storage_flocker_driver.lib.batch_loader import BatchLoader
+
+
+class RescanCoalescer(object):
+    """
+    Merge the host rescans that are requested at the same time into one
+    pass. A request waits for the window, and for the running pass to end
+    (it may have started before the request's device was mapped), then
+    one pass serves it and every request made until the pass started.
+    All the requests of a pass get its result (or error). A request may
+    name a target to rescan (e.g a LUN), the pass gets the targets of all
+    its requests.
+    """
+
+    def __init__(self, rescan_func, window=0):
+        """
+        :param rescan_func: callable that rescans the host, gets the list of
+                            the distinct targets of the requests (None for
+                            a request without a target)
+        :param window: Seconds to collect requests before a pass
+        """
+        self._rescan_func = rescan_func
+        self._loader = BatchLoader(self._rescan_batch, window)
+
+    def _rescan_batch(self, targets):
+        self._rescan_func(targets)
+        return {}
+
+    def rescan(self, *targets):
+        """
+        Rescan the host, or wait for the pass that serves this request.
+        :param targets: hashable targets to rescan, none for a request
+                        without a target
+        :return: None
+        """
+        self._loader.load_many(list(targets) or [None])
+
+    def stats(self):
+        """
+        :return: dict of the rescan requests and the passes that ran
+        """
+        stats = self._loader.stats()
+        return dict(requests=stats['loads'], rescans=stats['batches'])
@@ -0,0 +1,198 @@
+##############################################################################
+# Copyright 2016 IBM Corp.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##############################################################################
+
+import time
+import random
+import logging
+import threading
+from collections import deque
+from email.utils import parsedate_tz, mktime_tz
+from ibm_storage_flocker_driver.lib import messages
+from ibm_storage_flocker_driver.lib.utils import config_logger
+
+LOG = config_logger(logging.getLogger(__name__))
+
+# The server did not handle the request, so even a mutation may be retried
+SAFE_RETRY_STATUSES = frozenset([429, 503])
+# The server may have handled the request, retry only idempotent requests
+RETRY_STATUSES = SAFE_RETRY_STATUSES | frozenset([500, 502, 504])
+
+CIRCUIT_CLOSED = 'closed'
+CIRCUIT_OPEN = 'open'
+CIRCUIT_HALF_OPEN = 'half-open'
+CIRCUIT_WINDOW = 20  # calls to compute the error rate on
+CIRCUIT_MIN_CALLS = 10  # calls before the error rate counts
+
+
+def parse_retry_after(value):
+    """
+    :param value: The Retry-After header (seconds or HTTP date)
+    :return: Seconds to wait, or None if the value is missing or invalid
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    date = parsedate_tz(value)
+    if date is None:
+        return None
+    return max(mktime_tz(date) - time.time(), 0)
+
+
+class RetryPolicy(object):
+    """
+    Exponential backoff with full jitter, the server Retry-After wins.
+    """
+    RETRY_STATUSES = RETRY_STATUSES
+
+    def __init__(self, max_retries, backoff, max_backoff):
+        """
+        :param max_retries: Retries after the first try, 0 disables retry
+        :param backoff: Seconds of the first backoff
+        :param max_backoff: Maximum seconds of a backoff
+        """
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    @staticmethod
+    def is_retryable_status(status_code, idempotent):
+        if idempotent:
+            return status_code in RETRY_STATUSES
+        return status_code in SAFE_RETRY_STATUSES
+
+    def delay(self, attempt, retry_after=None):
+        """
+        :param attempt: Number of retries so far
+        :param retry_after: Seconds the server asked to wait, if any
+        :return: Seconds to wait before the next retry
+        """
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff)
+        return random.uniform(
+            0, min(self.backoff * 2 ** attempt, self.max_backoff))
+
+
+class CircuitOpenError(Exception):
+
+    def __init__(self, name, retry_in):
+        Exception.__init__(
+            self,
+            messages.CIRCUIT_OPEN_FAIL_FAST.format(name=name,
+                                                   retry_in=retry_in),
+        )
+        self.retry_in = retry_in
+
+
+class CircuitBreaker(object):
+    """
+    Fails fast once the error rate of the recent calls reaches the
+    threshold (open). After reset_timeout seconds one trial call is let
+    through (half-open), its result closes or re-opens the circuit.
+    """
+
+    def __init__(self, name, threshold, reset_timeout,
+                 window=CIRCUIT_WINDOW, min_calls=CIRCUIT_MIN_CALLS):
+        """
+        :param name: Name for the logs (e.g the server address)
+        :param threshold: Error rate (0 to 1) that opens the circuit,
+                          0 disables the circuit breaker
+        :param reset_timeout: Seconds to stay open before a trial call
+        :param window: Number of recent calls to compute the error rate on
+        :param min_calls: Calls in the window before the error rate counts
+        """
+        self.name = name
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.min_calls = min_calls
+        self._results = deque(maxlen=window)  # True for a failed call
+        self._state = CIRCUIT_CLOSED
+        self._opened_at = None
+        self._trial_running = False
+        self._counters = dict(opened=0, rejected=0)
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state
+
+    def before_call(self):
+        """
+        :raise CircuitOpenError: if the call should fail fast
+        """
+        if not self.threshold:
+            return
+        with self._lock:
+            if self._state == CIRCUIT_CLOSED:
+                return
+            retry_in = self._opened_at + self.reset_timeout - time.time()
+            if self._state == CIRCUIT_OPEN and retry_in <= 0:
+                self._set_state(CIRCUIT_HALF_OPEN)
+            if self._state == CIRCUIT_HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return
+            self._counters['rejected'] += 1
+        raise CircuitOpenError(self.name, max(retry_in, 0))
+
+    def record(self, failed):
+        """
+        :param failed: True if the call failed on a server or network error
+        """
+        if not self.threshold:
+            return
+        with self._lock:
+            if self._state == CIRCUIT_HALF_OPEN:
+                self._trial_running = False
+                self._results.clear()
+                if failed:
+                    self._open()
+                else:
+                    self._set_state(CIRCUIT_CLOSED)
+                return
+            self._results.append(failed)
+            if self._state == CIRCUIT_CLOSED and \
+                    len(self._results) >= self.min_calls and \
+                    self._error_rate() >= self.threshold:
+                self._open()
+
+    def _error_rate(self):
+        return float(sum(self._results)) / len(self._results)
+
+    def _open(self):
+        self._opened_at = time.time()
+        self._counters['opened'] += 1
+        self._set_state(CIRCUIT_OPEN)
+
+    def _set_state(self, state):
+        log = LOG.warning if state == CIRCUIT_OPEN else LOG.info
+        log(messages.CIRCUIT_STATE_CHANGED.format(
+            name=self.name, old=self._state, new=state))
+        self._state = state
+
+    def stats(self):
+        """
+        :return: dict of the state, the error rate of the recent calls and
+                 the counters (opened, rejected)
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            stats['state'] = self._state
+            stats['error_rate'] = \
+                self._error_rate() if self._results else 0.0
+        return stats
@@ -0,0 +1,88 @@
+##############################################################################
+# Copyright 2016 IBM Corp.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##############################################################################
+
+
+import threading
+from ibm_storage_flocker_driver.lib import deadline
+
+
+class _Call(object):
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+    def wait(self):
+        # wait within the deadline of the waiter, not of the running call
+        while not self.done.wait(deadline.timeout()):
+            deadline.check()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight(object):
+    """
+    Coalesce identical calls that run at the same time: the first caller
+    runs the call, the others wait for it and get its result (or error).
+    Calls are not cached, a call that starts after the running one ended
+    runs again.
+    """
+
+    def __init__(self):
+        self._calls = {}  # key: running _Call
+        self._lock = threading.Lock()
+        self._stats = dict(calls=0, coalesced=0)
+
+    def do(self, key, func):
+        """
+        :param key: Identifies identical calls (hashable)
+        :param func: The call, without arguments
+        :return: The result of func, run by this caller or another one
+        """
+        with self._lock:
+            self._stats['calls'] += 1
+            call = self._calls.get(key)
+            running = call is not None
+            if running:
+                self._stats['coalesced'] += 1
+            else:
+                call = self._calls[key] = _Call()
+        if running:
+            return call.wait()
+        try:
+            call.result = func()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self):
+        """
+        :return: dict of the calls, the coalesced calls (served by another
+                 caller) and the coalesce rate
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats['coalesce_rate'] = \
+            float(stats['coalesced']) / stats['calls'] if stats['calls'] \
+            else 0.0
+        return stats
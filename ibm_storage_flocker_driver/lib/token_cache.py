@@ -0,0 +1,102 @@
+##############################################################################
+# Copyright 2016 IBM Corp.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##############################################################################
+
+import os
+import json
+import errno
+import hashlib
+import logging
+from ibm_storage_flocker_driver.lib import messages
+from ibm_storage_flocker_driver.lib.utils import config_logger
+
+LOG = config_logger(logging.getLogger(__name__))
+
+TOKEN_CACHE_DIR_MODE = 0o700
+TOKEN_CACHE_FILE_MODE = 0o600
+
+
+class TokenCache(object):
+    """
+    On-disk cache of the authentication token of one user of one management
+    system, so a restarted agent can reuse the token instead of logging in.
+    The file is readable by its owner only. The cache is best effort,
+    errors are logged and the caller logs in as usual.
+    """
+
+    def __init__(self, directory, management_ip, port, username):
+        """
+        :param directory: Where to keep the token files
+        :param management_ip:
+        :param port:
+        :param username:
+        """
+        key = u'{}:{}:{}'.format(management_ip, port, username)
+        self.path = os.path.join(
+            directory, hashlib.sha1(key.encode('utf-8')).hexdigest())
+
+    def load(self):
+        """
+        :return: dict of token, issued_at and lifetime (None if unknown),
+                 or None if there is no cached token
+        """
+        try:
+            with open(self.path) as token_file:
+                entry = json.load(token_file)
+            return dict(token=entry['token'],
+                        issued_at=float(entry['issued_at']),
+                        lifetime=entry.get('lifetime'))
+        except IOError as e:
+            if e.errno != errno.ENOENT:
+                LOG.warning(messages.TOKEN_CACHE_READ_FAILED.format(
+                    path=self.path, exception=e))
+        except (ValueError, KeyError, TypeError) as e:
+            LOG.warning(messages.TOKEN_CACHE_READ_FAILED.format(
+                path=self.path, exception=e))
+            self.discard()
+        return None
+
+    def save(self, token, issued_at, lifetime=None):
+        """
+        Write the token atomically (temp file and rename), so a concurrent
+        reader never sees a partial file.
+        """
+        tmp_path = '{}.{}.tmp'.format(self.path, os.getpid())
+        try:
+            directory = os.path.dirname(self.path)
+            if not os.path.isdir(directory):
+                os.makedirs(directory, TOKEN_CACHE_DIR_MODE)
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+                         TOKEN_CACHE_FILE_MODE)
+            with os.fdopen(fd, 'w') as token_file:
+                json.dump(dict(token=token, issued_at=issued_at,
+                               lifetime=lifetime), token_file)
+            os.rename(tmp_path, self.path)
+        except (IOError, OSError) as e:
+            LOG.warning(messages.TOKEN_CACHE_WRITE_FAILED.format(
+                path=self.path, exception=e))
+            self._remove(tmp_path)
+
+    def discard(self):
+        self._remove(self.path)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                LOG.warning(messages.TOKEN_CACHE_WRITE_FAILED.format(
+                    path=path, exception=e))
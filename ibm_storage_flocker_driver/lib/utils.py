@@ -14,12 +14,17 @@
 # limitations under the License.
 ##############################################################################
 
+import json
+import codecs
 import logging
+import threading
 from functools import wraps
 from eliot import Message
-from ibm_storage_flocker_driver.lib import messages
+from ibm_storage_flocker_driver.lib import messages, deadline
 from ibm_storage_flocker_driver.lib.constants import DEFAULT_DEBUG_LEVEL
 
+MAX_CONCURRENT_CALLS = 8
+
 def logme(logger, prefix=None, level=logging.DEBUG):
     """
     Decorator for logging functions with args, kwargs and return value
@@ -55,6 +60,88 @@ def logme(logger, prefix=None, level=logging.DEBUG):
         return wrapper
     return decorate
 
+def run_concurrently(calls, max_workers=MAX_CONCURRENT_CALLS):
+    """
+    Run independent calls on a bounded number of threads and wait for all
+    of them. The threads are created per fan-out, so nested fan-outs do
+    not wait on each other's workers. The calls run within the deadline
+    of the calling thread.
+
+    :param calls: list of callables without arguments
+    :param max_workers: Maximum number of calls to run at the same time
+    :raise: The exception of the first failed call (after all calls ended)
+    :return: list of the results in the order of the calls
+    """
+    if len(calls) <= 1:
+        return [call() for call in calls]
+    results = [None] * len(calls)
+    errors = [None] * len(calls)
+    pending = list(enumerate(calls))
+    lock = threading.Lock()
+    operation_deadline = deadline.current()
+
+    def worker():
+        deadline.set_current(operation_deadline)
+        while True:
+            with lock:
+                if not pending:
+                    return
+                index, call = pending.pop(0)
+            try:
+                results[index] = call()
+            except Exception as e:  # pylint: disable=broad-except
+                errors[index] = e
+
+    threads = [threading.Thread(target=worker)
+               for _ in range(min(max_workers, len(calls)))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for error in errors:
+        if error is not None:
+            raise error
+    return results
+
+def iter_json_array(chunks, encoding='utf-8'):
+    """
+    Decode a JSON array incrementally, so only one item and one chunk are
+    in memory at a time.
+
+    :param chunks: iterable of the JSON text chunks (e.g from a socket)
+    :param encoding: The encoding of the chunks
+    :raise ValueError: if the text is not a JSON array
+    :return: generator of the array items
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder(encoding)()
+    buf = u''
+    started = ended = False
+    for chunk in chunks:
+        buf += text_decoder.decode(chunk)
+        pos = 0
+        while not ended:
+            while pos < len(buf) and buf[pos] in u' \t\r\n,':
+                pos += 1
+            if pos == len(buf):
+                break
+            if not started:
+                if buf[pos] != u'[':
+                    raise ValueError('Expected a JSON array')
+                started = True
+                pos += 1
+            elif buf[pos] == u']':
+                ended = True
+            else:
+                try:
+                    item, pos = decoder.raw_decode(buf, pos)
+                except ValueError:
+                    break  # the item continues in the next chunk
+                yield item
+        buf = buf[pos:]
+    if not ended:
+        raise ValueError('Unterminated JSON array')
+
 class IBMStorageDriverLogHandler(logging.Handler):
     """ log handler for Eliot logging."""
 
@@ -0,0 +1,112 @@
+##############################################################################
+# Copyright 2016 IBM Corp.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##############################################################################
+
+"""
+Local stand-in for the multipathd control socket, for tests that exercise
+the real MultipathdClient over a unix socket.
+"""
+
+import os
+import json
+import shutil
+import tempfile
+import threading
+from SocketServer import ThreadingMixIn, UnixStreamServer, \
+    BaseRequestHandler
+from ibm_storage_flocker_driver.lib.multipathd import _LENGTH
+
+
+class FakeMultipathd(ThreadingMixIn, UnixStreamServer):
+    """
+    Serves the multipathd commands from memory: "show maps json" from
+    maps, "reconfigure", "add map" and "remove map" change the maps, and
+    replies set in replies (command: reply) override the others. Unknown
+    commands fail like multipathd does.
+    """
+    daemon_threads = True
+
+    def __init__(self, maps=None):
+        """
+        :param maps: list of maps, like show maps json
+        """
+        self._dir = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self._dir, 'multipathd.sock')
+        UnixStreamServer.__init__(self, self.socket_path,
+                                  FakeMultipathdHandler)
+        self.maps = list(maps or [])
+        self.replies = {}
+        self.commands = []
+        self.lock = threading.Lock()
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        shutil.rmtree(self._dir, True)
+
+    def reply(self, cmd):
+        with self.lock:
+            self.commands.append(cmd)
+            if cmd in self.replies:
+                return self.replies[cmd]
+            if cmd == 'show maps json':
+                return json.dumps(dict(major_version=0, minor_version=1,
+                                       maps=self.maps))
+            if cmd == 'reconfigure':
+                return 'ok\n'
+            if cmd.startswith('remove map '):
+                name = cmd[len('remove map '):]
+                self.maps = [mp_map for mp_map in self.maps
+                             if mp_map['name'] != name]
+                return 'ok\n'
+            if cmd.startswith('add map '):
+                return 'ok\n'
+            return 'fail\n'
+
+
+class FakeMultipathdHandler(BaseRequestHandler):
+
+    def _recv_exactly(self, size):
+        data = ''
+        while len(data) < size:
+            chunk = self.request.recv(size - len(data))
+            if not chunk:
+                raise EOFError()
+            data += chunk
+        return data
+
+    def handle(self):
+        length = _LENGTH.unpack(self._recv_exactly(_LENGTH.size))[0]
+        cmd = self._recv_exactly(length).rstrip('\0')
+        reply = self.server.reply(cmd) + '\0'
+        self.request.sendall(_LENGTH.pack(len(reply)) + reply)
+
+
+def fake_map(name, wwid, devices, chk_st='ready'):
+    """
+    :return: A map like show maps json, with one path group of devices
+    """
+    return dict(
+        name=name, uuid=wwid, sysfs='dm-0', path_groups=[dict(
+            selector='service-time 0', pri=1, dm_st='active',
+            paths=[dict(dev=dev, dev_t='8:16', hcil='3:0:0:1',
+                        dm_st='active', dev_st='running', chk_st=chk_st)
+                   for dev in devices])])
@@ -0,0 +1,286 @@
+##############################################################################
+# Copyright 2016 IBM Corp.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##############################################################################
+
+"""
+Local stand-in for the SCBE REST API, for tests that exercise the real
+RestClient over HTTP.
+"""
+
+import json
+import time
+import threading
+from urllib import urlencode
+from urlparse import urlparse, parse_qsl
+from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+from SocketServer import ThreadingMixIn
+
+FAKE_TOKEN = 'fake-token-{}'
+URL_PREFIX = '/api/v1'
+PAGE_PARAMS = ('limit', 'offset', 'cursor')
+FIELDS_PARAM = 'fields'
+FILTER_OPERATORS = {
+    'gte': lambda value, arg: value >= arg,
+    'gt': lambda value, arg: value > arg,
+    'startswith': lambda value, arg: value.startswith(arg),
+    'endswith': lambda value, arg: value.endswith(arg),
+    'in': lambda value, arg: unicode(value) in arg.split(','),
+}
+
+
+class FakeSCBEServer(ThreadingMixIn, HTTPServer):
+    """
+    Serves collections of records (e.g volumes, hosts) from memory.
+    GET requests are filtered by their query parameters
+    (field=value or field__<operator>=value), and projected by the
+    fields parameter.
+    Collections are paginated if pagination is set to 'offset' (count and
+    results, like limit/offset pagination) or 'cursor' (next links only).
+    Tokens are checked once they can expire (token_lifetime) or were
+    revoked, requests with an invalid token are rejected with 401.
+    Injected faults fail the next requests (other than login) with an error
+    status, or drop their connection without a reply.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, supported_filters=None, delay=0, pagination=None,
+                 max_page_size=None, token_lifetime=None,
+                 send_expires_in=False):
+        """
+        :param supported_filters: Query parameters the server honors,
+                                  None means all of them. The others are
+                                  ignored, like an older SCBE would.
+        :param delay: Seconds to wait before each reply (network latency)
+        :param pagination: None, 'offset' or 'cursor'
+        :param max_page_size: The server page size limit
+        :param token_lifetime: Seconds until a token expires
+        :param send_expires_in: Return the token lifetime on login
+        """
+        HTTPServer.__init__(self, ('127.0.0.1', 0), FakeSCBEHandler)
+        self.supported_filters = supported_filters
+        self.delay = delay
+        self.pagination = pagination
+        self.max_page_size = max_page_size
+        self.token_lifetime = token_lifetime
+        self.send_expires_in = send_expires_in
+        self.check_tokens = token_lifetime is not None
+        self.tokens = {}  # token: issue time
+        self.logins = 0
+        self.collections = dict(
+            volumes=[], services=[], hosts=[], mappings=[])
+        self.requests = []
+        self.faults = []  # (method, status, retry_after, reply) to reply
+        self.lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return 'http://127.0.0.1:{}{}'.format(self.server_port, URL_PREFIX)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def login(self):
+        with self.lock:
+            self.logins += 1
+            token = FAKE_TOKEN.format(self.logins)
+            self.tokens[token] = time.time()
+        reply = dict(token=token)
+        if self.send_expires_in:
+            reply['expires_in'] = self.token_lifetime
+        return reply
+
+    def revoke_tokens(self):
+        with self.lock:
+            self.tokens.clear()
+            self.check_tokens = True
+
+    def inject_faults(self, status, count=1, retry_after=None,
+                      detail='Injected fault.', method=None, error_code=None):
+        """
+        :param status: The error status to reply, None drops the connection
+        :param count: Number of requests to fail
+        :param retry_after: The Retry-After header value to reply, if any
+        :param detail: The error detail to reply
+        :param method: Fail only requests of this method, default any
+        :param error_code: The SCBE error code to reply, if any
+        """
+        reply = dict(detail=detail)
+        if error_code is not None:
+            reply['error_code'] = error_code
+        with self.lock:
+            self.faults.extend(
+                [(method, status, retry_after, reply)] * count)
+
+    def next_fault(self, method):
+        with self.lock:
+            for fault in self.faults:
+                if fault[0] in (None, method):
+                    self.faults.remove(fault)
+                    return fault[1:]
+            return None
+
+    def is_authorized(self, header):
+        if not self.check_tokens:
+            return True
+        token = (header or '').replace('Token ', '', 1)
+        with self.lock:
+            issued_at = self.tokens.get(token)
+        if issued_at is None:
+            return False
+        return self.token_lifetime is None or \
+            time.time() - issued_at < self.token_lifetime
+
+    def is_supported(self, param):
+        return self.supported_filters is None or \
+            param in self.supported_filters
+
+    def list_records(self, collection, params):
+        with self.lock:
+            records = list(self.collections[collection])
+        fields = None
+        for param, arg in params:
+            if param in PAGE_PARAMS or not self.is_supported(param):
+                continue
+            if param == FIELDS_PARAM:
+                fields = arg.split(',')
+                continue
+            field, _, operator = param.partition('__')
+            match = FILTER_OPERATORS.get(operator, lambda value, arg:
+                                         unicode(value) == arg)
+            records = [record for record in records
+                       if field in record and match(record[field], arg)]
+        if fields is not None:
+            records = [{field: record[field]
+                        for field in fields if field in record}
+                       for record in records]
+        return records
+
+
+    def paginate(self, path, records, params):
+        """
+        :return: The response body for the records of the requested page
+        """
+        params = dict(params)
+        if not self.pagination or 'limit' not in params:
+            return records
+        limit = int(params['limit'])
+        if self.max_page_size:
+            limit = min(limit, self.max_page_size)
+        offset = int(params.get('cursor', params.get('offset', 0)))
+        body = dict(results=records[offset:offset + limit], next=None)
+        if offset + limit < len(records):
+            next_params = dict(params, limit=limit)
+            next_params.pop('offset', None)
+            next_params['cursor' if self.pagination == 'cursor'
+                        else 'offset'] = offset + limit
+            body['next'] = 'http://127.0.0.1:{}{}?{}'.format(
+                self.server_port, path, urlencode(next_params))
+        if self.pagination == 'offset':
+            body['count'] = len(records)
+        return body
+
+
+class FakeSCBEHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like SCBE
+    wbufsize = -1  # send each reply at once, not line by line
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+    def _reply(self, status, body=None, headers=None):
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        content = json.dumps(body) if body is not None else ''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        for header, value in (headers or {}).items():
+            self.send_header(header, value)
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _parse(self):
+        # read the body of every request, the connection is kept open
+        length = int(self.headers.getheader('Content-Length') or 0)
+        self.body = self.rfile.read(length)
+        url = urlparse(self.path)
+        path = url.path[len(URL_PREFIX):].strip('/').split('/')
+        params = parse_qsl(url.query)
+        self.server.requests.append((self.command, url.path, params))
+        return path, params
+
+    def _faulted(self):
+        fault = self.server.next_fault(self.command)
+        if fault is None:
+            return False
+        status, retry_after, reply = fault
+        if status is None:
+            self.close_connection = True  # drop it without a reply
+            return True
+        headers = {}
+        if retry_after is not None:
+            headers['Retry-After'] = str(retry_after)
+        self._reply(status, reply, headers)
+        return True
+
+    def _authorized(self):
+        if self._faulted():
+            return False
+        if self.server.is_authorized(self.headers.getheader('Authorization')):
+            return True
+        self._reply(401, dict(detail='Invalid token.'))
+        return False
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        path, params = self._parse()
+        if not self._authorized():
+            return None
+        collection = path[0]
+        if collection not in self.server.collections:
+            return self._reply(404, dict(detail='Not found.'))
+        if len(path) > 1:
+            for record in self.server.list_records(collection, []):
+                if unicode(record.get('id')) == path[1]:
+                    return self._reply(200, record)
+            return self._reply(404, dict(detail='Not found.'))
+        records = self.server.list_records(collection, params)
+        return self._reply(200, self.server.paginate(
+            urlparse(self.path).path, records, params))
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        path, _ = self._parse()
+        payload = json.loads(self.body or 'null')
+        if path == ['users', 'get-auth-token']:
+            return self._reply(200, self.server.login())
+        if not self._authorized():
+            return None
+        return self._reply(201, payload)
+
+    def do_DELETE(self):  # pylint: disable=invalid-name
+        self._parse()
+        if not self._authorized():
+            return None
+        return self._reply(204)
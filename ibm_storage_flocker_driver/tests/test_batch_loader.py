@@ -0,0 +1,111 @@
+##############################################################################
+# Copyright 2016 IBM Corp.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##############################################################################
+
+
+import time
+import threading
+import unittest
+from ibm_storage_flocker_driver.lib.batch_loader import BatchLoader
+from ibm_storage_flocker_driver.lib.utils import run_concurrently
+from ibm_storage_flocker_driver.lib import deadline
+
+
+class TestBatchLoader(unittest.TestCase):
+    """
+    Unit testing for BatchLoader
+    """
+
+    def setUp(self):
+        self.batches = []
+
+    def _batch_func(self, keys):
+        self.batches.append(keys)
+        time.sleep(0.1)
+        return {key: key * 2 for key in keys if key != 'missing'}
+
+    def _load_concurrently(self, loader, keys):
+        return run_concurrently(
+            [lambda key=key: loader.load(key) for key in keys],
+            max_workers=len(keys))
+
+    def test_single_load(self):
+        loader = BatchLoader(self._batch_func)
+        self.assertEqual(loader.load(2), 4)
+        self.assertEqual(loader.load('missing'), None)
+        self.assertEqual(self.batches, [[2], ['missing']])
+
+    def test_loads_queue_behind_running_batch(self):
+        loader = BatchLoader(self._batch_func)
+        self.assertEqual(self._load_concurrently(loader, range(20)),
+                         [key * 2 for key in range(20)])
+        self.assertLessEqual(len(self.batches), 3)
+        self.assertEqual(sorted(sum(self.batches, [])), range(20))
+        self.assertEqual(loader.stats(), dict(loads=20,
+                                              batches=len(self.batches)))
+
+    def test_window_collects_keys(self):
+        loader = BatchLoader(self._batch_func, window=0.2)
+        self._load_concurrently(loader, range(10))
+        self.assertEqual(len(self.batches), 1)
+
+    def test_max_batch_size(self):
+        loader = BatchLoader(self._batch_func, window=0.2, max_batch_size=4)
+        self._load_concurrently(loader, range(10))
+        self.assertEqual(sorted(len(keys) for keys in self.batches),
+                         [2, 4, 4])
+
+    def test_duplicate_keys_loaded_once(self):
+        loader = BatchLoader(self._batch_func, window=0.2)
+        self.assertEqual(self._load_concurrently(loader, [1] * 5), [2] * 5)
+        self.assertEqual(self.batches, [[1]])
+
+    def test_load_many_in_one_batch(self):
+        loader = BatchLoader(self._batch_func, max_batch_size=2)
+        self.assertEqual(loader.load_many([1, 2, 3, 1]), [2, 4, 6, 2])
+        self.assertEqual(self.batches, [[1, 2, 3]])
+        self.assertEqual(loader.stats(), dict(loads=4, batches=1))
+
+    def test_error_raised_to_every_caller(self):
+        def batch_func(keys):
+            time.sleep(0.1)
+            raise KeyError(keys)
+        loader = BatchLoader(batch_func, window=0.1)
+        errors = []
+
+        def load(key):
+            try:
+                loader.load(key)
+            except KeyError as e:
+                errors.append(e)
+
+        run_concurrently([lambda key=key: load(key) for key in range(3)])
+        self.assertEqual(len(errors), 3)
+
+    def test_deadline_while_waiting(self):
+        release = threading.Event()
+
+        def batch_func(keys):
+            release.wait(5)
+            return {}
+        loader = BatchLoader(batch_func)
+        running = threading.Thread(target=loader.load, args=(1,))
+        running.start()
+        time.sleep(0.05)
+        with deadline.deadline('operation', 0.1):
+            self.assertRaises(deadline.DeadlineExceeded, loader.load, 2)
+        release.set()
+        running.join()
+        self.assertEqual(loader.load(3), None)  # the loader still works
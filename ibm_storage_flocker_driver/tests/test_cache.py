@@ -0,0 +1,132 @@
+##############################################################################
+# Copyright 2016 IBM Corp.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##############################################################################
+
+import unittest
+from mock import patch, MagicMock
+from ibm_storage_flocker_driver.lib.cache import (
+    ServiceCatalog,
+    ExpiringLRUCache,
+    HostDirectory,
+)
+
+TIME_PATH = 'ibm_storage_flocker_driver.lib.cache.time.time'
+
+FAKE_SERVICES = [
+    {'name': 'gold', 'id': 'gold-id'},
+    {'name': 'silver', 'id': 'silver-id'},
+    {'name': 'gold', 'id': 'gold-id-duplicated'},
+]
+
+
+class TestServiceCatalog(unittest.TestCase):
+    """
+    Unit testing for ServiceCatalog
+    """
+
+    def setUp(self):
+        self.loader = MagicMock(return_value=FAKE_SERVICES)
+        self.catalog = ServiceCatalog(self.loader, ttl=60)
+
+    @patch(TIME_PATH)
+    def test_load_once(self, time_mock):
+        time_mock.return_value = 1000
+        self.assertEqual(self.catalog.names(), ['gold', 'silver'])
+        self.assertEqual(self.catalog.get_id('gold'), 'gold-id')
+        self.assertEqual(self.catalog.get_id('silver'), 'silver-id')
+        self.assertEqual(self.loader.call_count, 1)
+
+    @patch(TIME_PATH)
+    def test_reload_after_ttl(self, time_mock):
+        time_mock.return_value = 1000
+        self.catalog.get_id('gold')
+        time_mock.return_value = 1061
+        self.catalog.get_id('gold')
+        self.assertEqual(self.loader.call_count, 2)
+
+    @patch(TIME_PATH)
+    def test_reload_on_miss(self, time_mock):
+        time_mock.return_value = 1000
+        self.catalog.names()
+        self.assertEqual(self.catalog.get_id('bronze'), None)
+        self.assertEqual(self.loader.call_count, 2)
+
+    @patch(TIME_PATH)
+    def test_invalidate(self, time_mock):
+        time_mock.return_value = 1000
+        self.catalog.get_id('gold')
+        self.catalog.invalidate()
+        self.catalog.get_id('gold')
+        self.assertEqual(self.loader.call_count, 2)
+
+
+class TestExpiringLRUCache(unittest.TestCase):
+    """
+    Unit testing for ExpiringLRUCache
+    """
+
+    @patch(TIME_PATH)
+    def test_ttl(self, time_mock):
+        cache = ExpiringLRUCache(max_size=10, ttl=60)
+        time_mock.return_value = 1000
+        cache.set('key', 'value')
+        self.assertEqual(cache.get('key'), 'value')
+        time_mock.return_value = 1061
+        self.assertEqual(cache.get('key'), None)
+        self.assertEqual(len(cache), 0)
+
+    def test_lru_eviction(self):
+        cache = ExpiringLRUCache(max_size=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')  # now b is the least recently used
+        cache.set('c', 3)
+        self.assertEqual(cache.get('b'), None)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_pop(self):
+        cache = ExpiringLRUCache(max_size=2, ttl=60)
+        cache.set('a', 1)
+        self.assertEqual(cache.pop('a'), 1)
+        self.assertEqual(cache.pop('a', 'default'), 'default')
+
+
+FAKE_HOST = {'id': 45, 'array': 'array1', 'name': 'host1'}
+
+
+class TestHostDirectory(unittest.TestCase):
+    """
+    Unit testing for HostDirectory
+    """
+
+    def setUp(self):
+        self.hosts = HostDirectory(max_size=10, ttl=60)
+        self.hosts.add(FAKE_HOST)
+
+    def test_lookups(self):
+        self.assertEqual(self.hosts.get_id('array1', 'host1'), 45)
+        self.assertEqual(self.hosts.get_id('array2', 'host1'), None)
+        self.assertEqual(self.hosts.get_host(45), FAKE_HOST)
+
+    def test_invalidate_by_id(self):
+        self.hosts.invalidate(host_id=45)
+        self.assertEqual(self.hosts.get_id('array1', 'host1'), None)
+        self.assertEqual(self.hosts.get_host(45), None)
+
+    def test_invalidate_by_name(self):
+        self.hosts.invalidate(array_id='array1', hostname='host1')
+        self.assertEqual(self.hosts.get_id('array1', 'host1'), None)
+        self.assertEqual(self.hosts.get_host(45), None)
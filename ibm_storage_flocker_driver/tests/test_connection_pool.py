@@ -0,0 +1,98 @@
+##############################################################################
+# Copyright 2016 IBM Corp.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##############################################################################
+
+import time
+import unittest
+from ibm_storage_flocker_driver.lib.abstract_client import ConnectionInfo
+from ibm_storage_flocker_driver.lib.constants import (
+    DEFAULT_DEBUG_LEVEL,
+    CONF_PARAM_MAX_CONNECTIONS_PER_HOST,
+    CONF_PARAM_KEEP_ALIVE,
+    CONF_PARAM_IDLE_CONNECTION_TIMEOUT,
+)
+from ibm_storage_flocker_driver.lib.ibm_scbe_client import (
+    RestClient,
+    URL_SCBE_RESOURCE_GET_AUTH,
+    URL_SCBE_RESOURCE_HOST,
+)
+from ibm_storage_flocker_driver.lib.utils import run_concurrently
+from ibm_storage_flocker_driver.tests.fake_scbe_server import FakeSCBEServer
+
+
+class TestConnectionPool(unittest.TestCase):
+    """
+    Unit testing for the RestClient connection pool (PooledHTTPAdapter)
+    """
+
+    def _get_client(self, delay=0, **options):
+        self.server = FakeSCBEServer(delay=delay).start()
+        self.addCleanup(self.server.stop)
+        con_info = ConnectionInfo(
+            username='', password='', verify_ssl=False, management_ip='',
+            debug_level=DEFAULT_DEBUG_LEVEL, options=options)
+        client = RestClient(con_info, self.server.base_url,
+                            URL_SCBE_RESOURCE_GET_AUTH)
+        self.addCleanup(client.close)
+        return client
+
+    def test_keep_alive_reuses_connection(self):
+        client = self._get_client()
+        for _ in range(5):
+            client.get(URL_SCBE_RESOURCE_HOST)
+
+        stats = client.pool_stats()
+        self.assertEqual(stats['requests'], 6)  # with the login
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 5)
+
+    def test_without_keep_alive(self):
+        client = self._get_client(**{CONF_PARAM_KEEP_ALIVE: False})
+        for _ in range(5):
+            client.get(URL_SCBE_RESOURCE_HOST)
+
+        stats = client.pool_stats()
+        self.assertEqual(stats['misses'], 6)
+        self.assertEqual(stats['hits'], 0)
+
+    def test_idle_connection_reaped(self):
+        client = self._get_client(**{CONF_PARAM_IDLE_CONNECTION_TIMEOUT: 0.1})
+        client.get(URL_SCBE_RESOURCE_HOST)
+        time.sleep(0.2)
+        client.get(URL_SCBE_RESOURCE_HOST)
+
+        stats = client.pool_stats()
+        self.assertEqual(stats['reaped'], 1)
+        self.assertEqual(stats['misses'], 2)
+
+    def _concurrent_misses(self, client):
+        before = client.pool_stats()['misses']
+        run_concurrently(  # different requests, so none is coalesced
+            [lambda name=name: client.get(URL_SCBE_RESOURCE_HOST,
+                                          dict(name=name))
+             for name in range(4)])
+        return client.pool_stats()['misses'] - before
+
+    def test_pool_keeps_concurrent_connections(self):
+        client = self._get_client(
+            delay=0.1, **{CONF_PARAM_MAX_CONNECTIONS_PER_HOST: 4})
+        self._concurrent_misses(client)
+        self.assertEqual(self._concurrent_misses(client), 0)
+
+    def test_small_pool_reconnects(self):
+        client = self._get_client(
+            delay=0.1, **{CONF_PARAM_MAX_CONNECTIONS_PER_HOST: 1})
+        self._concurrent_misses(client)
+        self.assertEqual(self._concurrent_misses(client), 3)
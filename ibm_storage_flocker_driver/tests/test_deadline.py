@@ -0,0 +1,83 @@
+##############################################################################
+# Copyright 2016 IBM Corp.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##############################################################################
+
+import unittest
+from mock import patch
+from ibm_storage_flocker_driver.lib import deadline
+
+TIME_PATH = 'ibm_storage_flocker_driver.lib.deadline.time.time'
+
+
+class FakeOperations(object):
+    operation_timeout = 30
+
+    @deadline.with_deadline('operation_timeout')
+    def operation(self):
+        return deadline.current()
+
+
+class TestDeadline(unittest.TestCase):
+    """
+    Unit testing for the operation deadline
+    """
+
+    def test_no_deadline(self):
+        self.assertIsNone(deadline.current())
+        self.assertIsNone(deadline.timeout())
+        self.assertEqual(deadline.timeout(5), 5)
+        deadline.check()
+
+    @patch(TIME_PATH)
+    def test_timeout_bounded_by_deadline(self, time_mock):
+        time_mock.return_value = 1000
+        with deadline.deadline('op', 10):
+            self.assertEqual(deadline.timeout(), 10)
+            self.assertEqual(deadline.timeout(5), 5)
+            time_mock.return_value = 1008
+            self.assertEqual(deadline.timeout(5), 2)
+        self.assertIsNone(deadline.current())
+
+    @patch(TIME_PATH)
+    def test_deadline_exceeded(self, time_mock):
+        time_mock.return_value = 1000
+        with deadline.deadline('op', 10):
+            time_mock.return_value = 1010
+            with self.assertRaises(deadline.DeadlineExceeded) as context:
+                deadline.timeout(5)
+        self.assertEqual(context.exception.operation, 'op')
+        self.assertEqual(context.exception.budget, 10)
+
+    @patch(TIME_PATH)
+    def test_nested_deadline_only_shortens(self, time_mock):
+        time_mock.return_value = 1000
+        with deadline.deadline('outer', 10) as outer:
+            with deadline.deadline('longer', 20) as inner:
+                self.assertIs(inner, outer)
+            with deadline.deadline('shorter', 5) as inner:
+                self.assertEqual(inner.operation, 'shorter')
+            with deadline.deadline('none', 0) as inner:
+                self.assertIs(inner, outer)
+            self.assertIs(deadline.current(), outer)
+
+    def test_with_deadline(self):
+        operations = FakeOperations()
+        operation_deadline = operations.operation()
+        self.assertEqual(operation_deadline.operation, 'operation')
+        self.assertEqual(operation_deadline.budget, 30)
+        self.assertIsNone(deadline.current())
+
+        operations.operation_timeout = 0
+        self.assertIsNone(operations.operation())
@@ -14,8 +14,13 @@
 # limitations under the License.
 ##############################################################################
 
+import os
+import time
+import shutil
+import tempfile
 import unittest
-from mock import patch
+from subprocess import CalledProcessError
+from mock import patch, MagicMock
 from ibm_storage_flocker_driver.lib.host_actions import (
     HostActions,
     PREFIX_DEVICE_PATH,
@@ -23,8 +28,13 @@ from ibm_storage_flocker_driver.lib.host_actions import (
     MultipathCmdNotFound,
     RescanCmdNotFound,
 )
-from ibm_storage_flocker_driver.lib import host_actions
+from ibm_storage_flocker_driver.lib import host_actions, deadline
 from ibm_storage_flocker_driver.lib.constants import DEFAULT_DEBUG_LEVEL
+from ibm_storage_flocker_driver.lib.multipathd import MultipathdClient
+from ibm_storage_flocker_driver.tests.fake_multipathd import (
+    FakeMultipathd,
+    fake_map,
+)
 
 # Constants for unit testing
 MULTIPATH_OUTPUT_WWN_MD = 'dm-0'
@@ -129,6 +139,55 @@ class TestHostActions(unittest.TestCase):
         hostops = HostActions()
         hostops.rescan_scsi()
 
+    @patch('ibm_storage_flocker_driver.lib.host_actions.check_output')
+    def test_multipath_list_timeout(self, check_output_mock):
+        # pylint: disable=W0212
+        check_output_mock.return_value = MULTIPATH_OUTPUT
+        hostops = HostActions()
+
+        hostops._get_multipath_device_native(MULTIPATH_OUTPUT_WWN)
+        self.assertEqual(
+            check_output_mock.call_args[0][0],
+            ['timeout {} {}'.format(host_actions.TIMEOUT_FOR_MULTIPATH_CMD,
+                                    hostops.multipath_cmd_ll)])
+
+        with deadline.deadline('operation', 10):
+            hostops._get_multipath_device_native(MULTIPATH_OUTPUT_WWN)
+        self.assertEqual(
+            check_output_mock.call_args[0][0],
+            ['timeout 10 {}'.format(hostops.multipath_cmd_ll)])
+
+    @patch('ibm_storage_flocker_driver.lib.host_actions.check_output')
+    def test_rescan_within_deadline(self, check_output_mock):
+        check_output_mock.return_value = None
+        hostops = HostActions()
+        with deadline.deadline('operation', 5):
+            hostops.rescan_scsi()
+        for call in check_output_mock.call_args_list:
+            self.assertEqual(call[0][0][:2], ['timeout', '5'])
+
+    @patch('ibm_storage_flocker_driver.lib.host_actions.check_output')
+    def test_no_retry_after_deadline(self, check_output_mock):
+        def timed_out(*args, **kwargs):
+            time.sleep(0.02)
+            raise CalledProcessError(124, args[0])
+        check_output_mock.side_effect = timed_out
+        hostops = HostActions()
+        with deadline.deadline('operation', 0.01):
+            self.assertRaises(deadline.DeadlineExceeded,
+                              hostops.run_cmd, ['multipath -f dm-0'],
+                              retries=3)
+        self.assertEqual(check_output_mock.call_count, 1)
+
+    @patch('ibm_storage_flocker_driver.lib.host_actions.check_output')
+    def test_no_command_after_deadline(self, check_output_mock):
+        hostops = HostActions()
+        with deadline.deadline('operation', 0.01):
+            time.sleep(0.02)
+            self.assertRaises(deadline.DeadlineExceeded,
+                              hostops.rescan_scsi)
+        self.assertEqual(check_output_mock.call_count, 0)
+
     @patch('ibm_storage_flocker_driver.lib.host_actions.find_executable')
     def test_no_rescaan_cmd_exist(self, find_executable):
         find_executable.side_effect = [None, None]
@@ -140,3 +199,393 @@ class TestHostActions(unittest.TestCase):
         find_executable.side_effect = [None, 'rescan', 'iscsiadm', None]
         with self.assertRaises(MultipathCmdNotFound):
             HostActions()
+
+
+class TestHostActionsLunScan(unittest.TestCase):
+    """
+    Unit testing for the LUN-targeted scan of host actions
+    """
+    # pylint: disable=W0212
+
+    def setUp(self):
+        self.sysfs = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.sysfs)
+        self.hosts_dir = os.path.join(self.sysfs, 'scsi_host')
+        self.devices_dir = os.path.join(self.sysfs, 'scsi_device')
+        for host in ('host3', 'host4', 'host5'):
+            os.makedirs(os.path.join(self.hosts_dir, host))
+        os.makedirs(self.devices_dir)
+        for name, value in (('SCSI_HOST_SYSFS', self.hosts_dir),
+                            ('SCSI_DEVICE_SYSFS', self.devices_dir)):
+            sysfs_patch = patch.object(host_actions, name, value)
+            sysfs_patch.start()
+            self.addCleanup(sysfs_patch.stop)
+        with patch('ibm_storage_flocker_driver.lib.host_actions.'
+                   'check_output'):
+            self.hostops = HostActions()
+
+    def _add_device(self, address, vendor):
+        device = os.path.join(self.devices_dir, address, 'device')
+        os.makedirs(device)
+        with open(os.path.join(device, 'vendor'), 'w') as f:
+            f.write(vendor.ljust(8) + '\n')
+
+    def _scanned(self, host):
+        path = os.path.join(self.hosts_dir, host, 'scan')
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return f.read()
+
+    def test_array_targets(self):
+        self._add_device('3:0:0:1', 'IBM')
+        self._add_device('3:0:0:2', 'IBM')
+        self._add_device('4:0:1:1', 'IBM')
+        self._add_device('5:0:0:0', 'ATA')
+        self.assertEqual(HostActions.array_targets(),
+                         {('3', '0', '0'), ('4', '0', '1')})
+
+    def test_scan_luns_of_array_targets(self):
+        self._add_device('3:0:0:1', 'IBM')
+        self._add_device('4:0:1:1', 'IBM')
+        self._add_device('5:0:0:0', 'ATA')
+        self.hostops.scan_luns([7])
+        self.assertEqual(self._scanned('host3'), '0 0 7')
+        self.assertEqual(self._scanned('host4'), '0 1 7')
+        self.assertEqual(self._scanned('host5'), None)
+
+    def test_scan_luns_without_array_targets(self):
+        self.hostops.scan_luns([7])
+        for host in ('host3', 'host4', 'host5'):
+            self.assertEqual(self._scanned(host), '- - 7')
+
+    @patch('ibm_storage_flocker_driver.lib.host_actions.check_output')
+    def test_discover_luns(self, check_output_mock):
+        check_output_mock.return_value = MULTIPATH_OUTPUT
+        self.hostops.rescan_scsi = MagicMock()
+        self.hostops.discover_luns([7], [MULTIPATH_OUTPUT_WWN])
+        self.assertFalse(self.hostops.rescan_scsi.called)
+        # multipath reload and list, no bus rescan
+        commands = [call[0][0] for call in check_output_mock.call_args_list]
+        self.assertFalse([cmd for cmd in commands
+                          if self.hostops._rescan_cmd in ' '.join(cmd)])
+
+    @patch('ibm_storage_flocker_driver.lib.host_actions.check_output')
+    def test_discover_luns_falls_back_if_device_not_found(
+            self, check_output_mock):
+        check_output_mock.return_value = MULTIPATH_OUTPUT
+        self.hostops.rescan_scsi = MagicMock()
+        self.hostops.discover_luns([7, 8], [MULTIPATH_OUTPUT_WWN, 'fake'])
+        self.hostops.rescan_scsi.assert_called_once_with(wwn='fake')
+
+    @patch('ibm_storage_flocker_driver.lib.host_actions.check_output')
+    def test_discover_luns_falls_back_if_scan_fails(self, check_output_mock):
+        check_output_mock.return_value = MULTIPATH_OUTPUT
+        self.hostops.rescan_scsi = MagicMock()
+        with patch.object(self.hostops, 'scan_luns',
+                          side_effect=IOError('Permission denied')):
+            self.hostops.discover_luns([7], [MULTIPATH_OUTPUT_WWN])
+        self.hostops.rescan_scsi.assert_called_once_with()
+
+
+class TestHostActionsDeviceRemoval(unittest.TestCase):
+    """
+    Unit testing for the targeted SCSI device removal of host actions
+    """
+
+    def setUp(self):
+        self.sysfs = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.sysfs)
+        sysfs_patch = patch.object(host_actions, 'BLOCK_SYSFS', self.sysfs)
+        sysfs_patch.start()
+        self.addCleanup(sysfs_patch.stop)
+        # /dev/mapper/mpatha -> ../dm-0
+        self.dev = os.path.join(self.sysfs, 'dev')
+        os.makedirs(os.path.join(self.dev, 'mapper'))
+        os.symlink('../dm-0', os.path.join(self.dev, 'mapper', 'mpatha'))
+        os.makedirs(os.path.join(self.sysfs, 'dm-0', 'slaves'))
+        for device in ('sdc', 'sdb'):
+            os.makedirs(os.path.join(self.sysfs, device, 'device'))
+            os.makedirs(os.path.join(self.sysfs, 'dm-0', 'slaves', device))
+            open(self._delete_file(device), 'w').close()
+        with patch('ibm_storage_flocker_driver.lib.host_actions.'
+                   'check_output'):
+            self.hostops = HostActions()
+
+    def _delete_file(self, device):
+        return os.path.join(self.sysfs, device, 'device', 'delete')
+
+    def test_get_path_devices(self):
+        self.assertEqual(HostActions.get_path_devices(
+            os.path.join(self.dev, 'mapper', 'mpatha')), ['sdb', 'sdc'])
+        self.assertEqual(HostActions.get_path_devices(
+            os.path.join(self.dev, 'mapper', 'mpathb')), None)
+
+    @patch('ibm_storage_flocker_driver.lib.host_actions.check_output')
+    def test_clean_mp_device_records_devices(self, check_output_mock):
+        def flush(*args, **kwargs):  # pylint: disable=unused-argument
+            shutil.rmtree(os.path.join(self.sysfs, 'dm-0'), True)
+        check_output_mock.side_effect = flush
+        self.assertEqual(self.hostops.clean_mp_device(
+            os.path.join(self.dev, 'mapper', 'mpatha')), ['sdb', 'sdc'])
+
+    def test_delete_scsi_devices(self):
+        self.hostops.delete_scsi_devices(['sdb', 'sdc', 'sdd'])
+        for device in ('sdb', 'sdc'):
+            with open(self._delete_file(device)) as f:
+                self.assertEqual(f.read(), '1')
+        self.assertFalse(os.path.exists(self._delete_file('sdd')))
+
+
+class TestHostActionsSysfsLookup(unittest.TestCase):
+    """
+    Unit testing for the sysfs lookup of multipath devices
+    """
+    # pylint: disable=W0212
+
+    def setUp(self):
+        self.sysfs = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.sysfs)
+        sysfs_patch = patch.object(host_actions, 'BLOCK_SYSFS', self.sysfs)
+        sysfs_patch.start()
+        self.addCleanup(sysfs_patch.stop)
+        self._add_dm('dm-0', 'mpath-' + WWN_PREFIX + MULTIPATH_OUTPUT_WWN,
+                     WWN_PREFIX + MULTIPATH_OUTPUT_WWN)
+        self._add_dm('dm-8', 'mpath-' + WWN_PREFIX2 + REDHAT_MULTIPATH_WWN,
+                     REDHAT_MULTIPATH_MPATH)
+        self._add_dm('dm-1', 'LVM-' + MULTIPATH_OUTPUT_WWN2, 'vg-lv')
+        with patch('ibm_storage_flocker_driver.lib.host_actions.'
+                   'check_output'):
+            self.hostops = HostActions()
+
+    def _add_dm(self, dm_device, uuid, name, vendor='IBM'):
+        path = os.path.join(self.sysfs, dm_device, 'dm')
+        os.makedirs(path)
+        for attr, value in (('uuid', uuid), ('name', name)):
+            with open(os.path.join(path, attr), 'w') as f:
+                f.write(value + '\n')
+        # one path (slave) device per dm device, e.g dm-0 -> sd-dm-0
+        slave = 'sd-' + dm_device
+        os.makedirs(os.path.join(self.sysfs, dm_device, 'slaves', slave))
+        os.makedirs(os.path.join(self.sysfs, slave, 'device'))
+        with open(os.path.join(self.sysfs, slave, 'device', 'vendor'),
+                  'w') as f:
+            f.write(vendor.ljust(8) + '\n')
+
+    def test_lookup_by_wwid(self):
+        self.assertEqual(
+            HostActions._get_multipath_device_sysfs(MULTIPATH_OUTPUT_WWN),
+            WWN_PREFIX + MULTIPATH_OUTPUT_WWN)
+
+    def test_lookup_user_friendly_name(self):
+        self.assertEqual(
+            HostActions._get_multipath_device_sysfs(
+                REDHAT_MULTIPATH_WWN.upper()),
+            REDHAT_MULTIPATH_MPATH)
+
+    def test_lookup_skips_other_dm_devices(self):
+        self.assertEqual(
+            HostActions._get_multipath_device_sysfs(MULTIPATH_OUTPUT_WWN2),
+            None)
+
+    def test_lookup_skips_other_vendors(self):
+        self._add_dm('dm-2', 'mpath-' + WWN_PREFIX + MULTIPATH_OUTPUT_WWN2,
+                     WWN_PREFIX + MULTIPATH_OUTPUT_WWN2, vendor='NETAPP')
+        self.assertEqual(
+            HostActions._get_multipath_device_sysfs(MULTIPATH_OUTPUT_WWN2),
+            None)
+
+    def test_lookup_skips_device_without_paths(self):
+        shutil.rmtree(os.path.join(self.sysfs, 'dm-0', 'slaves'))
+        self.assertEqual(
+            HostActions._get_multipath_device_sysfs(MULTIPATH_OUTPUT_WWN),
+            None)
+
+    @patch('ibm_storage_flocker_driver.lib.host_actions.check_output')
+    @patch('ibm_storage_flocker_driver.lib.host_actions.os.path.exists')
+    def test_get_multipath_device_without_multipath(self, ospathexist,
+                                                    check_output_mock):
+        ospathexist.return_value = True
+        self.assertEqual(
+            self.hostops.get_multipath_device(REDHAT_MULTIPATH_WWN),
+            '{}/{}'.format(PREFIX_DEVICE_PATH, REDHAT_MULTIPATH_MPATH))
+        self.assertFalse(check_output_mock.called)
+
+    @patch('ibm_storage_flocker_driver.lib.host_actions.check_output')
+    @patch('ibm_storage_flocker_driver.lib.host_actions.os.path.exists')
+    def test_get_multipath_device_falls_back_to_multipath(
+            self, ospathexist, check_output_mock):
+        check_output_mock.return_value = MULTIPATH_OUTPUT2
+        ospathexist.return_value = True
+        self.assertEqual(
+            self.hostops.get_multipath_device(MULTIPATH_OUTPUT_WWN2),
+            '{}/{}'.format(PREFIX_DEVICE_PATH,
+                           WWN_PREFIX + MULTIPATH_OUTPUT_WWN2))
+        self.assertEqual(check_output_mock.call_count, 1)
+
+
+class TestHostActionsMultipathd(unittest.TestCase):
+    """
+    Unit testing for HostActions through the multipathd socket
+    """
+    # pylint: disable=W0212
+
+    def setUp(self):
+        self.multipathd = FakeMultipathd([
+            fake_map(REDHAT_MULTIPATH_MPATH,
+                     WWN_PREFIX2 + REDHAT_MULTIPATH_WWN, ['sdb', 'sdc'])
+        ]).start()
+        self.addCleanup(self.multipathd.stop)
+        with patch('ibm_storage_flocker_driver.lib.host_actions.'
+                   'check_output'):
+            self.hostops = HostActions(
+                multipathd=MultipathdClient(self.multipathd.socket_path))
+        sysfs_patch = patch.object(host_actions, 'BLOCK_SYSFS',
+                                   tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, sysfs_patch.start(), True)
+        self.addCleanup(sysfs_patch.stop)
+
+    @patch('ibm_storage_flocker_driver.lib.host_actions.check_output')
+    @patch('ibm_storage_flocker_driver.lib.host_actions.os.path.exists')
+    def test_get_multipath_device(self, ospathexist, check_output_mock):
+        ospathexist.return_value = True
+        self.assertEqual(
+            self.hostops.get_multipath_device(REDHAT_MULTIPATH_WWN),
+            '{}/{}'.format(PREFIX_DEVICE_PATH, REDHAT_MULTIPATH_MPATH))
+        self.assertFalse(check_output_mock.called)
+        self.assertEqual(self.multipathd.commands, ['show maps json'])
+
+    @patch('ibm_storage_flocker_driver.lib.host_actions.check_output')
+    def test_get_multipath_device_not_found(self, check_output_mock):
+        self.assertRaises(MultipathDeviceNotFound,
+                          self.hostops.get_multipath_device,
+                          MULTIPATH_OUTPUT_WWN)
+        self.assertFalse(check_output_mock.called)
+
+    @patch('ibm_storage_flocker_driver.lib.host_actions.check_output')
+    @patch('ibm_storage_flocker_driver.lib.host_actions.os.path.exists')
+    def test_get_multipath_device_falls_back_to_multipath(
+            self, ospathexist, check_output_mock):
+        self.multipathd.stop()
+        check_output_mock.return_value = MULTIPATH_OUTPUT
+        ospathexist.return_value = True
+        self.assertEqual(
+            self.hostops.get_multipath_device(MULTIPATH_OUTPUT_WWN),
+            '{}/{}'.format(PREFIX_DEVICE_PATH,
+                           WWN_PREFIX + MULTIPATH_OUTPUT_WWN))
+        self.assertEqual(check_output_mock.call_count, 1)
+
+    @patch('ibm_storage_flocker_driver.lib.host_actions.check_output')
+    def test_reload_multipath(self, check_output_mock):
+        self.hostops._reload_multipath()
+        self.assertEqual(self.multipathd.commands, ['reconfigure'])
+        self.assertFalse(check_output_mock.called)
+
+    def test_find_missing_multipath_devices(self):
+        self.assertEqual(
+            self.hostops._find_missing_multipath_devices(
+                [REDHAT_MULTIPATH_WWN, MULTIPATH_OUTPUT_WWN]),
+            [MULTIPATH_OUTPUT_WWN])
+        self.assertEqual(self.multipathd.commands, ['show maps json'])
+
+    @patch('ibm_storage_flocker_driver.lib.host_actions.check_output')
+    def test_clean_mp_device(self, check_output_mock):
+        self.hostops.clean_mp_device(
+            '{}/{}'.format(PREFIX_DEVICE_PATH, REDHAT_MULTIPATH_MPATH))
+        self.assertEqual(self.multipathd.commands,
+                         ['remove map ' + REDHAT_MULTIPATH_MPATH])
+        self.assertEqual(check_output_mock.call_count, 1)  # dmsetup only
+        self.assertEqual(self.multipathd.maps, [])
+
+    @patch('ibm_storage_flocker_driver.lib.host_actions.check_output')
+    def test_clean_mp_device_falls_back_to_multipath(self,
+                                                     check_output_mock):
+        self.multipathd.replies['remove map ' + REDHAT_MULTIPATH_MPATH] = \
+            'fail\n'
+        self.hostops.clean_mp_device(
+            '{}/{}'.format(PREFIX_DEVICE_PATH, REDHAT_MULTIPATH_MPATH))
+        self.assertEqual(check_output_mock.call_count, 2)
+        self.assertEqual(check_output_mock.call_args[0][0],
+                         ['multipath -f ' + REDHAT_MULTIPATH_MPATH])
+
+
+class TestHostActionsMultipathTopology(unittest.TestCase):
+    """
+    Unit testing for the cached multipath -ll index
+    """
+    # pylint: disable=W0212
+
+    def setUp(self):
+        with patch('ibm_storage_flocker_driver.lib.host_actions.'
+                   'check_output'):
+            self.hostops = HostActions()
+        sysfs_patch = patch.object(host_actions, 'BLOCK_SYSFS',
+                                   tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, sysfs_patch.start(), True)
+        self.addCleanup(sysfs_patch.stop)
+
+    @patch('ibm_storage_flocker_driver.lib.host_actions.check_output')
+    def test_topology_is_cached(self, check_output_mock):
+        check_output_mock.return_value = MULTIPATH_OUTPUT2
+        topology = self.hostops.multipath_topology()
+        self.assertEqual(len(topology), 2)
+        self.assertIs(self.hostops.multipath_topology(), topology)
+        self.assertEqual(
+            self.hostops._get_multipath_device_native(MULTIPATH_OUTPUT_WWN2),
+            WWN_PREFIX + MULTIPATH_OUTPUT_WWN2)
+        self.assertEqual(check_output_mock.call_count, 1)
+
+    @patch('ibm_storage_flocker_driver.lib.host_actions.check_output')
+    def test_lookup_not_in_cache_runs_multipath(self, check_output_mock):
+        check_output_mock.return_value = MULTIPATH_OUTPUT
+        self.hostops.multipath_topology()
+        check_output_mock.return_value = MULTIPATH_OUTPUT2
+        self.assertEqual(
+            self.hostops._get_multipath_device_native(MULTIPATH_OUTPUT_WWN2),
+            WWN_PREFIX + MULTIPATH_OUTPUT_WWN2)
+        self.assertEqual(check_output_mock.call_count, 2)
+
+    @patch('ibm_storage_flocker_driver.lib.host_actions.check_output')
+    def test_lookup_skips_other_vendors(self, check_output_mock):
+        check_output_mock.return_value = MULTIPATH_OUTPUT.replace(
+            'IBM', 'OTHER')
+        self.assertIsNone(
+            self.hostops._get_multipath_device_native(MULTIPATH_OUTPUT_WWN))
+        self.assertEqual(
+            self.hostops._find_missing_multipath_devices(
+                [MULTIPATH_OUTPUT_WWN]),
+            [MULTIPATH_OUTPUT_WWN])
+
+    @patch('ibm_storage_flocker_driver.lib.host_actions.check_output')
+    def test_find_missing_multipath_devices(self, check_output_mock):
+        check_output_mock.return_value = MULTIPATH_OUTPUT2
+        self.assertEqual(
+            self.hostops._find_missing_multipath_devices(
+                [MULTIPATH_OUTPUT_WWN, REDHAT_MULTIPATH_WWN,
+                 MULTIPATH_OUTPUT_WWN2]),
+            [REDHAT_MULTIPATH_WWN])
+        self.assertEqual(check_output_mock.call_count, 1)
+
+    @patch('ibm_storage_flocker_driver.lib.host_actions.check_output')
+    def test_reload_invalidates(self, check_output_mock):
+        check_output_mock.return_value = MULTIPATH_OUTPUT
+        topology = self.hostops.multipath_topology()
+        self.hostops._reload_multipath()
+        self.assertIsNot(self.hostops.multipath_topology(), topology)
+
+    @patch('ibm_storage_flocker_driver.lib.host_actions.check_output')
+    def test_clean_mp_device_invalidates(self, check_output_mock):
+        check_output_mock.return_value = MULTIPATH_OUTPUT
+        topology = self.hostops.multipath_topology()
+        self.hostops.clean_mp_device(
+            '{}/{}'.format(PREFIX_DEVICE_PATH, MULTIPATH_OUTPUT_WWN_MD))
+        self.assertIsNot(self.hostops.multipath_topology(), topology)
+
+    @patch('ibm_storage_flocker_driver.lib.host_actions.check_output')
+    def test_not_cached_if_changed_while_listing(self, check_output_mock):
+        def list_multipath(*args, **kwargs):
+            self.hostops.invalidate_multipath_topology()
+            return MULTIPATH_OUTPUT
+        check_output_mock.side_effect = list_multipath
+        self.assertEqual(len(self.hostops.multipath_topology()), 1)
+        self.assertIsNone(self.hostops._topology)
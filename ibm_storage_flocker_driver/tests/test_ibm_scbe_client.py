@@ -16,7 +16,11 @@
 
 import unittest
 import json
+import time
+import shutil
+import tempfile
 from mock import patch, MagicMock
+from requests.exceptions import ReadTimeout, ConnectionError
 from bitmath import MiB
 from ibm_storage_flocker_driver.lib.ibm_scbe_client import (
     IBMSCBEClientAPI,
@@ -24,13 +28,40 @@ from ibm_storage_flocker_driver.lib.ibm_scbe_client import (
     RestClient,
     RestClientException,
     HostIdNotFoundByWwn,
+    HostIDNotFound,
 )
-from ibm_storage_flocker_driver.lib import ibm_scbe_client
+from ibm_storage_flocker_driver.lib import ibm_scbe_client, deadline
+from ibm_storage_flocker_driver.lib.retry import (
+    CircuitOpenError,
+    CIRCUIT_OPEN,
+    CIRCUIT_CLOSED,
+)
+from ibm_storage_flocker_driver.lib.utils import run_concurrently
+from ibm_storage_flocker_driver.tests.fake_scbe_server import FakeSCBEServer
 from ibm_storage_flocker_driver.lib.abstract_client import (
     VolInfo,
     ConnectionInfo,
+    UnknownVolumeError,
+    VolumeAlreadyMappedError,
+    VolumeNotMappedError,
+)
+from ibm_storage_flocker_driver.lib.constants import (
+    DEFAULT_DEBUG_LEVEL,
+    CONF_PARAM_INCREMENTAL_SYNC,
+    CONF_PARAM_FULL_SYNC_INTERVAL,
+    CONF_PARAM_PAGE_SIZE,
+    CONF_PARAM_VOLUME_QUERY_PUSHDOWN,
+    CONF_PARAM_MAX_CONCURRENT_REQUESTS,
+    CONF_PARAM_TOKEN_LIFETIME,
+    CONF_PARAM_TOKEN_CACHE_DIR,
+    CONF_PARAM_READ_TIMEOUT,
+    CONF_PARAM_ENDPOINT_READ_TIMEOUTS,
+    CONF_PARAM_MAX_RETRIES,
+    CONF_PARAM_RETRY_BACKOFF,
+    CONF_PARAM_CIRCUIT_BREAKER_THRESHOLD,
+    CONF_PARAM_CIRCUIT_BREAKER_RESET_TIMEOUT,
+    CONF_PARAM_COALESCE_REQUESTS,
 )
-from ibm_storage_flocker_driver.lib.constants import DEFAULT_DEBUG_LEVEL
 
 FAKE_VOL_CONTENT = \
     '[' \
@@ -229,6 +260,406 @@ class TestsRESTClientTokenExpire(unittest.TestCase):
         ]
         r.post(resource_url='/url', payload=None)
 
+
+class TestsRESTClientTokenLifecycle(unittest.TestCase):
+    """
+    Unit testing for RestClient class (Token refresh before expiration)
+    """
+    # pylint: disable=W0212
+
+    def _get_client(self, options=None, **server_kwargs):
+        self.server = FakeSCBEServer(**server_kwargs).start()
+        self.addCleanup(self.server.stop)
+        con_info = ConnectionInfo(
+            username='', password='', verify_ssl=False,
+            management_ip='', debug_level=FAKE_MNG_LOG_LEVEL,
+            options=options)
+        client = RestClient(con_info, self.server.base_url,
+                            ibm_scbe_client.URL_SCBE_RESOURCE_GET_AUTH)
+        self.addCleanup(client.close)
+        return client
+
+    def test_concurrent_unauthorized_login_once(self):
+        client = self._get_client(delay=0.2)
+        self.server.revoke_tokens()
+
+        run_concurrently(  # different requests, so none is coalesced
+            [lambda name=name: client.get(
+                ibm_scbe_client.URL_SCBE_RESOURCE_HOST, dict(name=name))
+             for name in range(5)])
+
+        stats = client.token_stats()
+        self.assertEqual(self.server.logins, 2)
+        self.assertEqual(stats['logins'], 2)
+        self.assertEqual(stats['replays'], 5)
+        self.assertEqual(stats['coalesced'], 4)
+
+    def test_refresh_in_background_by_login_lifetime(self):
+        client = self._get_client(token_lifetime=1, send_expires_in=True)
+        self.assertEqual(client.token_stats()['lifetime'], 1)
+
+        time.sleep(1.2)
+        client.get(ibm_scbe_client.URL_SCBE_RESOURCE_HOST)
+
+        stats = client.token_stats()
+        self.assertGreaterEqual(stats['proactive_refreshes'], 1)
+        self.assertEqual(stats['replays'], 0)
+
+    def test_lifetime_learned_from_expiration(self):
+        client = self._get_client()
+        self.assertIsNone(client.token_stats()['lifetime'])
+        client._token_issued_at -= 100
+        self.server.revoke_tokens()
+
+        client.get(ibm_scbe_client.URL_SCBE_RESOURCE_HOST)
+
+        stats = client.token_stats()
+        self.assertEqual(stats['replays'], 1)
+        self.assertEqual(self.server.logins, 2)
+        self.assertGreaterEqual(stats['lifetime'], 100)
+        self.assertLess(stats['lifetime'], 200)
+
+    def test_lifetime_not_learned_from_revoked_token(self):
+        client = self._get_client()
+        self.server.revoke_tokens()
+
+        client.get(ibm_scbe_client.URL_SCBE_RESOURCE_HOST)
+
+        stats = client.token_stats()
+        self.assertEqual(stats['replays'], 1)
+        self.assertIsNone(stats['lifetime'])
+
+    def test_refresh_when_due_by_configured_lifetime(self):
+        client = self._get_client(options={CONF_PARAM_TOKEN_LIFETIME: 3600})
+        client._token_issued_at -= 3000
+
+        client.get(ibm_scbe_client.URL_SCBE_RESOURCE_HOST)
+
+        stats = client.token_stats()
+        self.assertEqual(stats['proactive_refreshes'], 1)
+        self.assertEqual(stats['replays'], 0)
+        self.assertEqual(self.server.logins, 2)
+
+    def test_revoked_token_kept_configured_lifetime(self):
+        client = self._get_client(options={CONF_PARAM_TOKEN_LIFETIME: 3600})
+        self.server.revoke_tokens()
+
+        client.get(ibm_scbe_client.URL_SCBE_RESOURCE_HOST)
+
+        stats = client.token_stats()
+        self.assertEqual(stats['replays'], 1)
+        self.assertEqual(stats['lifetime'], 3600)
+
+
+class TestsRESTClientTokenCache(unittest.TestCase):
+    """
+    Unit testing for RestClient class (Token reused across restarts)
+    """
+    # pylint: disable=W0212
+
+    def setUp(self):
+        self.server = FakeSCBEServer().start()
+        self.addCleanup(self.server.stop)
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        self.con_info = ConnectionInfo(
+            username='user', password='', verify_ssl=False,
+            management_ip='127.0.0.1', port=self.server.server_port,
+            debug_level=FAKE_MNG_LOG_LEVEL,
+            options={CONF_PARAM_TOKEN_CACHE_DIR: cache_dir})
+
+    def _get_client(self):
+        client = RestClient(self.con_info, self.server.base_url,
+                            ibm_scbe_client.URL_SCBE_RESOURCE_GET_AUTH)
+        self.addCleanup(client.close)
+        return client
+
+    def test_restart_skips_login(self):
+        self._get_client().get(ibm_scbe_client.URL_SCBE_RESOURCE_HOST)
+        client = self._get_client()
+        client.get(ibm_scbe_client.URL_SCBE_RESOURCE_HOST)
+
+        self.assertEqual(self.server.logins, 1)
+        self.assertEqual(client.token_stats()['cache_hits'], 1)
+        self.assertEqual(client.token_stats()['logins'], 0)
+
+    def test_rejected_cached_token_discarded(self):
+        self._get_client()
+        self.server.revoke_tokens()
+        client = self._get_client()
+        client.get(ibm_scbe_client.URL_SCBE_RESOURCE_HOST)
+
+        stats = client.token_stats()
+        self.assertEqual(stats['cache_rejected'], 1)
+        self.assertEqual(stats['replays'], 1)
+        self.assertIsNone(stats['lifetime'])
+        self.assertEqual(self.server.logins, 2)
+
+        # The new token is cached for the next restart
+        self._get_client().get(ibm_scbe_client.URL_SCBE_RESOURCE_HOST)
+        self.assertEqual(self.server.logins, 2)
+
+    def test_expired_cached_token_not_used(self):
+        self.con_info.options[CONF_PARAM_TOKEN_LIFETIME] = 3600
+        client = self._get_client()
+        client._token_cache.save('old-token', time.time() - 3600, 3600)
+
+        client = self._get_client()
+
+        self.assertEqual(client.token_stats()['cache_hits'], 0)
+        self.assertEqual(self.server.logins, 2)
+
+
+class TestsRESTClientTimeouts(unittest.TestCase):
+    """
+    Unit testing for RestClient class (Timeouts and operation deadline)
+    """
+
+    def _get_client(self, **options):
+        self.server = FakeSCBEServer().start()
+        self.addCleanup(self.server.stop)
+        con_info = ConnectionInfo(
+            username='', password='', verify_ssl=False,
+            management_ip='', debug_level=FAKE_MNG_LOG_LEVEL,
+            options=options)
+        client = RestClient(con_info, self.server.base_url,
+                            ibm_scbe_client.URL_SCBE_RESOURCE_GET_AUTH)
+        self.addCleanup(client.close)
+        self.server.delay = 0.3
+        return client
+
+    def test_read_timeout(self):
+        client = self._get_client(**{CONF_PARAM_READ_TIMEOUT: 0.1})
+        self.assertRaises(ReadTimeout, client.get,
+                          ibm_scbe_client.URL_SCBE_RESOURCE_HOST)
+
+    def test_endpoint_read_timeout(self):
+        client = self._get_client(**{
+            CONF_PARAM_READ_TIMEOUT: 5,
+            CONF_PARAM_ENDPOINT_READ_TIMEOUTS: {
+                ibm_scbe_client.URL_SCBE_RESOURCE_HOST: 0.1},
+        })
+        self.assertRaises(ReadTimeout, client.get,
+                          ibm_scbe_client.URL_SCBE_RESOURCE_HOST + '/1')
+        client.get(ibm_scbe_client.URL_SCBE_RESOURCE_SERVICE)
+
+    def test_call_bounded_by_deadline(self):
+        client = self._get_client(**{CONF_PARAM_READ_TIMEOUT: 5})
+        start = time.time()
+        with deadline.deadline('operation', 0.1):
+            self.assertRaises(deadline.DeadlineExceeded, client.get,
+                              ibm_scbe_client.URL_SCBE_RESOURCE_HOST)
+        self.assertLess(time.time() - start, 0.3)
+
+    def test_no_call_after_deadline(self):
+        client = self._get_client()
+        requests_before = len(self.server.requests)
+        with deadline.deadline('operation', 0.01):
+            time.sleep(0.02)
+            self.assertRaises(deadline.DeadlineExceeded, client.get,
+                              ibm_scbe_client.URL_SCBE_RESOURCE_HOST)
+        self.assertEqual(len(self.server.requests), requests_before)
+
+
+class TestsRESTClientRetry(unittest.TestCase):
+    """
+    Unit testing for RestClient class (Retry and circuit breaker)
+    """
+
+    def _get_client(self, **options):
+        self.server = FakeSCBEServer().start()
+        self.addCleanup(self.server.stop)
+        options.setdefault(CONF_PARAM_MAX_RETRIES, 3)
+        options.setdefault(CONF_PARAM_RETRY_BACKOFF, 0.01)
+        options.setdefault(CONF_PARAM_CIRCUIT_BREAKER_THRESHOLD, 0.5)
+        con_info = ConnectionInfo(
+            username='', password='', verify_ssl=False,
+            management_ip='', debug_level=FAKE_MNG_LOG_LEVEL,
+            options=options)
+        client = RestClient(con_info, self.server.base_url,
+                            ibm_scbe_client.URL_SCBE_RESOURCE_GET_AUTH)
+        self.addCleanup(client.close)
+        return client
+
+    def _count_requests(self, method):
+        return len([request for request in self.server.requests
+                    if request[0] == method])
+
+    def test_no_retry_nor_circuit_breaker_by_default(self):
+        server = FakeSCBEServer().start()
+        self.addCleanup(server.stop)
+        con_info = ConnectionInfo(
+            username='', password='', verify_ssl=False,
+            management_ip='', debug_level=FAKE_MNG_LOG_LEVEL)
+        client = RestClient(con_info, server.base_url,
+                            ibm_scbe_client.URL_SCBE_RESOURCE_GET_AUTH)
+        self.addCleanup(client.close)
+        server.inject_faults(503, count=20)
+        for _ in range(20):
+            self.assertRaises(RestClientException, client.get,
+                              ibm_scbe_client.URL_SCBE_RESOURCE_HOST)
+        self.assertEqual(len([request for request in server.requests
+                              if request[0] == 'GET']), 20)
+        self.assertEqual(client.retry_stats()['retries'], 0)
+
+    def test_get_retried_on_server_error(self):
+        client = self._get_client()
+        self.server.inject_faults(502, count=2)
+        client.get(ibm_scbe_client.URL_SCBE_RESOURCE_HOST)
+        self.assertEqual(self._count_requests('GET'), 3)
+        self.assertEqual(client.retry_stats()['retries'], 2)
+
+    def test_get_retried_on_dropped_connection(self):
+        client = self._get_client()
+        self.server.inject_faults(None)
+        client.get(ibm_scbe_client.URL_SCBE_RESOURCE_HOST)
+        self.assertEqual(self._count_requests('GET'), 2)
+
+    def test_get_gives_up_after_max_retries(self):
+        client = self._get_client(**{CONF_PARAM_MAX_RETRIES: 2})
+        self.server.inject_faults(500, count=5)
+        self.assertRaises(RestClientException, client.get,
+                          ibm_scbe_client.URL_SCBE_RESOURCE_HOST)
+        self.assertEqual(self._count_requests('GET'), 3)
+
+    def test_get_not_retried_on_client_error(self):
+        client = self._get_client()
+        self.assertRaises(RestClientException, client.get,
+                          ibm_scbe_client.URL_SCBE_RESOURCE_HOST + '/1')
+        self.assertEqual(self._count_requests('GET'), 1)
+        self.assertEqual(client.retry_stats()['retries'], 0)
+
+    def test_post_retried_only_if_not_handled(self):
+        client = self._get_client()
+        self.server.inject_faults(503)
+        client.post(ibm_scbe_client.URL_SCBE_RESOURCE_MAPPING, {})
+        self.server.inject_faults(500)
+        self.assertRaises(RestClientException, client.post,
+                          ibm_scbe_client.URL_SCBE_RESOURCE_MAPPING, {})
+        self.server.inject_faults(None)
+        self.assertRaises(ConnectionError, client.post,
+                          ibm_scbe_client.URL_SCBE_RESOURCE_MAPPING, {})
+        # login, 503 and its retry, 500, dropped connection
+        self.assertEqual(self._count_requests('POST'), 5)
+
+    def test_retry_after_honored(self):
+        client = self._get_client(**{CONF_PARAM_RETRY_BACKOFF: 5})
+        self.server.inject_faults(429, retry_after=0.2)
+        start = time.time()
+        client.post(ibm_scbe_client.URL_SCBE_RESOURCE_MAPPING, {})
+        self.assertGreaterEqual(time.time() - start, 0.2)
+        self.assertLess(time.time() - start, 2)
+
+    def test_no_retry_beyond_deadline(self):
+        client = self._get_client(**{CONF_PARAM_RETRY_BACKOFF: 5})
+        self.server.inject_faults(503, retry_after=5)
+        start = time.time()
+        with deadline.deadline('operation', 1):
+            self.assertRaises(RestClientException, client.get,
+                              ibm_scbe_client.URL_SCBE_RESOURCE_HOST)
+        self.assertLess(time.time() - start, 1)
+
+    def test_circuit_breaker_fails_fast(self):
+        client = self._get_client(**{
+            CONF_PARAM_MAX_RETRIES: 0,
+            CONF_PARAM_CIRCUIT_BREAKER_RESET_TIMEOUT: 0.2,
+        })
+        self.server.inject_faults(500, count=10)
+        for _ in range(10):
+            self.assertRaises(RestClientException, client.get,
+                              ibm_scbe_client.URL_SCBE_RESOURCE_HOST)
+        self.assertEqual(client.circuit_breaker.state, CIRCUIT_OPEN)
+        self.assertRaises(CircuitOpenError, client.get,
+                          ibm_scbe_client.URL_SCBE_RESOURCE_HOST)
+        self.assertEqual(self._count_requests('GET'), 10)
+
+        time.sleep(0.2)  # the trial call closes the circuit
+        client.get(ibm_scbe_client.URL_SCBE_RESOURCE_HOST)
+        stats = client.retry_stats()
+        self.assertEqual(stats['state'], CIRCUIT_CLOSED)
+        self.assertEqual(stats['opened'], 1)
+        self.assertEqual(stats['rejected'], 1)
+
+    def test_circuit_breaker_disabled(self):
+        client = self._get_client(**{
+            CONF_PARAM_MAX_RETRIES: 0,
+            CONF_PARAM_CIRCUIT_BREAKER_THRESHOLD: 0,
+        })
+        self.server.inject_faults(500, count=20)
+        for _ in range(20):
+            self.assertRaises(RestClientException, client.get,
+                              ibm_scbe_client.URL_SCBE_RESOURCE_HOST)
+        self.assertEqual(self._count_requests('GET'), 20)
+
+
+class TestsRESTClientCoalescing(unittest.TestCase):
+    """
+    Unit testing for RestClient class (Coalescing of identical GETs)
+    """
+
+    def _get_client(self, **options):
+        self.server = FakeSCBEServer(delay=0.2).start()
+        self.addCleanup(self.server.stop)
+        self.server.collections['services'] = [dict(id=1, name='gold')]
+        options.setdefault(CONF_PARAM_COALESCE_REQUESTS, True)
+        con_info = ConnectionInfo(
+            username='', password='', verify_ssl=False,
+            management_ip='', debug_level=FAKE_MNG_LOG_LEVEL,
+            options=options)
+        client = RestClient(con_info, self.server.base_url,
+                            ibm_scbe_client.URL_SCBE_RESOURCE_GET_AUTH)
+        self.addCleanup(client.close)
+        return client
+
+    def _get_services_concurrently(self, client, payloads):
+        return run_concurrently(
+            [lambda payload=payload: client.get(
+                ibm_scbe_client.URL_SCBE_RESOURCE_SERVICE, payload)
+             for payload in payloads], max_workers=len(payloads))
+
+    def _count_gets(self):
+        return len([request for request in self.server.requests
+                    if request[0] == 'GET'])
+
+    def test_identical_gets_coalesced(self):
+        client = self._get_client()
+        results = self._get_services_concurrently(
+            client, [dict(name='gold')] * 8)
+        self.assertEqual(results, [[dict(id=1, name='gold')]] * 8)
+        self.assertEqual(self._count_gets(), 1)
+        stats = client.coalesce_stats()
+        self.assertEqual((stats['calls'], stats['coalesced']), (8, 7))
+
+        # every caller gets its own copy
+        results[0].append('changed')
+        self.assertEqual(results[1], [dict(id=1, name='gold')])
+
+    def test_different_params_not_coalesced(self):
+        client = self._get_client()
+        self._get_services_concurrently(
+            client, [dict(name='gold'), dict(name='silver')])
+        self.assertEqual(self._count_gets(), 2)
+
+    def test_coalescing_disabled(self):
+        client = self._get_client(**{CONF_PARAM_COALESCE_REQUESTS: False})
+        self._get_services_concurrently(client, [dict(name='gold')] * 4)
+        self.assertEqual(self._count_gets(), 4)
+        self.assertEqual(client.coalesce_stats()['coalesced'], 0)
+
+    def test_not_coalesced_by_default(self):
+        self.server = FakeSCBEServer(delay=0.2).start()
+        self.addCleanup(self.server.stop)
+        con_info = ConnectionInfo(
+            username='', password='', verify_ssl=False,
+            management_ip='', debug_level=FAKE_MNG_LOG_LEVEL)
+        client = RestClient(con_info, self.server.base_url,
+                            ibm_scbe_client.URL_SCBE_RESOURCE_GET_AUTH)
+        self.addCleanup(client.close)
+        self._get_services_concurrently(client, [dict(name='gold')] * 4)
+        self.assertEqual(self._count_gets(), 4)
+        self.assertEqual(client.coalesce_stats()['coalesced'], 0)
+
+
 FAKE_MNG_LOG_LEVEL = DEFAULT_DEBUG_LEVEL
 FAKE_MNG_INFO = ConnectionInfo(
     username='', password='', verify_ssl=False,
@@ -435,3 +866,787 @@ class TestsSCBEClient(unittest.TestCase):
         self.assertEqual(
             ibm_scbe_client.LOG.level,
             getattr(ibm_scbe_client.logging, _fake_mng_info.debug_level))
+
+
+class TestsSCBEClientServiceCatalog(unittest.TestCase):
+    """
+    Unit testing for the service catalog usage of IBMSCBEClientAPI
+    """
+
+    # pylint: disable=W0212
+
+    def setUp(self):
+        with patch(_RESTCLIENT_PATH):
+            self.client = IBMSCBEClientAPI(FAKE_MNG_INFO)
+        self.client._client.get = MagicMock(return_value=FAKE_SERVICES_OUT_PUT)
+        self.client._client.post = MagicMock(
+            return_value=FAKE_VOLUME_LIST[0])
+
+    def test_create_volume_reuses_catalog(self):
+        self.assertTrue(self.client.resource_exists(FAKE_SERVICE_NAME))
+        self.client.create_volume('vol1', FAKE_SERVICE_NAME, 1024)
+        self.client.create_volume('vol2', FAKE_SERVICE_NAME, 1024)
+
+        self.assertEqual(self.client._client.get.call_count, 1)
+        payload = self.client._client.post.call_args[0][1]
+        self.assertEqual(payload['service'], FAKE_SERVICES_OUT_PUT[0]['id'])
+
+    def test_resource_exists_reloads_on_miss(self):
+        self.assertFalse(self.client.resource_exists('no_such_service'))
+        self.assertFalse(self.client.resource_exists('no_such_service'))
+        # first lookup loads the catalog, a later miss reloads it once
+        self.assertEqual(self.client._client.get.call_count, 2)
+
+    @staticmethod
+    def _rejection(status, error_code, detail='rejected'):
+        return RestClientException(VolGetFakeRespond(
+            json.dumps(dict(detail=detail, error_code=error_code)), status),
+            'error')
+
+    def test_create_volume_unknown_service_invalidates_catalog(self):
+        self.client._client.post.side_effect = self._rejection(
+            404, ibm_scbe_client.SCBE_ERROR_SERVICE_NOT_FOUND)
+
+        with self.assertRaises(RestClientException):
+            self.client.create_volume('vol1', FAKE_SERVICE_NAME, 1024)
+        # load + reload after the invalidation
+        self.assertEqual(self.client._client.get.call_count, 2)
+        self.assertEqual(self.client._client.post.call_count, 1)
+
+    def test_create_volume_retries_on_recreated_service(self):
+        new_service = dict(FAKE_SERVICES_OUT_PUT[0], id='new-service-id')
+        self.client._client.get.side_effect = [
+            FAKE_SERVICES_OUT_PUT, [new_service]]
+        self.client._client.post.side_effect = [
+            self._rejection(400, ibm_scbe_client.SCBE_ERROR_SERVICE_NOT_FOUND),
+            FAKE_VOLUME_LIST[0],
+        ]
+
+        self.client.create_volume('vol1', FAKE_SERVICE_NAME, 1024)
+        payload = self.client._client.post.call_args[0][1]
+        self.assertEqual(payload['service'], 'new-service-id')
+
+    def test_create_volume_other_errors_keep_catalog(self):
+        self.client._client.post.side_effect = RestClientException(
+            VolGetFakeRespond('internal error', 500), 'error')
+
+        with self.assertRaises(RestClientException):
+            self.client.create_volume('vol1', FAKE_SERVICE_NAME, 1024)
+        self.assertEqual(self.client._client.get.call_count, 1)
+
+    def test_create_volume_other_service_errors_keep_catalog(self):
+        for content in ('service capacity exceeded',
+                        json.dumps(dict(detail='not enough service capacity',
+                                        error_code='INVALID_SIZE'))):
+            self.client._client.post.side_effect = RestClientException(
+                VolGetFakeRespond(content, 400), 'error')
+
+            with self.assertRaises(RestClientException):
+                self.client.create_volume('vol1', FAKE_SERVICE_NAME, 1024)
+        self.assertEqual(self.client._client.get.call_count, 1)
+        self.assertEqual(self.client._client.post.call_count, 2)
+
+
+class TestsSCBEClientMappingErrors(unittest.TestCase):
+    """
+    Unit testing for the translation of rejected mappings of IBMSCBEClientAPI
+    """
+
+    # pylint: disable=W0212
+
+    def setUp(self):
+        with patch(_RESTCLIENT_PATH):
+            self.client = IBMSCBEClientAPI(FAKE_MNG_INFO)
+        self.client._get_host_id_by_vol = MagicMock(return_value=1)
+
+    def _reject(self, method, status, error_code=None, detail='rejected'):
+        content = json.dumps(dict(detail=detail, error_code=error_code))
+        getattr(self.client._client, method).side_effect = \
+            RestClientException(VolGetFakeRespond(content, status), 'error')
+
+    def test_map_volume_already_mapped(self):
+        self._reject('post', 409,
+                     ibm_scbe_client.SCBE_ERROR_VOLUME_ALREADY_MAPPED)
+        with self.assertRaises(VolumeAlreadyMappedError) as e:
+            self.client.map_volume('wwn1', 'host1')
+        self.assertEqual((e.exception.wwn, e.exception.host),
+                         ('wwn1', 'host1'))
+
+    def test_map_volume_unknown_volume(self):
+        self._reject('post', 404, ibm_scbe_client.SCBE_ERROR_VOLUME_NOT_FOUND)
+        self.assertRaises(UnknownVolumeError,
+                          self.client.map_volume, 'wwn1', 'host1')
+
+    def test_unmap_volume_not_mapped(self):
+        self._reject('delete', 404,
+                     ibm_scbe_client.SCBE_ERROR_VOLUME_NOT_MAPPED)
+        self.assertRaises(VolumeNotMappedError,
+                          self.client.unmap_volume, 'wwn1', 'host1')
+
+    def test_unmap_volume_unknown_volume(self):
+        self._reject('delete', 404,
+                     ibm_scbe_client.SCBE_ERROR_VOLUME_NOT_FOUND)
+        self.assertRaises(UnknownVolumeError,
+                          self.client.unmap_volume, 'wwn1', 'host1')
+
+    def test_unclassified_errors_not_translated(self):
+        # the status or the error code alone is not enough
+        for method, status, error_code, detail in (
+                ('post', 409, None, 'Volume is already mapped.'),
+                ('post', 400, ibm_scbe_client.SCBE_ERROR_VOLUME_ALREADY_MAPPED,
+                 'rejected'),
+                ('delete', 404, None, 'Mapping not found.'),
+                ('delete', 404, None, 'volume not found'),
+                ('delete', 400, ibm_scbe_client.SCBE_ERROR_VOLUME_NOT_MAPPED,
+                 'rejected')):
+            self._reject(method, status, error_code, detail)
+            client_call = dict(post=self.client.map_volume,
+                               delete=self.client.unmap_volume)[method]
+            self.assertRaises(RestClientException, client_call,
+                              'wwn1', 'host1')
+
+    def test_not_json_errors_not_translated(self):
+        self.client._client.delete.side_effect = RestClientException(
+            VolGetFakeRespond('mapping not found', 404), 'error')
+        self.assertRaises(RestClientException,
+                          self.client.unmap_volume, 'wwn1', 'host1')
+
+    def test_map_volume_returns_lun(self):
+        self.client._client.post.return_value = {u'mappings': [
+            {u'volume': u'wwn1', u'lun_number': 5, u'host': 1, u'id': 2}]}
+        self.assertEqual(self.client.map_volume('wwn1', 'host1'), 5)
+
+        self.client._client.post.return_value = {}
+        self.assertEqual(self.client.map_volume('wwn1', 'host1', lun=3), 3)
+        self.assertEqual(self.client.map_volume('wwn1', 'host1'), None)
+
+    def test_other_errors_not_translated(self):
+        self._reject('post', 500, detail='internal error')
+        self.assertRaises(RestClientException,
+                          self.client.map_volume, 'wwn1', 'host1')
+        self._reject('delete', 500, detail='internal error')
+        self.assertRaises(RestClientException,
+                          self.client.unmap_volume, 'wwn1', 'host1')
+
+
+class TestsSCBEClientHostDirectory(unittest.TestCase):
+    """
+    Unit testing for the host directory usage of IBMSCBEClientAPI
+    """
+
+    # pylint: disable=W0212
+
+    def setUp(self):
+        with patch(_RESTCLIENT_PATH):
+            self.client = IBMSCBEClientAPI(FAKE_MNG_INFO)
+        self.host = dict(FAKE_HOST_JSON, array=FAKE_VOLUME_LIST[0]['array'])
+        self.client._client.post = MagicMock()
+        self.client._client.delete = MagicMock()
+
+    def test_map_unmap_after_preload(self):
+        self.client._client.get = MagicMock(return_value=[self.host])
+        self.client.preload_host(FAKE_HOST)
+
+        self.client._client.get = MagicMock(return_value=FAKE_VOLUME_LIST)
+        self.client.map_volume(FAKE_VOL_WWN, FAKE_HOST)
+        self.client.unmap_volume(FAKE_VOL_WWN, FAKE_HOST)
+
+        # only the first lookup of the volume array, no host lookups
+        self.client._client.get.assert_called_once_with(
+            ibm_scbe_client.URL_SCBE_RESOURCE_VOLUME,
+            dict(scsi_identifier=FAKE_VOL_WWN))
+        payload = self.client._client.post.call_args[0][1]
+        self.assertEqual(payload['host_id'], FAKE_HOST_ID)
+
+    def test_list_volumes_caches_vol_array(self):
+        self.client._client.get = MagicMock(return_value=FAKE_VOLUME_LIST)
+        self.client.list_volumes()
+        self.client._client.get = MagicMock(return_value=[self.host])
+        self.client.map_volume(FAKE_VOL_WWN, FAKE_HOST)
+
+        self.client._client.get.assert_called_once_with(
+            ibm_scbe_client.URL_SCBE_RESOURCE_HOST,
+            dict(array_id=self.host['array'], name=FAKE_HOST))
+
+    def test_host_not_found_invalidates(self):
+        self.client._client.get = MagicMock(return_value=FAKE_VOLUME_LIST)
+        self.client.list_volumes()
+        self.client._host_list = MagicMock(return_value=[])
+        with self.assertRaises(HostIdNotFoundByWwn):
+            self.client.map_volume(FAKE_VOL_WWN, FAKE_HOST)
+        self.assertEqual(self.client._vol_arrays.get(FAKE_VOL_WWN), None)
+
+    def test_get_vol_mapping_uses_directory(self):
+        self.client._vol_mapping_list = MagicMock(
+            return_value=FAKE_MAPPING_JSON)
+        self.client._client.get = MagicMock(
+            return_value=[dict(self.host, id=FAKE_MAPPING_JSON[0]['host'])])
+        self.client.get_hosts()
+
+        self.client._host_by_id = MagicMock()
+        self.assertEqual(self.client.get_vol_mapping(FAKE_VOL_WWN), FAKE_HOST)
+        self.assertFalse(self.client._host_by_id.called)
+
+    def test_get_vol_mapping_host_not_found(self):
+        self.client._vol_mapping_list = MagicMock(
+            return_value=FAKE_MAPPING_JSON)
+        self.client._host_by_id = MagicMock(return_value=None)
+        with self.assertRaises(HostIDNotFound):
+            self.client.get_vol_mapping(FAKE_VOL_WWN)
+
+
+def _fake_vol(wwn, updated, name='f_vol', pending_deletion=False):
+    return dict(
+        scsi_identifier=wwn,
+        name='{}_{}'.format(name, wwn),
+        logical_capacity=1024,
+        volume_id=wwn.lower(),
+        array='9835-415-6013800',
+        last_update_time=updated,
+        is_pending_deletion=pending_deletion,
+    )
+
+
+class TestsSCBEClientDeltaSync(unittest.TestCase):
+    """
+    Unit testing for the incremental volume sync over a local SCBE server
+    """
+    # pylint: disable=W0212
+
+    def setUp(self):
+        self.server = FakeSCBEServer().start()
+        self.addCleanup(self.server.stop)
+        self.server.collections['volumes'] = [
+            _fake_vol('WWN1', '2016-10-13T10:00:00'),
+            _fake_vol('WWN2', '2016-10-13T11:00:00'),
+        ]
+        self.client = self._get_client(self.server)
+
+    @staticmethod
+    def _get_client(server, full_sync_interval=600):
+        con_info = ConnectionInfo(
+            username='', password='', verify_ssl=False,
+            management_ip='', debug_level=FAKE_MNG_LOG_LEVEL,
+            options={
+                CONF_PARAM_INCREMENTAL_SYNC: True,
+                CONF_PARAM_FULL_SYNC_INTERVAL: full_sync_interval,
+            },
+        )
+        with patch(_RESTCLIENT_PATH):
+            client = IBMSCBEClientAPI(con_info)
+        client._client = RestClient(
+            con_info, server.base_url,
+            ibm_scbe_client.URL_SCBE_RESOURCE_GET_AUTH)
+        return client
+
+    def _listed_wwns(self):
+        return [vol.wwn for vol in self.client.list_volumes()]
+
+    def _last_volume_params(self, server=None):
+        server = server or self.server
+        params = [params for action, path, params in server.requests
+                  if action == 'GET' and path.endswith('/volumes')][-1]
+        return [param for param in params
+                if param[0] != ibm_scbe_client.SCBE_FIELDS_PARAM]
+
+    def test_disabled_by_default(self):
+        with patch(_RESTCLIENT_PATH):
+            client = IBMSCBEClientAPI(FAKE_MNG_INFO)
+        self.assertEqual(client._volume_sync, None)
+
+    def test_delta_after_full_load(self):
+        self.assertEqual(self._listed_wwns(), ['WWN1', 'WWN2'])
+        self.assertEqual(self._last_volume_params(), [])
+
+        volumes = self.server.collections['volumes']
+        volumes[0] = _fake_vol('WWN1', '2016-10-13T12:00:00', name='f_new')
+        volumes.append(_fake_vol('WWN3', '2016-10-13T12:30:00'))
+
+        vols = self.client.list_volumes()
+        self.assertEqual([vol.wwn for vol in vols], ['WWN1', 'WWN2', 'WWN3'])
+        self.assertEqual(vols[0].name, 'f_new_WWN1')
+        self.assertEqual(
+            self._last_volume_params(),
+            [(ibm_scbe_client.SCBE_VOLUME_CHANGED_SINCE_PARAM,
+              '2016-10-13T11:00:00')])
+
+        # Nothing changed, so only the records at the watermark are sent
+        self.assertEqual(self._listed_wwns(), ['WWN1', 'WWN2', 'WWN3'])
+        self.assertEqual(
+            self._last_volume_params()[0][1], '2016-10-13T12:30:00')
+
+    def test_tombstone_drops_volume(self):
+        self._listed_wwns()
+        self.server.collections['volumes'][1] = _fake_vol(
+            'WWN2', '2016-10-13T12:00:00', pending_deletion=True)
+        self.assertEqual(self._listed_wwns(), ['WWN1'])
+
+    def test_full_reconcile_catches_drift(self):
+        self.client = self._get_client(self.server, full_sync_interval=0)
+        self._listed_wwns()
+        # Deleted by someone else, so it never shows up as a change
+        del self.server.collections['volumes'][0]
+        with patch('ibm_storage_flocker_driver.lib.ibm_scbe_client.'
+                   'time.time', return_value=10 ** 10):
+            self.assertEqual(self._listed_wwns(), ['WWN2'])
+        self.assertEqual(self._last_volume_params(), [])
+
+    def test_filter_not_supported_falls_back_to_full_sync(self):
+        server = FakeSCBEServer(supported_filters=()).start()
+        self.addCleanup(server.stop)
+        server.collections['volumes'] = list(
+            self.server.collections['volumes'])
+        self.client = self._get_client(server)
+
+        self._listed_wwns()
+        # The response has volumes older than the watermark
+        self.assertEqual(self._listed_wwns(), ['WWN1', 'WWN2'])
+        self.assertFalse(self.client._volume_sync._delta_supported)
+
+        del server.collections['volumes'][0]
+        self.assertEqual(self._listed_wwns(), ['WWN2'])
+        self.assertEqual(self._last_volume_params(server), [])
+
+    def test_create_and_delete_update_the_copy(self):
+        self._listed_wwns()
+        self.client._service_catalog.get_id = MagicMock(return_value='1')
+        self.client._client.post = MagicMock(
+            return_value=_fake_vol('WWN3', '2016-10-13T09:00:00'))
+        self.client.create_volume('f_vol_WWN3', 'service', 1024)
+        self.client.delete_volume('WWN1')
+
+        self.assertEqual(self._listed_wwns(), ['WWN2', 'WWN3'])
+
+    def test_filtered_listing_bypasses_the_copy(self):
+        self._listed_wwns()
+        vols = self.client.list_volumes(wwn='WWN2')
+        self.assertEqual([vol.wwn for vol in vols], ['WWN2'])
+        self.assertEqual(self._last_volume_params(),
+                         [('scsi_identifier', 'WWN2')])
+
+
+class TestsSCBEClientListVolumesPerService(unittest.TestCase):
+    """
+    Unit testing for listing the volumes of several services
+    """
+    # pylint: disable=W0212
+
+    def setUp(self):
+        self.server = FakeSCBEServer().start()
+        self.addCleanup(self.server.stop)
+        self.server.collections['volumes'] = [
+            dict(_fake_vol('WWN1', '1'), service_name='gold'),
+            dict(_fake_vol('WWN2', '1'), service_name='bronze'),
+            dict(_fake_vol('WWN3', '1'), service_name='silver'),
+        ]
+        self.server.collections['services'] = [
+            dict(id=1, name='gold'), dict(id=2, name='bronze')]
+        self.client = self._get_client(
+            {CONF_PARAM_VOLUME_QUERY_PUSHDOWN: True})
+
+    def _get_client(self, options):
+        con_info = ConnectionInfo(
+            username='', password='', verify_ssl=False,
+            management_ip='', debug_level=FAKE_MNG_LOG_LEVEL,
+            options=options)
+        with patch(_RESTCLIENT_PATH):
+            client = IBMSCBEClientAPI(con_info)
+        client._client = RestClient(
+            con_info, self.server.base_url,
+            ibm_scbe_client.URL_SCBE_RESOURCE_GET_AUTH)
+        self.addCleanup(client._client.close)
+        return client
+
+    def _volume_requests(self):
+        return sorted(params for action, path, params in self.server.requests
+                      if action == 'GET' and path.endswith('/volumes'))
+
+    def test_list_volumes_per_service(self):
+        vols = self.client.list_volumes(resource=['gold', 'bronze'])
+        self.assertEqual([vol.wwn for vol in vols], ['WWN1', 'WWN2'])
+        self.assertEqual(self._volume_requests(),
+                         [[('service_name', 'bronze')],
+                          [('service_name', 'gold')]])
+
+    def test_list_volumes_of_all_services_reloads_catalog(self):
+        self.client.list_service_names()  # the catalog is loaded
+        self.server.collections['services'].append(dict(id=3, name='silver'))
+        vols = self.client.list_volumes()
+        self.assertEqual(sorted(vol.wwn for vol in vols),
+                         ['WWN1', 'WWN2', 'WWN3'])
+        self.assertEqual(len(self._volume_requests()), 3)
+
+    def test_list_volumes_without_services(self):
+        self.server.collections['services'] = []
+        vols = self.client.list_volumes()
+        self.assertEqual([vol.wwn for vol in vols], ['WWN1', 'WWN2', 'WWN3'])
+        self.assertEqual(self._volume_requests(), [[]])
+
+    def test_list_volumes_not_per_service_by_default(self):
+        self.client = self._get_client({})
+        vols = self.client.list_volumes(resource=['gold', 'bronze'])
+        self.assertEqual([vol.wwn for vol in vols], ['WWN1', 'WWN2'])
+        vols = self.client.list_volumes()
+        self.assertEqual([vol.wwn for vol in vols], ['WWN1', 'WWN2', 'WWN3'])
+        self.assertEqual(self._volume_requests(), [[], []])
+
+    def test_list_volumes_of_one_service(self):
+        vols = self.client.list_volumes(resource='silver')
+        self.assertEqual([vol.wwn for vol in vols], ['WWN3'])
+
+    def test_list_volumes_per_service_filter_not_supported(self):
+        self.server.supported_filters = ()
+        vols = self.client.list_volumes(resource=['gold', 'bronze'])
+        self.assertEqual([vol.wwn for vol in vols], ['WWN1', 'WWN2'])
+
+
+class TestsSCBEClientStreamVolumes(unittest.TestCase):
+    """
+    Unit testing for the streaming volume listing
+    """
+    # pylint: disable=W0212
+
+    def setUp(self):
+        self.server = FakeSCBEServer().start()
+        self.addCleanup(self.server.stop)
+        self.server.collections['volumes'] = \
+            json.loads(FAKE_VOL_CONTENT) + [
+                dict(_fake_vol('WWN1', '1'), name='other_vol'),
+                _fake_vol('WWN2', '1'),
+            ]
+        with patch(_RESTCLIENT_PATH):
+            self.client = IBMSCBEClientAPI(FAKE_MNG_INFO)
+        self.client._client = RestClient(
+            FAKE_MNG_INFO, self.server.base_url,
+            ibm_scbe_client.URL_SCBE_RESOURCE_GET_AUTH)
+
+    def test_list_volumes_with_name_prefix(self):
+        vols = self.client.list_volumes(name_prefix='f_')
+        self.assertEqual(
+            [vol.wwn for vol in vols],
+            ['6001738CFC9035E8000000000001348E', 'WWN2'])
+        self.assertEqual(vols[0], VolInfo(
+            'f_manual_vol', 10000000000, 'd55718f00053',
+            '6001738CFC9035E8000000000001348E'))
+
+    def test_vol_records_keep_only_used_fields(self):
+        records = list(self.client._vol_records(
+            scsi_identifier='6001738CFC9035E8000000000001348E'))
+        self.assertEqual(len(records), 1)
+        self.assertEqual(
+            set(records[0]), set(ibm_scbe_client.SCBE_VOLUME_FIELDS))
+
+    def test_get_stream_bad_status(self):
+        with self.assertRaises(RestClientException):
+            self.client._client.get_stream('/unknown')
+
+
+class TestsSCBEClientPagination(unittest.TestCase):
+    """
+    Unit testing for fetching the collections page by page
+    """
+    # pylint: disable=W0212
+
+    def _get_client(self, page_size=5, **server_kwargs):
+        self.server = FakeSCBEServer(**server_kwargs).start()
+        self.addCleanup(self.server.stop)
+        self.server.collections['volumes'] = [
+            _fake_vol('WWN{:02}'.format(i), '1') for i in range(12)]
+        self.server.collections['hosts'] = [
+            dict(id=i, name='host{}'.format(i), array='a') for i in range(7)]
+        con_info = ConnectionInfo(
+            username='', password='', verify_ssl=False,
+            management_ip='', debug_level=FAKE_MNG_LOG_LEVEL,
+            options={
+                CONF_PARAM_PAGE_SIZE: page_size,
+                CONF_PARAM_MAX_CONCURRENT_REQUESTS: 2,
+            },
+        )
+        with patch(_RESTCLIENT_PATH):
+            client = IBMSCBEClientAPI(con_info)
+        client._client = RestClient(
+            con_info, self.server.base_url,
+            ibm_scbe_client.URL_SCBE_RESOURCE_GET_AUTH)
+        return client
+
+    def _volume_requests(self):
+        return [dict(params) for action, path, params in self.server.requests
+                if action == 'GET' and path.endswith('/volumes')]
+
+    def _assert_all_volumes(self, client):
+        self.assertEqual(
+            [vol.wwn for vol in client.list_volumes()],
+            ['WWN{:02}'.format(i) for i in range(12)])
+
+    def test_offset_pagination(self):
+        client = self._get_client(pagination='offset')
+        self._assert_all_volumes(client)
+        self.assertEqual(
+            sorted(int(params['offset'])
+                   for params in self._volume_requests()),
+            [0, 5, 10])
+
+    def test_server_page_size_limit(self):
+        client = self._get_client(pagination='offset', max_page_size=3)
+        self._assert_all_volumes(client)
+        self.assertEqual(len(self._volume_requests()), 4)
+        self.assertTrue(all(params['limit'] == '3'
+                            for params in self._volume_requests()[1:]))
+
+    def test_cursor_pagination(self):
+        client = self._get_client(pagination='cursor')
+        self._assert_all_volumes(client)
+        self.assertEqual(len(self._volume_requests()), 3)
+
+    def test_server_without_pagination(self):
+        client = self._get_client()
+        self._assert_all_volumes(client)
+        self.assertEqual(len(self._volume_requests()), 1)
+
+    def test_pagination_disabled(self):
+        client = self._get_client(page_size=0, pagination='offset')
+        self._assert_all_volumes(client)
+        self.assertEqual(self._volume_requests(), [{}])
+
+    def test_other_collections_and_stream(self):
+        client = self._get_client(pagination='offset', max_page_size=2)
+        self.assertEqual(sorted(client.get_hosts()), range(7))
+        self.assertEqual(
+            len(client.list_volumes(name_prefix='f_', resource=['s'])), 0)
+        self.assertEqual(
+            len(client.list_volumes(name_prefix='f_')), 12)
+
+
+class TestsSCBEClientQueryPushdown(unittest.TestCase):
+    """
+    Unit testing for sending the volume filters and fields to SCBE
+    """
+    # pylint: disable=W0212
+
+    def setUp(self):
+        self.server = FakeSCBEServer().start()
+        self.addCleanup(self.server.stop)
+        self.server.collections['volumes'] = \
+            json.loads(FAKE_VOL_CONTENT) + [
+                dict(_fake_vol('WWN1', '1'), name='f_vol_other'),
+                dict(_fake_vol('WWN2', '1'), name='f_vol_cluster'),
+                dict(_fake_vol('WWN3', '1'), name='vol_cluster'),
+            ]
+        self.client = self._get_client(
+            {CONF_PARAM_VOLUME_QUERY_PUSHDOWN: True})
+
+    def _get_client(self, options):
+        con_info = ConnectionInfo(
+            username='', password='', verify_ssl=False,
+            management_ip='', debug_level=FAKE_MNG_LOG_LEVEL,
+            options=options)
+        with patch(_RESTCLIENT_PATH):
+            client = IBMSCBEClientAPI(con_info)
+        client._client = RestClient(
+            con_info, self.server.base_url,
+            ibm_scbe_client.URL_SCBE_RESOURCE_GET_AUTH)
+        return client
+
+    def _list(self):
+        return [vol.wwn for vol in self.client.list_volumes(
+            name_prefix='f_', name_suffix='_cluster')]
+
+    def test_filters_and_fields_are_pushed(self):
+        self.assertEqual(self._list(), ['WWN2'])
+        params = dict(self.server.requests[-1][2])
+        self.assertEqual(params[ibm_scbe_client.SCBE_NAME_PREFIX_PARAM], 'f_')
+        self.assertEqual(
+            params[ibm_scbe_client.SCBE_NAME_SUFFIX_PARAM], '_cluster')
+        self.assertEqual(
+            params[ibm_scbe_client.SCBE_FIELDS_PARAM].split(','),
+            list(ibm_scbe_client.SCBE_VOLUME_FIELDS))
+
+    def test_filters_not_supported(self):
+        self.server.supported_filters = ()
+        self.assertEqual(self._list(), ['WWN2'])
+
+    def test_not_pushed_by_default(self):
+        self.client = self._get_client({})
+        self.assertEqual(self._list(), ['WWN2'])
+        params = dict(self.server.requests[-1][2])
+        for param in (ibm_scbe_client.SCBE_NAME_PREFIX_PARAM,
+                      ibm_scbe_client.SCBE_NAME_SUFFIX_PARAM,
+                      ibm_scbe_client.SCBE_FIELDS_PARAM):
+            self.assertNotIn(param, params)
+
+
+class TestsSCBEClientScopedJoin(unittest.TestCase):
+    """
+    Unit testing for getting the mappings and hosts of given volumes
+    """
+    # pylint: disable=W0212
+
+    def setUp(self):
+        self.server = FakeSCBEServer().start()
+        self.addCleanup(self.server.stop)
+        self.server.collections['mappings'] = [
+            dict(volume='WWN{}'.format(i), host=i % 3) for i in range(10)]
+        self.server.collections['hosts'] = [
+            dict(id=i, name='host{}'.format(i), array='a') for i in range(5)]
+        self.client = self._get_client(
+            {CONF_PARAM_VOLUME_QUERY_PUSHDOWN: True})
+
+    def _get_client(self, options):
+        con_info = ConnectionInfo(
+            username='', password='', verify_ssl=False,
+            management_ip='', debug_level=FAKE_MNG_LOG_LEVEL,
+            options=options)
+        with patch(_RESTCLIENT_PATH):
+            client = IBMSCBEClientAPI(con_info)
+        client._client = RestClient(
+            con_info, self.server.base_url,
+            ibm_scbe_client.URL_SCBE_RESOURCE_GET_AUTH)
+        self.addCleanup(client._client.close)
+        return client
+
+    def _requests(self, collection):
+        return [dict(params) for action, path, params in self.server.requests
+                if action == 'GET' and path.endswith(collection)]
+
+    @patch('ibm_storage_flocker_driver.lib.ibm_scbe_client.QUERY_BATCH_SIZE',
+           2)
+    def test_get_vols_mapping_of_wwns_in_batches(self):
+        self.assertEqual(
+            self.client.get_vols_mapping(wwns=['WWN1', 'WWN2', 'WWN4']),
+            dict(WWN1=1, WWN2=2, WWN4=1))
+        self.assertEqual(
+            sorted(params[ibm_scbe_client.SCBE_MAPPING_VOLUME_IN_PARAM]
+                   for params in self._requests('/mappings')),
+            ['WWN1,WWN2', 'WWN4'])
+
+    def test_get_vols_mapping_filter_not_supported(self):
+        self.server.supported_filters = ()
+        self.assertEqual(
+            self.client.get_vols_mapping(wwns=['WWN1', 'WWN99']),
+            dict(WWN1=1))
+
+    def test_get_hosts_of_ids(self):
+        self.assertEqual(self.client.get_hosts(host_ids=[1, 3]),
+                         {1: 'host1', 3: 'host3'})
+        self.assertEqual(
+            self._requests('/hosts'),
+            [{ibm_scbe_client.SCBE_HOST_ID_IN_PARAM: '1,3'}])
+
+        # Known hosts are served by the host directory
+        self.assertEqual(self.client.get_hosts(host_ids=[1, 4]),
+                         {1: 'host1', 4: 'host4'})
+        self.assertEqual(
+            self._requests('/hosts')[-1],
+            {ibm_scbe_client.SCBE_HOST_ID_IN_PARAM: '4'})
+
+    def test_get_hosts_filter_not_supported(self):
+        self.server.supported_filters = ()
+        self.assertEqual(self.client.get_hosts(host_ids=[2]), {2: 'host2'})
+
+    @patch('ibm_storage_flocker_driver.lib.ibm_scbe_client.QUERY_BATCH_SIZE',
+           2)
+    def test_not_scoped_by_default(self):
+        self.client = self._get_client({})
+        self.assertEqual(
+            self.client.get_vols_mapping(wwns=['WWN1', 'WWN2', 'WWN4']),
+            dict(WWN1=1, WWN2=2, WWN4=1))
+        self.assertEqual(self.client.get_hosts(host_ids=[1, 3]),
+                         {1: 'host1', 3: 'host3'})
+        # one whole collection each
+        self.assertEqual(self._requests('/mappings'), [{}])
+        self.assertEqual(self._requests('/hosts'), [{}])
+
+
+class TestsSCBEClientBatchedLookups(unittest.TestCase):
+    """
+    Unit testing for batching the per-volume and per-host lookups
+    """
+    # pylint: disable=W0212
+    VOLUMES = 50
+
+    def setUp(self):
+        self.server = FakeSCBEServer(delay=0.05).start()
+        self.addCleanup(self.server.stop)
+        self.wwns = ['WWN{:02}'.format(i) for i in range(self.VOLUMES)]
+        self.server.collections['volumes'] = [
+            _fake_vol(wwn, '1') for wwn in self.wwns]
+        self.server.collections['mappings'] = [
+            dict(id=i, volume=wwn, host=i % 3)
+            for i, wwn in enumerate(self.wwns)]
+        self.server.collections['hosts'] = [
+            dict(id=i, name='host{}'.format(i), array='a') for i in range(3)]
+        self.client = self._get_client(
+            {CONF_PARAM_VOLUME_QUERY_PUSHDOWN: True})
+
+    def _get_client(self, options):
+        con_info = ConnectionInfo(
+            username='', password='', verify_ssl=False,
+            management_ip='', debug_level=FAKE_MNG_LOG_LEVEL,
+            options=options)
+        with patch(_RESTCLIENT_PATH):
+            client = IBMSCBEClientAPI(con_info)
+        client._client = RestClient(
+            con_info, self.server.base_url,
+            ibm_scbe_client.URL_SCBE_RESOURCE_GET_AUTH)
+        self.addCleanup(client._client.close)
+        return client
+
+    def _requests(self, resource):
+        return [dict(params) for action, path, params in self.server.requests
+                if action == 'GET' and resource in path]
+
+    def _burst(self, func):
+        return run_concurrently(
+            [lambda wwn=wwn: func(wwn) for wwn in self.wwns],
+            max_workers=self.VOLUMES)
+
+    def test_single_lookup_not_batched(self):
+        self.assertEqual(self.client.get_vol_mapping('WWN04'), 'host1')
+        self.assertEqual(self._requests('/mappings'), [dict(volume='WWN04')])
+        self.assertEqual(self._requests('/hosts'), [{}])  # GET /hosts/1
+
+    def test_get_vol_mapping_burst(self):
+        self.assertEqual(
+            self._burst(self.client.get_vol_mapping),
+            ['host{}'.format(i % 3) for i in range(self.VOLUMES)])
+        # the first lookup is sent alone, the others queue up behind it
+        self.assertLessEqual(len(self._requests('/mappings')), 3)
+        self.assertLessEqual(len(self._requests('/hosts')), 3)
+        stats = self.client.batch_stats()['mappings']
+        self.assertEqual(stats['loads'], self.VOLUMES)
+        self.assertLessEqual(stats['batches'], 3)
+
+    def test_list_volumes_by_wwn_burst(self):
+        vols = self._burst(lambda wwn: self.client.list_volumes(wwn=wwn))
+        self.assertEqual([vol.wwn for vol, in vols], self.wwns)
+        self.assertLessEqual(len(self._requests('/volumes')), 3)
+
+    def test_batch_ignores_other_records(self):
+        self.server.supported_filters = ()
+        self.assertEqual(
+            self.client._mappings_by_wwn(['WWN01', 'WWN02', 'WWN99']),
+            dict(WWN01=[self.server.collections['mappings'][1]],
+                 WWN02=[self.server.collections['mappings'][2]],
+                 WWN99=[]))
+        self.assertEqual(self.client._hosts_by_id([1, 7]),
+                         {1: self.server.collections['hosts'][1], 7: None})
+
+    def test_not_batched_by_default(self):
+        self.client = self._get_client({})
+        self.assertEqual(
+            self._burst(self.client.get_vol_mapping),
+            ['host{}'.format(i % 3) for i in range(self.VOLUMES)])
+        vols = self._burst(lambda wwn: self.client.list_volumes(wwn=wwn))
+        self.assertEqual([vol.wwn for vol, in vols], self.wwns)
+        for resource in ('/volumes', '/mappings', '/hosts'):
+            for params in self._requests(resource):
+                self.assertFalse(
+                    [param for param in params if param.endswith('__in')])
+        self.assertEqual(len(self._requests('/mappings')), self.VOLUMES)
+
+    def test_batch_window(self):
+        self.client._mapping_loader._window = 0.2
+        start = time.time()
+        self._burst(self.client._vol_mapping_list)
+        self.assertEqual(len(self._requests('/mappings')), 1)
+        self.assertGreaterEqual(time.time() - start, 0.2)
@@ -14,8 +14,10 @@
 # limitations under the License.
 ##############################################################################
 
+import time
 import unittest
 import socket
+from functools import partial
 from uuid import UUID
 from mock import patch, MagicMock, Mock
 from flocker.node.agents.blockdevice import (
@@ -33,14 +35,54 @@ from ibm_storage_flocker_driver.lib.abstract_client import (
     BackendAPIClientFactory,
     IBMDriverNoClientModuleFound,
     VolInfo,
-    ConnectionInfo
+    ConnectionInfo,
+    ExceptionStorageClient,
+    UnknownVolumeError,
+    VolumeAlreadyMappedError,
+    VolumeNotMappedError,
 )
 from ibm_storage_flocker_driver.lib.constants import (
     DEFAULT_DEBUG_LEVEL,
     CONF_PARAM_DEFAULT_SERVICE,
     CONF_PARAM_HOSTNAME,
+    CONF_PARAM_REFRESH_INTERVAL,
+    CONF_PARAM_INCREMENTAL_SYNC,
+    CONF_PARAM_FULL_SYNC_INTERVAL,
+    CONF_PARAM_PAGE_SIZE,
+    CONF_PARAM_MAX_CONCURRENT_REQUESTS,
+    CONF_PARAM_VOLUME_QUERY_PUSHDOWN,
+    CONF_PARAM_TOKEN_LIFETIME,
+    CONF_PARAM_TOKEN_CACHE_DIR,
+    CONF_PARAM_CONNECTION_POOLS,
+    CONF_PARAM_MAX_CONNECTIONS_PER_HOST,
+    CONF_PARAM_KEEP_ALIVE,
+    CONF_PARAM_IDLE_CONNECTION_TIMEOUT,
+    CONF_PARAM_CONNECT_TIMEOUT,
+    CONF_PARAM_READ_TIMEOUT,
+    CONF_PARAM_ENDPOINT_READ_TIMEOUTS,
+    CONF_PARAM_OPERATION_TIMEOUT,
+    CONF_PARAM_MAX_RETRIES,
+    CONF_PARAM_RETRY_BACKOFF,
+    CONF_PARAM_CIRCUIT_BREAKER_THRESHOLD,
+    CONF_PARAM_CIRCUIT_BREAKER_RESET_TIMEOUT,
+    CONF_PARAM_COALESCE_REQUESTS,
+    CONF_PARAM_BATCH_WINDOW,
+    CONF_PARAM_OPTIMISTIC_ATTACH_DETACH,
+    CONF_PARAM_RESCAN_WINDOW,
+    CONF_PARAM_TARGETED_LUN_SCAN,
+    CONF_PARAM_USE_MULTIPATHD,
 )
-from ibm_storage_flocker_driver.lib import messages
+from ibm_storage_flocker_driver.lib import messages, deadline
+from ibm_storage_flocker_driver.lib.utils import run_concurrently
+from ibm_storage_flocker_driver.lib.multipathd import MultipathdClient
+from ibm_storage_flocker_driver.lib.ibm_scbe_client import (
+    IBMSCBEClientAPI,
+    RestClient,
+    URL_SCBE_RESOURCE_GET_AUTH,
+    SCBE_ERROR_VOLUME_ALREADY_MAPPED,
+    SCBE_ERROR_VOLUME_NOT_MAPPED,
+)
+from ibm_storage_flocker_driver.tests.fake_scbe_server import FakeSCBEServer
 
 # Constants for unit testing
 UUID1_STR = '737d4ea0-28bf-11e6-b12e-68f7288f1809'
@@ -454,12 +496,46 @@ class TestBlockDeviceAPIAttachDetach(unittest.TestCase):
             self.expacted_blockdevicevolume.set(attached_to=u'fake-host')
         self.driver_obj._get_volume = \
             MagicMock(return_value=self.expacted_blockdevicevolume)
-        self.driver_obj._clean_up_device_before_unmap = Mock()
+        self.driver_obj._clean_up_device_before_unmap = Mock(
+            return_value=None)
 
         self.assertEqual(
             None,
             self.driver_obj.detach_volume(unicode(UUID1_STR)))
 
+    def test_attach_detach_write_through_inventory(self):
+        vol_info = VolInfo(VOL_NAME, 10, 'vol-id', u'999')
+        self.driver_obj._inventory.put(vol_info, UUID(UUID1_STR))
+        self.driver_obj._clean_up_device_before_unmap = Mock(
+            return_value=None)
+
+        self.driver_obj.attach_volume(u'999', u'fake-host')
+        self.assertEqual(
+            self.driver_obj._get_volume(u'999').attached_to, u'fake-host')
+
+        self.driver_obj.detach_volume(u'999')
+        self.assertEqual(self.driver_obj._get_volume(u'999').attached_to, None)
+        self.assertFalse(self.mock_client.list_volumes.called)
+        self.assertFalse(self.mock_client.get_vol_mapping.called)
+
+    def test_attach_failure_invalidates_inventory_entry(self):
+        vol_info = VolInfo(VOL_NAME, 10, 'vol-id', u'999')
+        self.driver_obj._inventory.put(vol_info, UUID(UUID1_STR))
+        self.mock_client.map_volume.side_effect = Exception('map failed')
+
+        with self.assertRaises(Exception):
+            self.driver_obj.attach_volume(u'999', u'fake-host')
+        self.assertEqual(self.driver_obj._inventory.get(u'999'), None)
+        self.assertEqual(len(self.driver_obj._inventory.entries()), 1)
+
+    def test_destroy_volume_write_through_inventory(self):
+        vol_info = VolInfo(VOL_NAME, 10, 'vol-id', u'999')
+        self.driver_obj._inventory.put(vol_info, UUID(UUID1_STR))
+
+        self.driver_obj.destroy_volume(u'999')
+        self.mock_client.delete_volume.assert_called_once_with(u'999')
+        self.assertEqual(self.driver_obj._inventory.get(u'999'), None)
+
 
 WWN1 = '6001738CFC9035E80000000000014A81'
 WWN2 = '6001738CFC9035E80000000000014A82'
@@ -524,6 +600,55 @@ class TestBlockDeviceVolumeList(unittest.TestCase):
             self.driver_obj.list_volumes(),
             self.expected_list_volumes)
 
+    def test_list_volumes_lists_all_services(self):
+        self.driver_obj.list_volumes()
+        self.driver_obj._client.list_volumes.assert_called_once_with(
+            name_prefix=driver.VOL_NAME_FLOCKER_PREFIX,
+            name_suffix='_' + UUID1_SLUG)
+
+    def test_list_volumes_scoped_to_cluster_volumes(self):
+        self.driver_obj.list_volumes()
+        client = self.driver_obj._client
+        client.get_vols_mapping.assert_called_once_with(wwns=[WWN1, WWN2])
+        client.get_hosts.assert_called_once_with(host_ids={HOST_ID})
+
+    def test_list_volumes_without_mappings(self):
+        self.driver_obj._client.get_vols_mapping = MagicMock(return_value={})
+        self.driver_obj._client.get_hosts.reset_mock()
+        self.driver_obj.list_volumes()
+        self.assertFalse(self.driver_obj._client.get_hosts.called)
+
+    def test_list_volumes_populates_inventory(self):
+        # pylint: disable=W0212
+        self.driver_obj.list_volumes()
+        self.driver_obj._client.list_volumes.reset_mock()
+
+        self.assertEqual(
+            self.driver_obj._get_volume(unicode(WWN1)),
+            self.expected_list_volumes[0])
+        self.assertEqual(
+            self.driver_obj._get_volume_object(unicode(WWN2)),
+            self.list_volumes_fake[1])
+        self.assertFalse(self.driver_obj._client.list_volumes.called)
+
+    def test_list_volumes_keeps_write_through(self):
+        # pylint: disable=W0212
+        self.driver_obj.list_volumes()
+
+        def get_vols_mapping(wwns):  # pylint: disable=unused-argument
+            # a detach writes through while the volumes are listed
+            self.driver_obj._inventory.set_attached(WWN1, None)
+            return self.get_vols_mapping_fake
+        self.driver_obj._client.get_vols_mapping = MagicMock(
+            side_effect=get_vols_mapping)
+
+        self.driver_obj.list_volumes()
+        self.driver_obj._client.list_volumes.reset_mock()
+        self.assertEqual(
+            self.driver_obj._get_volume(unicode(WWN1)),
+            self.expected_list_volumes[0].set(attached_to=None))
+        self.assertFalse(self.driver_obj._client.list_volumes.called)
+
     def test_list_volumes_with_one_not_attached(self):
         self.get_vols_mapping_fake.pop(WWN2)
         # update the attached_to=None
@@ -573,6 +698,551 @@ class TestBlockDeviceVolumeList(unittest.TestCase):
             self.expected_list_volumes)
 
 
+REFRESHER_START = 'ibm_storage_flocker_driver.lib.inventory.' \
+                  'InventoryRefresher.start'
+
+
+class TestBlockDeviceInventoryRefresher(unittest.TestCase):
+    """
+    Unit testing for IBMStorageBlockDeviceAPI list_volumes with the
+    background inventory refresher.
+    """
+    # pylint: disable=W0212
+
+    def setUp(self):
+        self.mock_client = MagicMock()
+        self.mock_client.con_info = CONF_INFO_MOCK
+        self.mock_client.backend_type = messages.SCBE_STRING
+        self.mock_client.list_volumes = MagicMock(return_value=[
+            VolInfo('f_{}_{}'.format(UUID1_STR, UUID1_SLUG),
+                    WWN1_SIZE, '28d4e218f01647', WWN1),
+        ])
+        self.mock_client.get_vols_mapping = MagicMock(return_value={})
+        self.mock_client.get_hosts = MagicMock(return_value={})
+
+        conf = DRIVER_BASIC_CONF.copy()
+        conf[CONF_PARAM_REFRESH_INTERVAL] = 5
+        with patch(REFRESHER_START):
+            self.driver_obj = driver.IBMStorageBlockDeviceAPI(
+                UUID1, self.mock_client, conf)
+        self.driver_obj._host_ops.rescan_scsi = MagicMock()
+        self.expected_volume = BlockDeviceVolume(
+            blockdevice_id=unicode(WWN1),
+            size=int(WWN1_SIZE),
+            attached_to=None,
+            dataset_id=UUID(UUID1_STR)
+        )
+
+    def test_list_volumes_served_from_inventory(self):
+        self.assertEqual(
+            self.driver_obj.list_volumes(), [self.expected_volume])
+        self.assertEqual(self.mock_client.list_volumes.call_count, 1)
+
+        self.assertEqual(
+            self.driver_obj.list_volumes(), [self.expected_volume])
+        self.assertEqual(self.mock_client.list_volumes.call_count, 1)
+        self.assertEqual(
+            self.driver_obj.inventory_refresh_stats()['refreshes'], 1)
+
+    def test_list_volumes_serves_stale_when_backend_fails(self):
+        self.driver_obj.list_volumes()
+        self.mock_client.list_volumes.side_effect = Exception('SCBE down')
+        with self.assertRaises(Exception):
+            self.driver_obj._refresher.refresh()
+
+        self.assertEqual(
+            self.driver_obj.list_volumes(), [self.expected_volume])
+        self.assertEqual(
+            self.driver_obj.inventory_refresh_stats()['failures'], 1)
+
+    def test_list_volumes_shows_write_through(self):
+        self.driver_obj.list_volumes()
+        self.driver_obj.attach_volume(unicode(WWN1), u'fake-host')
+        self.assertEqual(
+            self.driver_obj.list_volumes(),
+            [self.expected_volume.set(attached_to=u'fake-host')])
+        self.assertEqual(self.mock_client.list_volumes.call_count, 1)
+
+    def test_refresh_keeps_write_through(self):
+        self.driver_obj.list_volumes()
+
+        def list_volumes_and_attach(*args, **kwargs):
+            self.driver_obj._inventory.set_attached(WWN1, u'fake-host')
+            return self.mock_client.list_volumes.return_value
+        self.mock_client.list_volumes.side_effect = list_volumes_and_attach
+
+        self.assertTrue(self.driver_obj._refresh_inventory())
+        self.assertEqual(
+            self.driver_obj.list_volumes(),
+            [self.expected_volume.set(attached_to=u'fake-host')])
+
+    def test_list_volumes_not_served_before_first_refresh(self):
+        # a write-through before any listing
+        self.driver_obj._inventory.put(
+            VolInfo('f_{}_{}'.format(UUID1_STR, UUID1_SLUG), WWN1_SIZE,
+                    '28d4e218f01648', WWN2), UUID1)
+        with patch.object(self.driver_obj._inventory, 'replace',
+                          MagicMock(return_value=False)):
+            self.assertEqual(
+                self.driver_obj.list_volumes(), [self.expected_volume])
+        self.assertEqual(self.driver_obj._refresher.last_success_at, None)
+
+
+class TestBlockDeviceOperationDeadline(unittest.TestCase):
+    """
+    Unit testing for the deadline of the IBlockDeviceAPI operations
+    """
+    # pylint: disable=W0212
+
+    def setUp(self):
+        self.mock_client = MagicMock()
+        self.mock_client.con_info = CONF_INFO_MOCK
+        self.mock_client.backend_type = messages.SCBE_STRING
+        self.mock_client.get_vols_mapping = MagicMock(return_value={})
+        self.mock_client.get_hosts = MagicMock(return_value={})
+        self.deadlines = []
+
+        def list_volumes(*args, **kwargs):
+            self.deadlines.append(deadline.current())
+            return []
+        self.mock_client.list_volumes = MagicMock(side_effect=list_volumes)
+
+        conf = DRIVER_BASIC_CONF.copy()
+        conf[CONF_PARAM_OPERATION_TIMEOUT] = 30
+        self.driver_obj = driver.IBMStorageBlockDeviceAPI(
+            UUID1, self.mock_client, conf)
+
+    def test_operation_runs_within_deadline(self):
+        self.driver_obj.list_volumes()
+
+        self.assertEqual(len(self.deadlines), 1)
+        self.assertEqual(self.deadlines[0].operation, 'list_volumes')
+        self.assertEqual(self.deadlines[0].budget, 30)
+        self.assertIsNone(deadline.current())
+
+    def test_operation_without_deadline(self):
+        self.driver_obj._operation_timeout = 0
+        self.driver_obj.list_volumes()
+        self.assertEqual(self.deadlines, [None])
+
+    def test_operation_fails_fast_after_deadline(self):
+        self.driver_obj._operation_timeout = 0.01
+
+        def list_volumes(*args, **kwargs):
+            time.sleep(0.02)
+            deadline.check()
+        self.mock_client.list_volumes.side_effect = list_volumes
+
+        self.assertRaises(deadline.DeadlineExceeded,
+                          self.driver_obj.destroy_volume, unicode(WWN1))
+
+
+class TestBlockDeviceOperationLookups(unittest.TestCase):
+    """
+    Unit testing for the REST calls of attach and detach, each operation
+    looks up the volume once (lookup scope)
+    """
+    # pylint: disable=W0212
+    driver_conf = DRIVER_BASIC_CONF
+
+    def setUp(self):
+        self.server = FakeSCBEServer().start()
+        self.addCleanup(self.server.stop)
+        self.server.collections['volumes'] = [dict(
+            scsi_identifier=WWN1, name=VOL_NAME, logical_capacity=WWN1_SIZE,
+            volume_id='vol-id', array='array1')]
+        self.server.collections['hosts'] = [
+            dict(id=HOST_ID, name=HOST, array='array1')]
+        con_info = ConnectionInfo(
+            username='fake', password='', verify_ssl=False,
+            management_ip='', debug_level=DEFAULT_DEBUG_LEVEL)
+        with patch('ibm_storage_flocker_driver.lib.ibm_scbe_client.'
+                   'RestClient'):
+            client = IBMSCBEClientAPI(con_info)
+        client._client = RestClient(con_info, self.server.base_url,
+                                    URL_SCBE_RESOURCE_GET_AUTH)
+        self.addCleanup(client._client.close)
+        client.preload_host(HOST)  # like the backend factory
+
+        with patch(IS_MULTIPATH_EXIST) as is_multipath_mock:
+            is_multipath_mock.return_value = True
+            self.driver_obj = driver.IBMStorageBlockDeviceAPI(
+                UUID1, client, self.driver_conf)
+        host_ops = self.driver_obj._host_ops
+        host_ops.rescan_scsi = MagicMock()
+        host_ops.clean_mp_device = MagicMock(return_value=['sdb', 'sdc'])
+        host_ops.delete_scsi_devices = MagicMock()
+        host_ops.get_multipath_device = MagicMock(
+            return_value=PREFIX_DEVICE_PATH + 'mpatha')
+        del self.server.requests[:]
+
+    def _requests(self, method):
+        return [path for action, path, _ in self.server.requests
+                if action == method]
+
+    def test_attach_rest_calls(self):
+        self.driver_obj.attach_volume(unicode(WWN1), unicode(HOST))
+
+        # the volume and its mapping, the host is preloaded
+        self.assertEqual(len(self._requests('GET')), 2)
+        self.assertEqual(len(self._requests('POST')), 1)
+
+    def test_detach_rest_calls(self):
+        self.server.collections['mappings'] = [
+            dict(id=1, volume=WWN1, host=HOST_ID)]
+
+        self.driver_obj.detach_volume(unicode(WWN1))
+
+        # get_device_path and unmap reuse the lookups of detach
+        self.assertEqual(len(self._requests('GET')), 2)
+        self.assertEqual(len(self._requests('DELETE')), 1)
+        self.driver_obj._host_ops.clean_mp_device.assert_called_once_with(
+            PREFIX_DEVICE_PATH + 'mpatha')
+        # only the paths of the volume are removed, no host rescan
+        self.driver_obj._host_ops.delete_scsi_devices.assert_called_once_with(
+            ['sdb', 'sdc'])
+        self.assertFalse(self.driver_obj._host_ops.rescan_scsi.called)
+
+    def test_detach_rescans_if_devices_not_removed(self):
+        self.server.collections['mappings'] = [
+            dict(id=1, volume=WWN1, host=HOST_ID)]
+        host_ops = self.driver_obj._host_ops
+        host_ops.delete_scsi_devices.side_effect = IOError('No such device')
+
+        self.driver_obj.detach_volume(unicode(WWN1))
+        host_ops.rescan_scsi.assert_called_once_with()
+
+    def test_detach_rescans_if_devices_unknown(self):
+        self.server.collections['mappings'] = [
+            dict(id=1, volume=WWN1, host=HOST_ID)]
+        host_ops = self.driver_obj._host_ops
+        host_ops.clean_mp_device.return_value = None
+
+        self.driver_obj.detach_volume(unicode(WWN1))
+        self.assertFalse(host_ops.delete_scsi_devices.called)
+        host_ops.rescan_scsi.assert_called_once_with()
+
+    def test_lookups_not_kept_after_operation(self):
+        self.assertRaises(UnattachedVolume, self.driver_obj.get_device_path,
+                          unicode(WWN1))
+        self.assertRaises(UnattachedVolume, self.driver_obj.get_device_path,
+                          unicode(WWN1))
+        self.assertEqual(len(self._requests('GET')), 4)
+
+
+class TestBlockDeviceOptimisticLookups(TestBlockDeviceOperationLookups):
+    """
+    Unit testing for the REST calls of optimistic attach and detach, the
+    mapping is looked up only if SCBE rejects the request
+    """
+    # pylint: disable=W0212
+    driver_conf = dict(DRIVER_BASIC_CONF)
+    driver_conf[CONF_PARAM_HOSTNAME] = HOST
+    driver_conf[CONF_PARAM_OPTIMISTIC_ATTACH_DETACH] = True
+
+    def test_attach_rest_calls(self):
+        volume = self.driver_obj.attach_volume(unicode(WWN1), unicode(HOST))
+
+        # only the volume, its mapping is not looked up
+        self.assertEqual(len(self._requests('GET')), 1)
+        self.assertEqual(len(self._requests('POST')), 1)
+        self.assertEqual(volume.attached_to, unicode(HOST))
+        self.assertEqual(volume.blockdevice_id, unicode(WWN1))
+
+    def test_attach_rejected_as_already_mapped(self):
+        self.server.inject_faults(
+            409, detail='Volume is already mapped.', method='POST',
+            error_code=SCBE_ERROR_VOLUME_ALREADY_MAPPED)
+
+        self.assertRaises(AlreadyAttachedVolume, self.driver_obj.attach_volume,
+                          unicode(WWN1), unicode(HOST))
+        self.assertEqual(len(self._requests('GET')), 1)
+
+    def test_detach_rest_calls(self):
+        self.server.collections['mappings'] = [
+            dict(id=1, volume=WWN1, host=HOST_ID)]
+
+        self.driver_obj.detach_volume(unicode(WWN1))
+
+        # the volume array of the host, no mapping lookup
+        self.assertEqual(len(self._requests('GET')), 1)
+        self.assertEqual(len(self._requests('DELETE')), 1)
+        self.driver_obj._host_ops.clean_mp_device.assert_called_once_with(
+            PREFIX_DEVICE_PATH + 'mpatha')
+
+    def test_detach_not_mapped_falls_back_to_lookup(self):
+        self.server.inject_faults(
+            404, detail='Mapping not found.', method='DELETE',
+            error_code=SCBE_ERROR_VOLUME_NOT_MAPPED)
+
+        self.assertRaises(UnattachedVolume, self.driver_obj.detach_volume,
+                          unicode(WWN1))
+        self.assertEqual(len(self._requests('DELETE')), 1)
+
+
+class TestBlockDeviceOptimisticAttachDetach(unittest.TestCase):
+    """
+    Unit testing for the error handling of optimistic attach and detach
+    """
+    # pylint: disable=W0212
+
+    def setUp(self):
+        self.client = MagicMock()
+        self.client.con_info.debug_level = DEFAULT_DEBUG_LEVEL
+        self.client.list_volumes = MagicMock(return_value=[VolInfo(
+            VOL_NAME, WWN1_SIZE, 'vol-id', WWN1)])
+        conf = dict(DRIVER_BASIC_CONF)
+        conf[CONF_PARAM_OPTIMISTIC_ATTACH_DETACH] = True
+        with patch(IS_MULTIPATH_EXIST) as is_multipath_mock:
+            is_multipath_mock.return_value = True
+            self.driver_obj = driver.IBMStorageBlockDeviceAPI(
+                UUID1, self.client, conf)
+        self.driver_obj._host_ops = MagicMock()
+        self.driver_obj._host_ops.get_multipath_device.side_effect = \
+            driver.host_actions.MultipathDeviceNotFound(WWN1)
+
+    def test_attach_without_mapping_lookup(self):
+        volume = self.driver_obj.attach_volume(unicode(WWN1), unicode(HOST))
+
+        self.client.map_volume.assert_called_once_with(
+            wwn=unicode(WWN1), host=unicode(HOST))
+        self.assertFalse(self.client.get_vol_mapping.called)
+        self.assertEqual(volume.attached_to, unicode(HOST))
+        self.assertEqual(volume.dataset_id, UUID1)
+
+    def test_attach_unknown_volume(self):
+        self.client.map_volume.side_effect = UnknownVolumeError(WWN1)
+        self.assertRaises(UnknownVolume, self.driver_obj.attach_volume,
+                          unicode(WWN1), unicode(HOST))
+
+    def test_attach_not_cluster_volume(self):
+        self.client.list_volumes.return_value = [VolInfo(
+            VOL_NAME_WITH_FAKE_CLUSTER_ID, WWN1_SIZE, 'vol-id', WWN1)]
+        self.assertRaises(UnknownVolume, self.driver_obj.attach_volume,
+                          unicode(WWN1), unicode(HOST))
+        self.assertFalse(self.client.map_volume.called)
+
+    def test_attach_already_mapped(self):
+        self.client.map_volume.side_effect = VolumeAlreadyMappedError(
+            WWN1, HOST)
+        self.assertRaises(AlreadyAttachedVolume, self.driver_obj.attach_volume,
+                          unicode(WWN1), unicode(HOST))
+
+    def test_attach_unknown_error_looks_up_mapping(self):
+        self.client.map_volume.side_effect = ExceptionStorageClient(
+            'rejected')
+        self.client.get_vol_mapping.return_value = HOST
+        self.assertRaises(AlreadyAttachedVolume, self.driver_obj.attach_volume,
+                          unicode(WWN1), unicode(HOST))
+
+        self.client.get_vol_mapping.return_value = None
+        self.assertRaises(ExceptionStorageClient,
+                          self.driver_obj.attach_volume,
+                          unicode(WWN1), unicode(HOST))
+
+    def test_detach_without_mapping_lookup(self):
+        self.driver_obj.detach_volume(unicode(WWN1))
+
+        self.client.unmap_volume.assert_called_once_with(
+            wwn=unicode(WWN1), host=self.driver_obj._instance_id)
+        self.assertFalse(self.client.get_vol_mapping.called)
+        self.assertFalse(self.driver_obj._host_ops.clean_mp_device.called)
+
+    def test_detach_cleans_local_device(self):
+        self.driver_obj._host_ops.get_multipath_device.side_effect = None
+        self.driver_obj._host_ops.get_multipath_device.return_value = \
+            PREFIX_DEVICE_PATH + 'mpatha'
+        self.driver_obj._host_ops.clean_mp_device.return_value = ['sdb']
+        self.driver_obj.detach_volume(unicode(WWN1))
+        self.driver_obj._host_ops.clean_mp_device.assert_called_once_with(
+            PREFIX_DEVICE_PATH + 'mpatha')
+        self.driver_obj._host_ops.delete_scsi_devices.assert_called_once_with(
+            ['sdb'])
+
+    def test_detach_not_cluster_volume(self):
+        self.client.list_volumes.return_value = [VolInfo(
+            VOL_NAME_WITH_FAKE_CLUSTER_ID, WWN1_SIZE, 'vol-id', WWN1)]
+        self.driver_obj._host_ops.get_multipath_device.side_effect = None
+        self.driver_obj._host_ops.get_multipath_device.return_value = \
+            PREFIX_DEVICE_PATH + 'mpatha'
+        self.assertRaises(UnknownVolume, self.driver_obj.detach_volume,
+                          unicode(WWN1))
+        self.assertFalse(self.client.unmap_volume.called)
+        self.assertFalse(self.driver_obj._host_ops.clean_mp_device.called)
+
+    def test_detach_unknown_volume(self):
+        self.client.unmap_volume.side_effect = UnknownVolumeError(WWN1)
+        self.assertRaises(UnknownVolume, self.driver_obj.detach_volume,
+                          unicode(WWN1))
+
+    def test_detach_mapped_to_other_host(self):
+        self.client.unmap_volume.side_effect = [
+            VolumeNotMappedError(WWN1, HOST), None]
+        self.client.get_vol_mapping.return_value = 'otherhost'
+        self.driver_obj._host_ops.get_multipath_device.side_effect = None
+        self.driver_obj._host_ops.get_multipath_device.return_value = \
+            PREFIX_DEVICE_PATH + 'mpatha'
+
+        self.driver_obj.detach_volume(unicode(WWN1))
+        self.client.unmap_volume.assert_called_with(
+            wwn=unicode(WWN1), host='otherhost')
+
+    def test_detach_unknown_error_looks_up_mapping(self):
+        self.client.unmap_volume.side_effect = ExceptionStorageClient(
+            'rejected')
+        self.client.get_vol_mapping.return_value = None
+        self.assertRaises(UnattachedVolume, self.driver_obj.detach_volume,
+                          unicode(WWN1))
+        self.assertEqual(self.client.unmap_volume.call_count, 1)
+
+    def test_detach_not_mapped(self):
+        self.client.unmap_volume.side_effect = VolumeNotMappedError(
+            WWN1, HOST)
+        self.client.get_vol_mapping.return_value = None
+        self.assertRaises(UnattachedVolume, self.driver_obj.detach_volume,
+                          unicode(WWN1))
+
+
+class TestBlockDeviceBatchAttachDetach(unittest.TestCase):
+    """
+    Unit testing for attach_volumes and detach_volumes, the host is
+    rescanned once per batch
+    """
+    # pylint: disable=W0212
+
+    def setUp(self):
+        self.wwns = [unicode(WWN1[:-1] + str(i)) for i in range(3)]
+        self.mappings = {}
+        self.client = MagicMock()
+        self.client.con_info.debug_level = DEFAULT_DEBUG_LEVEL
+        self.client.list_volumes.side_effect = self._list_volumes
+        self.client.get_vol_mapping.side_effect = self.mappings.get
+        # the batch calls them from several threads, and the lazy creation
+        # of a child mock is not thread-safe
+        self.client.map_volume = MagicMock()
+        self.client.unmap_volume = MagicMock()
+        with patch(IS_MULTIPATH_EXIST) as is_multipath_mock:
+            is_multipath_mock.return_value = False
+            self.driver_obj = driver.IBMStorageBlockDeviceAPI(
+                UUID1, self.client, DRIVER_BASIC_CONF)
+        self.driver_obj._host_ops = MagicMock()
+        self.driver_obj._host_ops.get_multipath_device = MagicMock()
+        self.driver_obj._host_ops.clean_mp_device = MagicMock()
+
+    def _list_volumes(self, wwn=None, **kwargs):
+        # pylint: disable=unused-argument
+        if wwn not in self.wwns:
+            return []
+        return [VolInfo(VOL_NAME, WWN1_SIZE, 'vol-id', wwn)]
+
+    def test_attach_volumes(self):
+        results = self.driver_obj.attach_volumes(
+            [(wwn, unicode(HOST)) for wwn in self.wwns])
+
+        self.assertEqual([volume.blockdevice_id for volume in results],
+                         self.wwns)
+        self.assertEqual(set(volume.attached_to for volume in results),
+                         {unicode(HOST)})
+        self.assertEqual(self.client.map_volume.call_count, 3)
+        self.driver_obj._host_ops.rescan_scsi.assert_called_once_with()
+
+    def test_attach_volumes_reports_each_failure(self):
+        self.mappings[self.wwns[1]] = 'otherhost'
+        results = self.driver_obj.attach_volumes(
+            [(wwn, unicode(HOST)) for wwn in self.wwns + [u'unknown']])
+
+        self.assertEqual(results[0].blockdevice_id, self.wwns[0])
+        self.assertIsInstance(results[1], AlreadyAttachedVolume)
+        self.assertEqual(results[2].blockdevice_id, self.wwns[2])
+        self.assertIsInstance(results[3], UnknownVolume)
+        self.assertEqual(self.client.map_volume.call_count, 2)
+        self.driver_obj._host_ops.rescan_scsi.assert_called_once_with()
+
+    def test_attach_volumes_all_failed_no_rescan(self):
+        results = self.driver_obj.attach_volumes([(u'unknown', HOST)])
+        self.assertIsInstance(results[0], UnknownVolume)
+        self.assertFalse(self.driver_obj._host_ops.rescan_scsi.called)
+
+    def test_detach_volumes(self):
+        for wwn in self.wwns[:2]:
+            self.mappings[wwn] = HOST
+        results = self.driver_obj.detach_volumes(self.wwns)
+
+        self.assertEqual(results[:2], [None, None])
+        self.assertIsInstance(results[2], UnattachedVolume)
+        self.assertEqual(self.client.unmap_volume.call_count, 2)
+        self.driver_obj._host_ops.rescan_scsi.assert_called_once_with()
+
+    def test_detach_volumes_remove_devices_once(self):
+        for wwn in self.wwns:
+            self.mappings[wwn] = HOST
+        host_ops = self.driver_obj._host_ops
+        host_ops.get_multipath_device.side_effect = \
+            lambda vol_wwn: PREFIX_DEVICE_PATH + vol_wwn
+        host_ops.clean_mp_device.side_effect = \
+            lambda path: [path[-1] + 'a', path[-1] + 'b']
+        self.driver_obj._is_multipathing = True
+
+        self.driver_obj.detach_volumes(self.wwns)
+
+        host_ops.delete_scsi_devices.assert_called_once_with(
+            ['0a', '0b', '1a', '1b', '2a', '2b'])
+        self.assertFalse(host_ops.rescan_scsi.called)
+
+    def _enable_lun_scan(self):
+        self.driver_obj._targeted_lun_scan = True
+        self.driver_obj._instance_id = unicode(HOST)
+        self.client.map_volume.side_effect = \
+            lambda wwn, host: self.wwns.index(wwn) + 1
+
+    def test_attach_scans_lun(self):
+        self._enable_lun_scan()
+        self.driver_obj.attach_volume(self.wwns[1], unicode(HOST))
+
+        self.driver_obj._host_ops.discover_luns.assert_called_once_with(
+            [2], [self.wwns[1]])
+        self.assertFalse(self.driver_obj._host_ops.rescan_scsi.called)
+
+    def test_attach_volumes_scan_luns_once(self):
+        self._enable_lun_scan()
+        self.driver_obj.attach_volumes(
+            [(wwn, unicode(HOST)) for wwn in self.wwns])
+
+        self.assertEqual(
+            self.driver_obj._host_ops.discover_luns.call_count, 1)
+        luns, wwns = self.driver_obj._host_ops.discover_luns.call_args[0]
+        self.assertEqual(sorted(zip(luns, wwns)),
+                         [(1, self.wwns[0]), (2, self.wwns[1]),
+                          (3, self.wwns[2])])
+
+    def test_attach_without_lun_rescans_host(self):
+        self._enable_lun_scan()
+        self.client.map_volume.side_effect = None
+        self.client.map_volume.return_value = None
+        self.driver_obj.attach_volume(self.wwns[0], unicode(HOST))
+
+        self.driver_obj._host_ops.rescan_scsi.assert_called_once_with()
+        self.assertFalse(self.driver_obj._host_ops.discover_luns.called)
+
+    def test_attach_to_other_node_rescans_host(self):
+        self._enable_lun_scan()
+        self.driver_obj.attach_volume(self.wwns[0], u'otherhost')
+        self.driver_obj._host_ops.rescan_scsi.assert_called_once_with()
+
+    def test_concurrent_attach_share_rescan(self):
+        def rescan_scsi():
+            time.sleep(0.1)
+        self.driver_obj._host_ops.rescan_scsi.side_effect = rescan_scsi
+        run_concurrently(
+            [partial(self.driver_obj.attach_volume, wwn, unicode(HOST))
+             for wwn in self.wwns], max_workers=3)
+
+        # the first rescan, and one rescan for the attaches made during it
+        self.assertLessEqual(
+            self.driver_obj._host_ops.rescan_scsi.call_count, 2)
+        self.assertEqual(self.driver_obj.rescan_stats()['requests'], 3)
+
+
 class TestBlockDeviceVerifyDefaultService(unittest.TestCase):
     """
     Unit testing for IBMStorageBlockDeviceAPI focus on default service.
@@ -666,6 +1336,202 @@ class TestBlockDeviceConfigurationFile(unittest.TestCase):
         )
         self.assertEqual(connection_info, expected)
 
+    def test_get_connection_info_from_conf_with_incremental_sync(self):
+        self.conf_dict[CONF_PARAM_INCREMENTAL_SYNC] = True
+        self.conf_dict[CONF_PARAM_FULL_SYNC_INTERVAL] = 120
+
+        connection_info = driver.get_connection_info_from_conf(self.conf_dict)
+        self.assertEqual(connection_info.options, {
+            CONF_PARAM_INCREMENTAL_SYNC: True,
+            CONF_PARAM_FULL_SYNC_INTERVAL: 120,
+        })
+
+    def test_get_connection_info_from_conf_with_wrong_sync_options(self):
+        for param, value in ((CONF_PARAM_INCREMENTAL_SYNC, 'yes'),
+                             (CONF_PARAM_FULL_SYNC_INTERVAL, -1)):
+            conf_dict = dict(self.conf_dict)
+            conf_dict[param] = value
+            self.assertRaises(
+                driver.YMLFileWrongValue,
+                driver.get_connection_info_from_conf,
+                conf_dict,
+            )
+
+    def test_get_connection_info_from_conf_with_pagination(self):
+        self.conf_dict[CONF_PARAM_PAGE_SIZE] = 500
+        self.conf_dict[CONF_PARAM_MAX_CONCURRENT_REQUESTS] = 2
+
+        connection_info = driver.get_connection_info_from_conf(self.conf_dict)
+        self.assertEqual(connection_info.options, {
+            CONF_PARAM_PAGE_SIZE: 500,
+            CONF_PARAM_MAX_CONCURRENT_REQUESTS: 2,
+        })
+
+    def test_get_connection_info_from_conf_with_wrong_pagination(self):
+        for param, value in ((CONF_PARAM_PAGE_SIZE, -1),
+                             (CONF_PARAM_PAGE_SIZE, 1.5),
+                             (CONF_PARAM_MAX_CONCURRENT_REQUESTS, 0)):
+            conf_dict = dict(self.conf_dict)
+            conf_dict[param] = value
+            self.assertRaises(
+                driver.YMLFileWrongValue,
+                driver.get_connection_info_from_conf,
+                conf_dict,
+            )
+
+    def test_get_connection_info_from_conf_with_query_pushdown(self):
+        self.conf_dict[CONF_PARAM_VOLUME_QUERY_PUSHDOWN] = True
+
+        connection_info = driver.get_connection_info_from_conf(self.conf_dict)
+        self.assertEqual(connection_info.options,
+                         {CONF_PARAM_VOLUME_QUERY_PUSHDOWN: True})
+
+        self.conf_dict[CONF_PARAM_VOLUME_QUERY_PUSHDOWN] = 'yes'
+        self.assertRaises(
+            driver.YMLFileWrongValue,
+            driver.get_connection_info_from_conf,
+            self.conf_dict,
+        )
+
+    def test_get_connection_info_from_conf_with_token_lifetime(self):
+        self.conf_dict[CONF_PARAM_TOKEN_LIFETIME] = 3600
+
+        connection_info = driver.get_connection_info_from_conf(self.conf_dict)
+        self.assertEqual(connection_info.options,
+                         {CONF_PARAM_TOKEN_LIFETIME: 3600})
+
+        self.conf_dict[CONF_PARAM_TOKEN_LIFETIME] = 'hour'
+        self.assertRaises(
+            driver.YMLFileWrongValue,
+            driver.get_connection_info_from_conf,
+            self.conf_dict,
+        )
+
+    def test_get_connection_info_from_conf_with_token_cache(self):
+        token_cache_dir = u'/var/lib/flocker/token'
+        self.conf_dict[CONF_PARAM_TOKEN_CACHE_DIR] = token_cache_dir
+
+        connection_info = driver.get_connection_info_from_conf(self.conf_dict)
+        self.assertEqual(connection_info.options,
+                         {CONF_PARAM_TOKEN_CACHE_DIR: token_cache_dir})
+
+        self.conf_dict[CONF_PARAM_TOKEN_CACHE_DIR] = True
+        self.assertRaises(
+            driver.YMLFileWrongValue,
+            driver.get_connection_info_from_conf,
+            self.conf_dict,
+        )
+
+    def test_get_connection_info_from_conf_with_connection_pool(self):
+        self.conf_dict[CONF_PARAM_CONNECTION_POOLS] = 2
+        self.conf_dict[CONF_PARAM_MAX_CONNECTIONS_PER_HOST] = 8
+        self.conf_dict[CONF_PARAM_KEEP_ALIVE] = False
+        self.conf_dict[CONF_PARAM_IDLE_CONNECTION_TIMEOUT] = 30
+
+        connection_info = driver.get_connection_info_from_conf(self.conf_dict)
+        self.assertEqual(connection_info.options, {
+            CONF_PARAM_CONNECTION_POOLS: 2,
+            CONF_PARAM_MAX_CONNECTIONS_PER_HOST: 8,
+            CONF_PARAM_KEEP_ALIVE: False,
+            CONF_PARAM_IDLE_CONNECTION_TIMEOUT: 30,
+        })
+
+    def test_get_connection_info_from_conf_with_wrong_connection_pool(self):
+        for param, value in ((CONF_PARAM_CONNECTION_POOLS, 0),
+                             (CONF_PARAM_MAX_CONNECTIONS_PER_HOST, 0),
+                             (CONF_PARAM_KEEP_ALIVE, 'yes'),
+                             (CONF_PARAM_IDLE_CONNECTION_TIMEOUT, -1)):
+            conf_dict = dict(self.conf_dict)
+            conf_dict[param] = value
+            self.assertRaises(
+                driver.YMLFileWrongValue,
+                driver.get_connection_info_from_conf,
+                conf_dict,
+            )
+
+    def test_get_connection_info_from_conf_with_timeouts(self):
+        self.conf_dict[CONF_PARAM_CONNECT_TIMEOUT] = 5
+        self.conf_dict[CONF_PARAM_READ_TIMEOUT] = 60
+        self.conf_dict[CONF_PARAM_ENDPOINT_READ_TIMEOUTS] = {u'volumes': 300}
+
+        connection_info = driver.get_connection_info_from_conf(self.conf_dict)
+        self.assertEqual(connection_info.options, {
+            CONF_PARAM_CONNECT_TIMEOUT: 5,
+            CONF_PARAM_READ_TIMEOUT: 60,
+            CONF_PARAM_ENDPOINT_READ_TIMEOUTS: {u'/volumes': 300},
+        })
+
+    def test_get_connection_info_from_conf_with_wrong_timeouts(self):
+        for param, value in ((CONF_PARAM_CONNECT_TIMEOUT, -1),
+                             (CONF_PARAM_READ_TIMEOUT, '60'),
+                             (CONF_PARAM_ENDPOINT_READ_TIMEOUTS, 300),
+                             (CONF_PARAM_ENDPOINT_READ_TIMEOUTS,
+                              {u'/volumes': -1})):
+            conf_dict = dict(self.conf_dict)
+            conf_dict[param] = value
+            self.assertRaises(
+                driver.YMLFileWrongValue,
+                driver.get_connection_info_from_conf,
+                conf_dict,
+            )
+
+    def test_get_connection_info_from_conf_with_retry(self):
+        self.conf_dict[CONF_PARAM_MAX_RETRIES] = 5
+        self.conf_dict[CONF_PARAM_RETRY_BACKOFF] = 0.2
+        self.conf_dict[CONF_PARAM_CIRCUIT_BREAKER_THRESHOLD] = 0
+        self.conf_dict[CONF_PARAM_CIRCUIT_BREAKER_RESET_TIMEOUT] = 60
+
+        connection_info = driver.get_connection_info_from_conf(self.conf_dict)
+        self.assertEqual(connection_info.options, {
+            CONF_PARAM_MAX_RETRIES: 5,
+            CONF_PARAM_RETRY_BACKOFF: 0.2,
+            CONF_PARAM_CIRCUIT_BREAKER_THRESHOLD: 0,
+            CONF_PARAM_CIRCUIT_BREAKER_RESET_TIMEOUT: 60,
+        })
+
+    def test_get_connection_info_from_conf_with_wrong_retry(self):
+        for param, value in ((CONF_PARAM_MAX_RETRIES, -1),
+                             (CONF_PARAM_MAX_RETRIES, 1.5),
+                             (CONF_PARAM_RETRY_BACKOFF, -1),
+                             (CONF_PARAM_CIRCUIT_BREAKER_THRESHOLD, 1.5),
+                             (CONF_PARAM_CIRCUIT_BREAKER_THRESHOLD, True),
+                             (CONF_PARAM_CIRCUIT_BREAKER_RESET_TIMEOUT, 'a')):
+            conf_dict = dict(self.conf_dict)
+            conf_dict[param] = value
+            self.assertRaises(
+                driver.YMLFileWrongValue,
+                driver.get_connection_info_from_conf,
+                conf_dict,
+            )
+
+    def test_get_connection_info_from_conf_with_coalesce_requests(self):
+        self.conf_dict[CONF_PARAM_COALESCE_REQUESTS] = False
+
+        connection_info = driver.get_connection_info_from_conf(self.conf_dict)
+        self.assertEqual(connection_info.options,
+                         {CONF_PARAM_COALESCE_REQUESTS: False})
+
+        self.conf_dict[CONF_PARAM_COALESCE_REQUESTS] = 'no'
+        self.assertRaises(
+            driver.YMLFileWrongValue,
+            driver.get_connection_info_from_conf,
+            self.conf_dict,
+        )
+
+    def test_get_connection_info_from_conf_with_batch_window(self):
+        self.conf_dict[CONF_PARAM_BATCH_WINDOW] = 0.01
+
+        connection_info = driver.get_connection_info_from_conf(self.conf_dict)
+        self.assertEqual(connection_info.options,
+                         {CONF_PARAM_BATCH_WINDOW: 0.01})
+
+        self.conf_dict[CONF_PARAM_BATCH_WINDOW] = -1
+        self.assertRaises(
+            driver.YMLFileWrongValue,
+            driver.get_connection_info_from_conf,
+            self.conf_dict,
+        )
+
     def test_get_connection_info_from_conf_with_wrong_debug(self):
         self.conf_dict[driver.CONF_PARAM_DEBUG] = '999'
 
@@ -719,6 +1585,116 @@ class TestBlockDeviceConfigurationFile(unittest.TestCase):
         self.assertEqual(api._instance_id, FAKE_HOSTNAME)
         self.assertEqual(type(api._instance_id), unicode)
 
+    def test_get_ibm_storage_backend_by_conf__wrong_refresh_interval(self):
+        self.conf_dict["default_service"] = 'bronze'
+        for interval in ('10', -1, True):
+            self.conf_dict[CONF_PARAM_REFRESH_INTERVAL] = interval
+            with patch(patch_factory), patch(patch_exists), \
+                    patch(PATH_HOSTACTION):
+                self.assertRaises(
+                    driver.YMLFileWrongValue,
+                    driver.get_ibm_storage_backend_by_conf,
+                    UUID1_STR,
+                    self.conf_dict,
+                )
+
+    def test_get_ibm_storage_backend_by_conf__operation_timeout(self):
+        self.conf_dict["default_service"] = 'bronze'
+        self.conf_dict[CONF_PARAM_OPERATION_TIMEOUT] = 300
+        with patch(patch_factory), patch(patch_exists), patch(PATH_HOSTACTION):
+            api = driver.get_ibm_storage_backend_by_conf(
+                UUID1_STR, self.conf_dict)
+        self.assertEqual(api._operation_timeout, 300)
+
+    def test_get_ibm_storage_backend_by_conf__optimistic(self):
+        self.conf_dict["default_service"] = 'bronze'
+        with patch(patch_factory), patch(patch_exists), patch(PATH_HOSTACTION):
+            api = driver.get_ibm_storage_backend_by_conf(
+                UUID1_STR, self.conf_dict)
+        self.assertFalse(api._optimistic_attach_detach)
+
+        self.conf_dict[CONF_PARAM_OPTIMISTIC_ATTACH_DETACH] = True
+        with patch(patch_factory), patch(patch_exists), patch(PATH_HOSTACTION):
+            api = driver.get_ibm_storage_backend_by_conf(
+                UUID1_STR, self.conf_dict)
+        self.assertTrue(api._optimistic_attach_detach)
+
+        self.conf_dict[CONF_PARAM_OPTIMISTIC_ATTACH_DETACH] = 'yes'
+        with patch(patch_factory), patch(patch_exists), patch(PATH_HOSTACTION):
+            self.assertRaises(
+                driver.YMLFileWrongValue,
+                driver.get_ibm_storage_backend_by_conf,
+                UUID1_STR,
+                self.conf_dict,
+            )
+
+    def test_get_ibm_storage_backend_by_conf__rescan_window(self):
+        self.conf_dict["default_service"] = 'bronze'
+        self.conf_dict[CONF_PARAM_RESCAN_WINDOW] = 0.5
+        with patch(patch_factory), patch(patch_exists), patch(PATH_HOSTACTION):
+            api = driver.get_ibm_storage_backend_by_conf(
+                UUID1_STR, self.conf_dict)
+        self.assertEqual(api._rescan_coalescer._loader._window, 0.5)
+
+        self.conf_dict[CONF_PARAM_RESCAN_WINDOW] = -1
+        with patch(patch_factory), patch(patch_exists), patch(PATH_HOSTACTION):
+            self.assertRaises(
+                driver.YMLFileWrongValue,
+                driver.get_ibm_storage_backend_by_conf,
+                UUID1_STR,
+                self.conf_dict,
+            )
+
+    def test_get_ibm_storage_backend_by_conf__targeted_lun_scan(self):
+        self.conf_dict["default_service"] = 'bronze'
+        self.conf_dict[CONF_PARAM_TARGETED_LUN_SCAN] = True
+        with patch(patch_factory), patch(patch_exists), patch(PATH_HOSTACTION):
+            api = driver.get_ibm_storage_backend_by_conf(
+                UUID1_STR, self.conf_dict)
+        self.assertTrue(api._targeted_lun_scan)
+
+        self.conf_dict[CONF_PARAM_TARGETED_LUN_SCAN] = 'yes'
+        with patch(patch_factory), patch(patch_exists), patch(PATH_HOSTACTION):
+            self.assertRaises(
+                driver.YMLFileWrongValue,
+                driver.get_ibm_storage_backend_by_conf,
+                UUID1_STR,
+                self.conf_dict,
+            )
+
+    def test_get_ibm_storage_backend_by_conf__use_multipathd(self):
+        self.conf_dict["default_service"] = 'bronze'
+        with patch(patch_factory), patch(patch_exists), \
+                patch(PATH_HOSTACTION) as host_actions_mock:
+            driver.get_ibm_storage_backend_by_conf(UUID1_STR, self.conf_dict)
+        self.assertIsNone(host_actions_mock.call_args[1]['multipathd'])
+
+        self.conf_dict[CONF_PARAM_USE_MULTIPATHD] = True
+        with patch(patch_factory), patch(patch_exists), \
+                patch(PATH_HOSTACTION) as host_actions_mock:
+            driver.get_ibm_storage_backend_by_conf(UUID1_STR, self.conf_dict)
+        self.assertIsInstance(host_actions_mock.call_args[1]['multipathd'],
+                              MultipathdClient)
+
+        self.conf_dict[CONF_PARAM_USE_MULTIPATHD] = 'yes'
+        with patch(patch_factory), patch(patch_exists), patch(PATH_HOSTACTION):
+            self.assertRaises(
+                driver.YMLFileWrongValue,
+                driver.get_ibm_storage_backend_by_conf,
+                UUID1_STR,
+                self.conf_dict,
+            )
+
+    def test_get_ibm_storage_backend_by_conf__preload_host(self):
+        self.conf_dict["default_service"] = 'bronze'
+        self.conf_dict[CONF_PARAM_HOSTNAME] = FAKE_HOSTNAME
+
+        with patch(patch_factory) as factory_mock, patch(patch_exists), \
+                patch(PATH_HOSTACTION):
+            driver.get_ibm_storage_backend_by_conf(UUID1_STR, self.conf_dict)
+        factory_mock.return_value.preload_host.assert_called_once_with(
+            FAKE_HOSTNAME)
+
 
 GET_TOKEN_FUNC = 'ibm_storage_flocker_driver.lib.' \
                  'ibm_scbe_client.RestClient._get_token'
@@ -0,0 +1,181 @@
+##############################################################################
+# Copyright 2016 IBM Corp.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##############################################################################
+
+import unittest
+import threading
+from uuid import UUID
+from mock import patch, MagicMock
+from ibm_storage_flocker_driver.lib.abstract_client import VolInfo
+from ibm_storage_flocker_driver.lib.inventory import (
+    VolumeInventory,
+    InventoryEntry,
+    InventoryRefresher,
+)
+
+TIME_PATH = 'ibm_storage_flocker_driver.lib.inventory.time.time'
+
+WWN1 = '6001738CFC9035E80000000000014A81'
+WWN2 = '6001738CFC9035E80000000000014A82'
+DATASET_ID1 = UUID('737d4ea0-28bf-11e6-b12e-68f7288f1809')
+DATASET_ID2 = UUID('737d4ea0-28bf-11e6-b12e-eeeeeeeeeeee')
+VOL1 = VolInfo('f_vol1', 1024, 'id1', WWN1)
+VOL2 = VolInfo('f_vol2', 2048, 'id2', WWN2)
+HOST = u'host1'
+
+
+class TestVolumeInventory(unittest.TestCase):
+    """
+    Unit testing for VolumeInventory
+    """
+
+    @patch(TIME_PATH)
+    def setUp(self, time_mock):
+        time_mock.return_value = 1000
+        self.inventory = VolumeInventory(max_age=10)
+        self.inventory.replace([
+            InventoryEntry(VOL1, DATASET_ID1, HOST),
+            InventoryEntry(VOL2, DATASET_ID2, None),
+        ])
+
+    @patch(TIME_PATH)
+    def test_get(self, time_mock):
+        time_mock.return_value = 1005
+        self.assertEqual(self.inventory.get(WWN1).vol_info, VOL1)
+        self.assertEqual(self.inventory.get(WWN2).dataset_id, DATASET_ID2)
+        self.assertEqual(self.inventory.get('unknown'), None)
+
+    @patch(TIME_PATH)
+    def test_freshness(self, time_mock):
+        time_mock.return_value = 1011
+        self.assertEqual(self.inventory.get(WWN1), None)
+        self.assertEqual(len(self.inventory.entries()), 2)
+
+    @patch(TIME_PATH)
+    def test_write_through(self, time_mock):
+        time_mock.return_value = 1005
+        self.inventory.set_attached(WWN1, None)
+        self.inventory.set_attached(WWN2, HOST)
+        self.assertEqual(self.inventory.get(WWN1).attached_to, None)
+        self.assertEqual(self.inventory.get(WWN2).attached_to, HOST)
+
+        self.inventory.remove(WWN2)
+        self.assertEqual(self.inventory.get(WWN2), None)
+        self.assertEqual([e.vol_info for e in self.inventory.entries()],
+                         [VOL1])
+
+    @patch(TIME_PATH)
+    def test_set_attached_refreshes_entry(self, time_mock):
+        time_mock.return_value = 1009
+        self.inventory.set_attached(WWN2, HOST)
+        time_mock.return_value = 1015
+        self.assertEqual(self.inventory.get(WWN1), None)
+        self.assertEqual(self.inventory.get(WWN2).attached_to, HOST)
+
+    def test_replace_replays_updates(self):
+        generation = self.inventory.generation
+        self.inventory.set_attached(WWN2, HOST)
+        self.inventory.remove(WWN1)
+        vol3 = VolInfo('f_vol3', 1024, 'id3', 'WWN3')
+        self.inventory.put(vol3, DATASET_ID1)
+        # listed before the updates
+        self.assertTrue(self.inventory.replace([
+            InventoryEntry(VOL1, DATASET_ID1, HOST),
+            InventoryEntry(VOL2, DATASET_ID2, None),
+        ], generation))
+        self.assertEqual(
+            [(e.vol_info, e.attached_to) for e in self.inventory.entries()],
+            [(VOL2, HOST), (vol3, None)])
+
+    def test_replace_ignores_older_updates(self):
+        self.inventory.set_attached(WWN2, HOST)
+        generation = self.inventory.generation
+        self.assertTrue(self.inventory.replace(
+            [InventoryEntry(VOL2, DATASET_ID2, None)], generation))
+        self.assertEqual(self.inventory.get(WWN2).attached_to, None)
+
+    def test_replace_dropped_if_updates_not_kept(self):
+        generation = self.inventory.generation
+        with patch.object(VolumeInventory, 'MAX_JOURNAL', 2):
+            for host in (HOST, None, HOST):
+                self.inventory.set_attached(WWN2, host)
+            self.assertFalse(self.inventory.replace([], generation))
+        self.assertEqual(len(self.inventory.entries()), 2)
+        self.assertTrue(
+            self.inventory.replace([], self.inventory.generation))
+        self.assertEqual(self.inventory.entries(), [])
+
+    @patch(TIME_PATH)
+    def test_invalidate(self, time_mock):
+        time_mock.return_value = 1005
+        self.inventory.invalidate(WWN1)
+        self.assertEqual(self.inventory.get(WWN1), None)
+        self.assertEqual(len(self.inventory.entries()), 2)
+
+
+class TestInventoryRefresher(unittest.TestCase):
+    """
+    Unit testing for InventoryRefresher
+    """
+
+    def test_refresh_stats(self):
+        refresher = InventoryRefresher(
+            MagicMock(return_value=True), interval=1, stale_after=3)
+        self.assertTrue(refresher.is_stale())
+        refresher.refresh()
+        stats = refresher.stats()
+        self.assertEqual(stats['refreshes'], 1)
+        self.assertEqual(stats['failures'], 0)
+        self.assertFalse(stats['stale'])
+        self.assertTrue(stats['duration'] >= 0)
+
+    def test_refresh_failure(self):
+        refresh_func = MagicMock(side_effect=[True, Exception('SCBE down')])
+        refresher = InventoryRefresher(refresh_func, interval=1, stale_after=3)
+        refresher.refresh()
+        with self.assertRaises(Exception):
+            refresher.refresh()
+        stats = refresher.stats()
+        self.assertEqual(stats['refreshes'], 1)
+        self.assertEqual(stats['failures'], 1)
+        self.assertEqual(stats['last_error'], 'SCBE down')
+        # the last successful refresh is kept
+        self.assertFalse(refresher.is_stale())
+
+    def test_refresh_dropped(self):
+        refresher = InventoryRefresher(
+            MagicMock(return_value=False), interval=1, stale_after=3)
+        refresher.refresh()
+        self.assertEqual(refresher.refreshes, 0)
+        self.assertEqual(refresher.last_success_at, None)
+        # the next refresh waits for the interval
+        self.assertFalse(refresher._wakeup.is_set())
+
+    def test_background_refresh(self):
+        refreshed = threading.Event()
+        calls = []
+
+        def refresh_func():
+            calls.append(1)
+            if len(calls) >= 2:
+                refreshed.set()
+            return True
+
+        refresher = InventoryRefresher(
+            refresh_func, interval=0.01, stale_after=1)
+        refresher.start()
+        self.addCleanup(refresher.stop)
+        refreshed.wait(5)
+        self.assertTrue(refreshed.is_set())
@@ -0,0 +1,85 @@
+##############################################################################
+# Copyright 2016 IBM Corp.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##############################################################################
+
+
+import unittest
+from ibm_storage_flocker_driver.lib import lookup_scope
+
+
+class FakeBackend(object):
+
+    def __init__(self):
+        self.lookups = []
+
+    @lookup_scope.memoized
+    def lookup(self, key, detail=False):
+        self.lookups.append((key, detail))
+        if key == 'missing':
+            raise KeyError(key)
+        return [key]
+
+    @lookup_scope.with_lookup_scope
+    def operation(self, key):
+        self.lookup(key)
+        return self.nested_operation(key)
+
+    @lookup_scope.with_lookup_scope
+    def nested_operation(self, key):
+        return self.lookup(key)
+
+
+class TestLookupScope(unittest.TestCase):
+    """
+    Unit testing for lookup_scope
+    """
+
+    def setUp(self):
+        self.backend = FakeBackend()
+
+    def test_not_memoized_out_of_scope(self):
+        self.backend.lookup('a')
+        self.backend.lookup('a')
+        self.assertEqual(len(self.backend.lookups), 2)
+
+    def test_memoized_in_scope(self):
+        with lookup_scope.lookup_scope():
+            self.assertEqual(self.backend.lookup('a'), ['a'])
+            self.assertEqual(self.backend.lookup('a'), ['a'])
+            self.backend.lookup('a', detail=True)
+            self.backend.lookup('b')
+        self.assertEqual(self.backend.lookups,
+                         [('a', False), ('a', True), ('b', False)])
+        self.assertIsNone(lookup_scope.current())
+
+    def test_nested_scope_shares_lookups(self):
+        self.backend.operation('a')
+        self.assertEqual(len(self.backend.lookups), 1)
+        self.backend.operation('a')  # a new operation looks up again
+        self.assertEqual(len(self.backend.lookups), 2)
+
+    def test_errors_not_memoized(self):
+        with lookup_scope.lookup_scope():
+            self.assertRaises(KeyError, self.backend.lookup, 'missing')
+            self.assertRaises(KeyError, self.backend.lookup, 'missing')
+        self.assertEqual(len(self.backend.lookups), 2)
+
+    def test_invalidate(self):
+        with lookup_scope.lookup_scope():
+            self.backend.lookup('a')
+            lookup_scope.invalidate()
+            self.backend.lookup('a')
+        self.assertEqual(len(self.backend.lookups), 2)
+        lookup_scope.invalidate()  # out of scope does nothing
@@ -0,0 +1,123 @@
+##############################################################################
+# Copyright 2016 IBM Corp.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##############################################################################
+
+
+import unittest
+from ibm_storage_flocker_driver.lib.multipath_topology import (
+    MultipathTopology,
+    MultipathPath,
+    iter_multipath_maps,
+    find_multipath_map,
+)
+
+MULTIPATH_LL = """\
+Oct 17 10:02:11 | sda: no FC path found
+200173800fdf50f86 dm-0 IBM     ,2810XIV
+size=16G features='1 queue_if_no_path' hwhandler='0' wp=rw
+`-+- policy='round-robin 0' prio=1 status=active
+  |- 3:0:0:1 sdb 8:16 active ready running
+  `- 4:0:0:1 sdc 8:32 active ready running
+mpathd (36001738cfc9035e80000000000013aff) dm-8 IBM     ,2810XIV
+size=75G features='1 queue_if_no_path' hwhandler='0' wp=rw
+`-+- policy='service-time 0' prio=1 status=enabled
+  |- 3:0:0:2 sdd 8:48 active ready running
+  `- #:#:#:# -   #:# failed faulty running
+36005076801d9053a180000000002ccd3 dm-1 IBM     ,2145
+size=1.0G features='1 queue_if_no_path' hwhandler='0' wp=rw
+|-+- policy='round-robin 0' prio=50 status=active
+| `- 5:0:0:0 sde 8:64 active ready running
+`-+- policy='round-robin 0' prio=10 status=enabled
+  `- 7:0:0:0 sdf 8:80 active ready running
+"""
+
+
+class CountingLines(object):
+    """
+    Iterable of lines that counts the lines read
+    """
+
+    def __init__(self, text):
+        self._lines = text.splitlines(True)
+        self.read = 0
+
+    def __iter__(self):
+        for line in self._lines:
+            self.read += 1
+            yield line
+
+
+class TestMultipathTopology(unittest.TestCase):
+    """
+    Unit testing for the multipath -ll parser
+    """
+
+    def test_iter_maps(self):
+        maps = list(iter_multipath_maps(MULTIPATH_LL.splitlines()))
+        self.assertEqual(
+            [(m.wwid, m.name, m.sysfs, m.vendor, m.product) for m in maps],
+            [('200173800fdf50f86', '200173800fdf50f86', 'dm-0', 'IBM',
+              '2810XIV'),
+             ('36001738cfc9035e80000000000013aff', 'mpathd', 'dm-8', 'IBM',
+              '2810XIV'),
+             ('36005076801d9053a180000000002ccd3',
+              '36005076801d9053a180000000002ccd3', 'dm-1', 'IBM', '2145')])
+        self.assertEqual(
+            maps[0].paths,
+            [MultipathPath('3:0:0:1', 'sdb', '8:16', 'active', 'ready',
+                           'running'),
+             MultipathPath('4:0:0:1', 'sdc', '8:32', 'active', 'ready',
+                           'running')])
+        self.assertEqual(
+            [(p.dev, p.dm_st, p.chk_st) for p in maps[1].paths],
+            [('sdd', 'active', 'ready'), ('-', 'failed', 'faulty')])
+        self.assertEqual([p.dev for p in maps[2].paths], ['sde', 'sdf'])
+
+    def test_iter_maps_empty(self):
+        self.assertEqual(list(iter_multipath_maps([])), [])
+        self.assertEqual(list(iter_multipath_maps(['\n'])), [])
+
+    def test_find_map(self):
+        mp_map = find_multipath_map(MULTIPATH_LL.splitlines(),
+                                    '6001738CFC9035E80000000000013AFF')
+        self.assertEqual(mp_map.name, 'mpathd')
+        self.assertEqual([p.dev for p in mp_map.paths], ['sdd', '-'])
+        self.assertEqual(
+            find_multipath_map(MULTIPATH_LL.splitlines(),
+                               '00173800fdf50f86').name,
+            '200173800fdf50f86')
+
+    def test_find_map_not_found(self):
+        self.assertIsNone(
+            find_multipath_map(MULTIPATH_LL.splitlines(), '1111111111'))
+        # a substring of the wwid is not a WWN
+        self.assertIsNone(
+            find_multipath_map(MULTIPATH_LL.splitlines(), '00173800fdf5'))
+
+    def test_find_map_stops_after_its_map(self):
+        lines = CountingLines(MULTIPATH_LL)
+        find_multipath_map(lines, '6001738cfc9035e80000000000013aff')
+        # the lines of the map and the header of the next one
+        self.assertEqual(lines.read, 12)
+
+    def test_index(self):
+        topology = MultipathTopology.parse(MULTIPATH_LL.splitlines())
+        self.assertEqual(len(topology), 3)
+        self.assertEqual(
+            topology.find('6001738cfc9035e80000000000013AFF').name, 'mpathd')
+        self.assertEqual(
+            topology.find('36005076801d9053a180000000002ccd3').sysfs, 'dm-1')
+        self.assertEqual(topology.find('00173800fdf50f86').sysfs, 'dm-0')
+        self.assertIsNone(topology.find('1111111111'))
@@ -0,0 +1,118 @@
+##############################################################################
+# Copyright 2016 IBM Corp.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##############################################################################
+
+
+import os
+import time
+import tempfile
+import unittest
+from ibm_storage_flocker_driver.lib import deadline
+from ibm_storage_flocker_driver.lib.multipathd import (
+    MultipathdClient,
+    MultipathdNotAvailable,
+    MultipathdCommandFailed,
+)
+from ibm_storage_flocker_driver.tests.fake_multipathd import (
+    FakeMultipathd,
+    fake_map,
+)
+
+WWN = '6001738cfc9035e80000000000013aff'
+WWN2 = '6001738cfc9035e80000000000013b00'
+
+
+class TestMultipathdClient(unittest.TestCase):
+    """
+    Unit testing for MultipathdClient against a fake multipathd socket
+    """
+
+    def setUp(self):
+        self.multipathd = FakeMultipathd([
+            fake_map('mpatha', '3' + WWN, ['sdb', 'sdc']),
+            fake_map('mpathb', 'mpath-3' + WWN2, ['sdd'], chk_st='faulty'),
+        ]).start()
+        self.addCleanup(self.multipathd.stop)
+        self.client = MultipathdClient(self.multipathd.socket_path)
+
+    def test_command(self):
+        self.assertEqual(self.client.command('reconfigure'), 'ok\n')
+        self.assertEqual(self.multipathd.commands, ['reconfigure'])
+
+    def test_command_long_reply(self):
+        reply = 'x' * 100000
+        self.multipathd.replies['show paths'] = reply
+        self.assertEqual(self.client.command('show paths'), reply)
+
+    def test_command_failed(self):
+        with self.assertRaises(MultipathdCommandFailed) as cm:
+            self.client.command('no such command')
+        self.assertEqual(cm.exception.reply, 'fail')
+
+    def test_not_available(self):
+        socket_path = os.path.join(tempfile.gettempdir(), 'no-multipathd')
+        client = MultipathdClient(socket_path)
+        self.assertRaises(MultipathdNotAvailable, client.command,
+                          'reconfigure')
+
+    def test_not_available_abstract_socket(self):
+        client = MultipathdClient('\0/no/such/multipathd')
+        with self.assertRaises(MultipathdNotAvailable) as cm:
+            client.reconfigure()
+        self.assertIn('@/no/such/multipathd', str(cm.exception))
+
+    def test_expired_deadline(self):
+        with deadline.deadline('operation', 0.01):
+            time.sleep(0.02)
+            self.assertRaises(deadline.DeadlineExceeded,
+                              self.client.command, 'reconfigure')
+        self.assertEqual(self.multipathd.commands, [])
+
+    def test_show_maps(self):
+        maps = self.client.show_maps()
+        self.assertEqual([mp_map['name'] for mp_map in maps],
+                         ['mpatha', 'mpathb'])
+
+    def test_show_maps_bad_reply(self):
+        self.multipathd.replies['show maps json'] = 'not json'
+        self.assertRaises(MultipathdCommandFailed, self.client.show_maps)
+
+    def test_find_map(self):
+        self.assertEqual(self.client.find_map(WWN.upper())['name'], 'mpatha')
+        self.assertEqual(self.client.find_map(WWN2)['name'], 'mpathb')
+        self.assertIsNone(self.client.find_map('1111111111111111'))
+
+    def test_find_map_in_given_maps(self):
+        maps = self.client.show_maps()
+        self.assertEqual(self.client.find_map(WWN, maps)['name'], 'mpatha')
+        self.assertIsNone(self.client.find_map(WWN, maps[1:]))
+        self.assertEqual(self.multipathd.commands, ['show maps json'])
+
+    def test_path_states(self):
+        maps = self.client.show_maps()
+        self.assertEqual(MultipathdClient.path_states(maps[0]),
+                         {'sdb': ('active', 'ready'),
+                          'sdc': ('active', 'ready')})
+        self.assertEqual(MultipathdClient.path_states(maps[1]),
+                         {'sdd': ('active', 'faulty')})
+
+    def test_remove_map(self):
+        self.client.remove_map('mpatha')
+        self.assertEqual(self.multipathd.commands, ['remove map mpatha'])
+        self.assertIsNone(self.client.find_map(WWN))
+
+    def test_add_map(self):
+        self.client.add_map('3' + WWN)
+        self.assertEqual(self.multipathd.commands, ['add map 3' + WWN])
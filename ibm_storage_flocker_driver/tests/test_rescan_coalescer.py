@@ -0,0 +1,105 @@
+##############################################################################
+# Copyright 2016 IBM Corp.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##############################################################################
+
+
+import time
+import threading
+import unittest
+from ibm_storage_flocker_driver.lib.rescan_coalescer import RescanCoalescer
+from ibm_storage_flocker_driver.lib.utils import run_concurrently
+
+
+class TestRescanCoalescer(unittest.TestCase):
+    """
+    Unit testing for RescanCoalescer
+    """
+
+    def setUp(self):
+        self.rescans = []
+
+    def _rescan(self, targets):
+        self.rescans.append(targets)
+        time.sleep(0.1)
+
+    def _rescan_concurrently(self, coalescer, count):
+        return run_concurrently([coalescer.rescan] * count,
+                                max_workers=count)
+
+    def test_single_rescan(self):
+        coalescer = RescanCoalescer(self._rescan)
+        coalescer.rescan()
+        coalescer.rescan()
+        self.assertEqual(len(self.rescans), 2)
+        self.assertEqual(coalescer.stats(), dict(requests=2, rescans=2))
+
+    def test_requests_queue_behind_running_rescan(self):
+        coalescer = RescanCoalescer(self._rescan)
+        self._rescan_concurrently(coalescer, 20)
+        # the first pass, and one pass for the requests made during it
+        self.assertLessEqual(len(self.rescans), 3)
+        self.assertEqual(coalescer.stats()['requests'], 20)
+
+    def test_window_merges_requests(self):
+        coalescer = RescanCoalescer(self._rescan, window=0.2)
+        self._rescan_concurrently(coalescer, 10)
+        self.assertEqual(len(self.rescans), 1)
+
+    def test_targets_of_merged_requests(self):
+        coalescer = RescanCoalescer(self._rescan, window=0.2)
+        run_concurrently([lambda lun=lun: coalescer.rescan(lun)
+                          for lun in [1, 2, 2, None]], max_workers=4)
+        self.assertEqual(len(self.rescans), 1)
+        self.assertEqual(sorted(self.rescans[0]), [None, 1, 2])
+
+    def test_request_during_rescan_gets_new_rescan(self):
+        started = threading.Event()
+        release = threading.Event()
+        passes = []
+
+        def rescan(targets):  # pylint: disable=unused-argument
+            passes.append(time.time())
+            started.set()
+            release.wait(5)
+        coalescer = RescanCoalescer(rescan)
+        running = threading.Thread(target=coalescer.rescan)
+        running.start()
+        started.wait(5)
+        requested = time.time()
+        waiting = threading.Thread(target=coalescer.rescan)
+        waiting.start()
+        release.set()
+        running.join()
+        waiting.join()
+        # the request is served by a pass that started after it was made
+        self.assertEqual(len(passes), 2)
+        self.assertGreater(passes[1], requested)
+
+    def test_error_raised_to_every_waiter(self):
+        def rescan(targets):  # pylint: disable=unused-argument
+            time.sleep(0.1)
+            raise OSError('rescan failed')
+        coalescer = RescanCoalescer(rescan, window=0.1)
+        errors = []
+
+        def request():
+            try:
+                coalescer.rescan()
+            except OSError as e:
+                errors.append(e)
+
+        run_concurrently([request] * 3)
+        self.assertEqual(len(errors), 3)
+        self.assertEqual(coalescer.stats(), dict(requests=3, rescans=1))
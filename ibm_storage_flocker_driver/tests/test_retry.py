@@ -0,0 +1,130 @@
+##############################################################################
+# Copyright 2016 IBM Corp.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##############################################################################
+
+
+import unittest
+from email.utils import formatdate
+from mock import patch
+from ibm_storage_flocker_driver.lib.retry import (
+    RetryPolicy,
+    CircuitBreaker,
+    CircuitOpenError,
+    parse_retry_after,
+    CIRCUIT_CLOSED,
+    CIRCUIT_OPEN,
+    CIRCUIT_HALF_OPEN,
+)
+
+TIME_PATH = 'ibm_storage_flocker_driver.lib.retry.time.time'
+
+
+class TestParseRetryAfter(unittest.TestCase):
+    """
+    Unit testing for parse_retry_after
+    """
+
+    def test_seconds(self):
+        self.assertEqual(parse_retry_after('3'), 3)
+        self.assertEqual(parse_retry_after('-3'), 0)
+
+    @patch(TIME_PATH)
+    def test_http_date(self, time_mock):
+        time_mock.return_value = 1000
+        self.assertEqual(parse_retry_after(formatdate(1010)), 10)
+        self.assertEqual(parse_retry_after(formatdate(990)), 0)
+
+    def test_invalid(self):
+        self.assertEqual(parse_retry_after(None), None)
+        self.assertEqual(parse_retry_after('soon'), None)
+
+
+class TestRetryPolicy(unittest.TestCase):
+    """
+    Unit testing for RetryPolicy
+    """
+
+    def setUp(self):
+        self.policy = RetryPolicy(max_retries=3, backoff=1, max_backoff=5)
+
+    def test_retryable_status(self):
+        for status in (429, 500, 502, 503, 504):
+            self.assertTrue(self.policy.is_retryable_status(status, True))
+        for status in (429, 503):
+            self.assertTrue(self.policy.is_retryable_status(status, False))
+        for status in (500, 502, 504):
+            self.assertFalse(self.policy.is_retryable_status(status, False))
+        for status in (400, 401, 404):
+            self.assertFalse(self.policy.is_retryable_status(status, True))
+
+    @patch('ibm_storage_flocker_driver.lib.retry.random.uniform')
+    def test_delay_full_jitter(self, uniform_mock):
+        uniform_mock.side_effect = lambda low, high: high
+        self.assertEqual(
+            [self.policy.delay(attempt) for attempt in range(4)],
+            [1, 2, 4, 5])
+        uniform_mock.assert_called_with(0, 5)
+
+    def test_delay_retry_after(self):
+        self.assertEqual(self.policy.delay(0, retry_after=3), 3)
+        self.assertEqual(self.policy.delay(0, retry_after=60), 5)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """
+    Unit testing for CircuitBreaker
+    """
+
+    def setUp(self):
+        self.breaker = CircuitBreaker('scbe', threshold=0.5,
+                                      reset_timeout=30, window=4,
+                                      min_calls=4)
+
+    def _record(self, *results):
+        for failed in results:
+            self.breaker.before_call()
+            self.breaker.record(failed)
+
+    @patch(TIME_PATH)
+    def test_opens_on_error_rate(self, time_mock):
+        time_mock.return_value = 1000
+        self._record(True, False, True)
+        self.assertEqual(self.breaker.state, CIRCUIT_CLOSED)
+        self._record(False)
+        self.assertEqual(self.breaker.state, CIRCUIT_OPEN)
+        self.assertRaises(CircuitOpenError, self.breaker.before_call)
+        self.assertEqual(self.breaker.stats(), dict(
+            opened=1, rejected=1, state=CIRCUIT_OPEN, error_rate=0.5))
+
+    @patch(TIME_PATH)
+    def test_half_open_trial(self, time_mock):
+        time_mock.return_value = 1000
+        self._record(True, True, True, True)
+        time_mock.return_value = 1030
+        self.breaker.before_call()  # the trial call
+        self.assertEqual(self.breaker.state, CIRCUIT_HALF_OPEN)
+        self.assertRaises(CircuitOpenError, self.breaker.before_call)
+        self.breaker.record(True)
+        self.assertEqual(self.breaker.state, CIRCUIT_OPEN)
+
+        time_mock.return_value = 1060
+        self._record(False)
+        self.assertEqual(self.breaker.state, CIRCUIT_CLOSED)
+        self.assertEqual(self.breaker.stats()['opened'], 2)
+
+    def test_disabled(self):
+        self.breaker.threshold = 0
+        self._record(True, True, True, True, True)
+        self.assertEqual(self.breaker.state, CIRCUIT_CLOSED)
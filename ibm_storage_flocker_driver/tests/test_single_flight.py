@@ -0,0 +1,96 @@
+##############################################################################
+# Copyright 2016 IBM Corp.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##############################################################################
+
+
+import time
+import threading
+import unittest
+from ibm_storage_flocker_driver.lib.single_flight import SingleFlight
+from ibm_storage_flocker_driver.lib.utils import run_concurrently
+from ibm_storage_flocker_driver.lib import deadline
+
+
+class TestSingleFlight(unittest.TestCase):
+    """
+    Unit testing for SingleFlight
+    """
+
+    def setUp(self):
+        self.single_flight = SingleFlight()
+        self.release = threading.Event()
+        self.calls = []
+
+    def _slow_call(self, result):
+        def call():
+            self.calls.append(result)
+            self.release.wait(5)
+            if isinstance(result, Exception):
+                raise result
+            return result
+        return call
+
+    def _release_later(self):
+        threading.Timer(0.2, self.release.set).start()
+
+    def test_identical_calls_coalesced(self):
+        self._release_later()
+        results = run_concurrently(
+            [lambda: self.single_flight.do('key', self._slow_call([1]))
+             for _ in range(5)], max_workers=5)
+        self.assertEqual(results, [[1]] * 5)
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(self.single_flight.stats(), dict(
+            calls=5, coalesced=4, coalesce_rate=0.8))
+
+    def test_different_keys_not_coalesced(self):
+        self._release_later()
+        results = run_concurrently(
+            [lambda key=key: self.single_flight.do(key, self._slow_call(key))
+             for key in ('a', 'b')])
+        self.assertEqual(results, ['a', 'b'])
+        self.assertEqual(len(self.calls), 2)
+
+    def test_error_raised_to_all_callers(self):
+        self._release_later()
+        errors = []
+
+        def call():
+            try:
+                self.single_flight.do('key', self._slow_call(KeyError()))
+            except KeyError as e:
+                errors.append(e)
+
+        run_concurrently([call] * 3)
+        self.assertEqual(len(errors), 3)
+        self.assertEqual(len(self.calls), 1)
+
+    def test_not_cached(self):
+        self.release.set()
+        self.single_flight.do('key', self._slow_call(1))
+        self.single_flight.do('key', self._slow_call(1))
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(self.single_flight.stats()['coalesced'], 0)
+
+    def test_waiter_bounded_by_its_deadline(self):
+        running = threading.Thread(target=self.single_flight.do,
+                                   args=('key', self._slow_call(1)))
+        running.start()
+        time.sleep(0.05)
+        with deadline.deadline('operation', 0.1):
+            self.assertRaises(deadline.DeadlineExceeded,
+                              self.single_flight.do, 'key', None)
+        self.release.set()
+        running.join()
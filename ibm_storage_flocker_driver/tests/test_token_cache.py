@@ -0,0 +1,78 @@
+##############################################################################
+# Copyright 2016 IBM Corp.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##############################################################################
+
+import os
+import stat
+import shutil
+import tempfile
+import unittest
+from ibm_storage_flocker_driver.lib.token_cache import TokenCache
+
+
+class TestTokenCache(unittest.TestCase):
+    """
+    Unit testing for TokenCache
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.cache_dir = os.path.join(self.directory, 'tokens')
+        self.cache = TokenCache(self.cache_dir, '1.2.3.4', 8440, 'user')
+
+    def test_load_without_cache(self):
+        self.assertIsNone(self.cache.load())
+
+    def test_save_and_load(self):
+        self.cache.save('token1', 1000.5, 3600)
+        self.assertEqual(self.cache.load(), dict(
+            token='token1', issued_at=1000.5, lifetime=3600))
+
+    def test_owner_only_permissions(self):
+        self.cache.save('token1', 1000)
+        self.assertEqual(
+            stat.S_IMODE(os.stat(self.cache.path).st_mode), 0o600)
+        self.assertEqual(
+            stat.S_IMODE(os.stat(self.cache_dir).st_mode), 0o700)
+
+    def test_keyed_by_connection(self):
+        self.cache.save('token1', 1000)
+        for other in (TokenCache(self.cache_dir, '1.2.3.5', 8440, 'user'),
+                      TokenCache(self.cache_dir, '1.2.3.4', 8441, 'user'),
+                      TokenCache(self.cache_dir, '1.2.3.4', 8440, 'user2')):
+            self.assertIsNone(other.load())
+        self.assertEqual(
+            TokenCache(self.cache_dir, '1.2.3.4', 8440, 'user').load()
+            ['token'], 'token1')
+
+    def test_discard(self):
+        self.cache.save('token1', 1000)
+        self.cache.discard()
+        self.assertIsNone(self.cache.load())
+        self.cache.discard()  # no cached token is fine
+
+    def test_corrupted_cache_discarded(self):
+        self.cache.save('token1', 1000)
+        with open(self.cache.path, 'w') as token_file:
+            token_file.write('{"token": ')
+        self.assertIsNone(self.cache.load())
+        self.assertFalse(os.path.exists(self.cache.path))
+
+    def test_save_failure_ignored(self):
+        with open(self.cache_dir, 'w'):  # a file instead of a directory
+            pass
+        self.cache.save('token1', 1000)
+        self.assertIsNone(self.cache.load())
@@ -0,0 +1,87 @@
+##############################################################################
+# Copyright 2016 IBM Corp.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+##############################################################################
+
+import json
+import unittest
+from ibm_storage_flocker_driver.lib.utils import (
+    run_concurrently,
+    iter_json_array,
+)
+from ibm_storage_flocker_driver.lib import deadline
+
+FAKE_ITEMS = [
+    {u'name': u'f_vol1', u'size': 1, u'tags': [1, {u'a': None}]},
+    {u'name': u'vol\u05d0', u'size': 2, u'text': u'a ] , [ "b'},
+    {},
+]
+
+
+class TestRunConcurrently(unittest.TestCase):
+    """
+    Unit testing for run_concurrently
+    """
+
+    def test_results_in_order(self):
+        calls = [lambda i=i: i for i in range(20)]
+        self.assertEqual(run_concurrently(calls, max_workers=3), range(20))
+
+    def test_no_calls(self):
+        self.assertEqual(run_concurrently([]), [])
+
+    def test_raise_after_all_calls(self):
+        done = []
+
+        def fail():
+            raise ValueError('fail')
+
+        self.assertRaises(
+            ValueError, run_concurrently,
+            [fail, lambda: done.append(1), lambda: done.append(2)])
+        self.assertEqual(sorted(done), [1, 2])
+
+    def test_calls_within_deadline(self):
+        with deadline.deadline('operation', 10) as operation_deadline:
+            self.assertEqual(
+                run_concurrently([deadline.current] * 3),
+                [operation_deadline] * 3)
+
+
+class TestIterJsonArray(unittest.TestCase):
+    """
+    Unit testing for iter_json_array
+    """
+
+    @staticmethod
+    def _chunks(text, size):
+        return [text[i:i + size] for i in range(0, len(text), size)]
+
+    def test_decode_in_chunks_of_any_size(self):
+        text = json.dumps(FAKE_ITEMS, indent=1).encode('utf-8')
+        for size in (1, 2, 7, 64, len(text)):
+            self.assertEqual(
+                list(iter_json_array(self._chunks(text, size))), FAKE_ITEMS)
+
+    def test_empty_array(self):
+        self.assertEqual(list(iter_json_array([' [', ' ] '])), [])
+
+    def test_items_are_yielded_before_the_end(self):
+        items = iter_json_array(iter(['[{"a": 1}, {"b"', ': 2}']))
+        self.assertEqual(next(items), {'a': 1})
+        self.assertEqual(next(items), {'b': 2})
+        self.assertRaises(ValueError, next, items)
+
+    def test_not_an_array(self):
+        self.assertRaises(ValueError, list, iter_json_array(['{"a": 1}']))